@@ -0,0 +1,75 @@
+"""Environment-driven DATABASES setting, shared by every service.
+
+DB_ENGINE selects the backend:
+
+* ``sqlite`` (default) -- BASE_DIR/db.sqlite3, opened in WAL mode with a busy
+  timeout, synchronous=NORMAL and IMMEDIATE transactions so concurrent writers
+  queue on the lock instead of failing with "database is locked".
+* ``postgres`` -- persistent connections (DB_CONN_MAX_AGE, health checks), or a
+  psycopg connection pool per process when DB_POOL=True.
+
+Each variable can be overridden per service with a prefix, e.g. EXAM_DB_NAME
+wins over DB_NAME, so all services can be started from one shell.
+"""
+import os
+
+
+def _env(prefix, name, default=None):
+    if prefix:
+        value = os.getenv(f"{prefix}_{name}")
+        if value is not None:
+            return value
+    return os.getenv(name, default)
+
+
+def _flag(value):
+    return str(value).lower() in ('1', 'true', 'yes', 'on')
+
+
+def sqlite_config(base_dir, prefix=None):
+    busy_timeout = int(_env(prefix, 'SQLITE_BUSY_TIMEOUT', 20))  # seconds
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': _env(prefix, 'DB_NAME') or base_dir / 'db.sqlite3',
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                f'PRAGMA busy_timeout={busy_timeout * 1000};'
+            ),
+        },
+    }
+
+
+def postgres_config(default_name, prefix=None):
+    config = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': _env(prefix, 'DB_NAME', default_name),
+        'USER': _env(prefix, 'DB_USER', 'postgres'),
+        'PASSWORD': _env(prefix, 'DB_PASSWORD', ''),
+        'HOST': _env(prefix, 'DB_HOST', 'localhost'),
+        'PORT': _env(prefix, 'DB_PORT', '5432'),
+        'OPTIONS': {},
+    }
+    if _flag(_env(prefix, 'DB_POOL', False)):
+        # the pool owns connection lifetime, Django requires CONN_MAX_AGE=0 with it
+        config['CONN_MAX_AGE'] = 0
+        config['OPTIONS']['pool'] = {
+            'min_size': int(_env(prefix, 'DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(_env(prefix, 'DB_POOL_MAX_SIZE', 10)),
+            'timeout': int(_env(prefix, 'DB_POOL_TIMEOUT', 10)),
+        }
+    else:
+        config['CONN_MAX_AGE'] = int(_env(prefix, 'DB_CONN_MAX_AGE', 60))
+        config['CONN_HEALTH_CHECKS'] = True
+    return config
+
+
+def database_config(base_dir, default_name, prefix=None):
+    engine = _env(prefix, 'DB_ENGINE', 'sqlite').lower()
+    if engine in ('postgres', 'postgresql'):
+        return {'default': postgres_config(default_name, prefix)}
+    if engine != 'sqlite':
+        raise ValueError(f"Unsupported DB_ENGINE: {engine}")
+    return {'default': sqlite_config(base_dir, prefix)}
@@ -0,0 +1,64 @@
+"""Test helper that fails when a code path makes the database read a whole table.
+
+Every SELECT/UPDATE/DELETE captured while the code runs is EXPLAINed. SQLite
+reports a full table scan as a bare ``SCAN <table>`` step (``SCAN ... USING
+INDEX`` walks an index and is accepted); PostgreSQL reports ``Seq Scan on
+<table>``, and sequential scans are disabled while planning so tiny test
+tables do not hide a missing index.
+"""
+import re
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+_SQLITE_SCAN = re.compile(r'^SCAN (\w+)$')
+_POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def _explain(cursor, sql):
+    if connection.vendor == 'sqlite':
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+    cursor.execute('SET LOCAL enable_seqscan = off')
+    cursor.execute(f'EXPLAIN {sql}')
+    return [row[0] for row in cursor.fetchall()]
+
+
+def full_table_scans(queries, allowed=()):
+    """Return (table, sql) for each captured query whose plan scans a table outside ``allowed``."""
+    pattern = _SQLITE_SCAN if connection.vendor == 'sqlite' else _POSTGRES_SCAN
+    scans = []
+    with connection.cursor() as cursor:
+        for query in queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+                continue
+            for step in _explain(cursor, sql):
+                match = pattern.search(step.strip())
+                if match and match.group(1) not in allowed:
+                    scans.append((match.group(1), sql))
+    return scans
+
+
+class QueryPlanMixin:
+    """TestCase mixin: ``with self.assertNoFullTableScans(): ...``"""
+
+    def assertNoFullTableScans(self, allowed=()):
+        return _NoFullTableScans(self, allowed)
+
+
+class _NoFullTableScans(CaptureQueriesContext):
+    def __init__(self, test_case, allowed):
+        super().__init__(connection)
+        self.test_case = test_case
+        self.allowed = allowed
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super().__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return
+        scans = full_table_scans(self.captured_queries, self.allowed)
+        if scans:
+            self.test_case.fail(
+                "Full table scan(s):\n" + "\n".join(f"  {table}: {sql}" for table, sql in scans)
+            )
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nexam.proto\x12\x05\x65xams\"\x07\n\x05\x45mpty\"\x1e\n\x0b\x45xamRequest\x12\x0f\n\x07\x65xam_id\x18\x01 \x01(\x05\"g\n\x11\x43reateExamRequest\x12\r\n\x05title\x18\x01 \x01(\t\x12\x0f\n\x07subject\x18\x02 \x01(\t\x12\x0c\n\x04\x64\x61te\x18\x03 \x01(\t\x12\x10\n\x08\x64uration\x18\x04 \x01(\x05\x12\x12\n\nteacher_id\x18\x05 \x01(\x05\"s\n\x0c\x45xamResponse\x12\x0f\n\x07\x65xam_id\x18\x01 \x01(\x05\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0f\n\x07subject\x18\x03 \x01(\t\x12\x0c\n\x04\x64\x61te\x18\x04 \x01(\t\x12\x10\n\x08\x64uration\x18\x05 \x01(\x05\x12\x12\n\nteacher_id\x18\x06 \x01(\x05\"7\n\x11ListExamsResponse\x12\"\n\x05\x65xams\x18\x01 \x03(\x0b\x32\x13.exams.ExamResponse\"6\n\x12\x43reateExamResponse\x12\x0f\n\x07\x65xam_id\x18\x01 \x01(\x05\x12\x0f\n\x07message\x18\x02 \x01(\t\"8\n\x11\x41ssignExamRequest\x12\x0f\n\x07\x65xam_id\x18\x01 \x01(\x05\x12\x12\n\nstudent_id\x18\x02 \x03(\x05\"%\n\x12\x41ssignExamResponse\x12\x0f\n\x07message\x18\x01 \x01(\t\"$\n\x0eStudentRequest\x12\x12\n\nstudent_id\x18\x01 \x01(\x05\"$\n\x0eTeacherRequest\x12\x12\n\nteacher_id\x18\x01 \x01(\x05\"H\n\x12\x41ttemptExamRequest\x12\x0f\n\x07\x65xam_id\x18\x01 \x01(\x05\x12\r\n\x05score\x18\x02 \x01(\x05\x12\x12\n\nstudent_id\x18\x03 \x01(\x05\"&\n\x13\x41ttemptExamResponse\x12\x0f\n\x07message\x18\x01 \x01(\t2\xce\x03\n\x0b\x45xamService\x12\x32\n\x07GetExam\x12\x12.exams.ExamRequest\x1a\x13.exams.ExamResponse\x12\x33\n\tListExams\x12\x0c.exams.Empty\x1a\x18.exams.ListExamsResponse\x12\x41\n\nCreateExam\x12\x18.exams.CreateExamRequest\x1a\x19.exams.CreateExamResponse\x12\x41\n\nAssignExam\x12\x18.exams.AssignExamRequest\x1a\x19.exams.AssignExamResponse\x12\x44\n\x11GetExamsByStudent\x12\x15.exams.StudentRequest\x1a\x18.exams.ListExamsResponse\x12\x44\n\x11GetExamsByTeacher\x12\x15.exams.TeacherRequest\x1a\x18.exams.ListExamsResponse\x12\x44\n\x0b\x41ttemptExam\x12\x19.exams.AttemptExamRequest\x1a\x1a.exams.AttemptExamResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nexam.proto\x12\x05\x65xams\"\x07\n\x05\x45mpty\"\x1e\n\x0b\x45xamRequest\x12\x0f\n\x07\x65xam_id\x18\x01 \x01(\x05\"g\n\x11\x43reateExamRequest\x12\r\n\x05title\x18\x01 \x01(\t\x12\x0f\n\x07subject\x18\x02 \x01(\t\x12\x0c\n\x04\x64\x61te\x18\x03 \x01(\t\x12\x10\n\x08\x64uration\x18\x04 \x01(\x05\x12\x12\n\nteacher_id\x18\x05 \x01(\x05\"s\n\x0c\x45xamResponse\x12\x0f\n\x07\x65xam_id\x18\x01 \x01(\x05\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0f\n\x07subject\x18\x03 \x01(\t\x12\x0c\n\x04\x64\x61te\x18\x04 \x01(\t\x12\x10\n\x08\x64uration\x18\x05 \x01(\x05\x12\x12\n\nteacher_id\x18\x06 \x01(\x05\"7\n\x11ListExamsResponse\x12\"\n\x05\x65xams\x18\x01 \x03(\x0b\x32\x13.exams.ExamResponse\"6\n\x12\x43reateExamResponse\x12\x0f\n\x07\x65xam_id\x18\x01 \x01(\x05\x12\x0f\n\x07message\x18\x02 \x01(\t\"8\n\x11\x41ssignExamRequest\x12\x0f\n\x07\x65xam_id\x18\x01 \x01(\x05\x12\x12\n\nstudent_id\x18\x02 \x03(\x05\"%\n\x12\x41ssignExamResponse\x12\x0f\n\x07message\x18\x01 \x01(\t\"$\n\x0eStudentRequest\x12\x12\n\nstudent_id\x18\x01 \x01(\x05\"$\n\x0eTeacherRequest\x12\x12\n\nteacher_id\x18\x01 \x01(\x05\"7\n\x10StartExamRequest\x12\x0f\n\x07\x65xam_id\x18\x01 \x01(\x05\x12\x12\n\nstudent_id\x18\x02 \x01(\x05\"J\n\x11StartExamResponse\x12\x0f\n\x07message\x18\x01 \x01(\t\x12\x12\n\nstarted_at\x18\x02 \x01(\t\x12\x10\n\x08\x64\x65\x61\x64line\x18\x03 \x01(\t\"\x97\x01\n\x11StudentExamStatus\x12\x0f\n\x07\x65xam_id\x18\x01 \x01(\x05\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0f\n\x07subject\x18\x03 \x01(\t\x12\x0c\n\x04\x64\x61te\x18\x04 \x01(\t\x12\x10\n\x08\x64uration\x18\x05 \x01(\x05\x12\x12\n\nteacher_id\x18\x06 \x01(\x05\x12\x0e\n\x06status\x18\x07 \x01(\t\x12\r\n\x05score\x18\x08 \x01(\x05\"C\n\x18StudentDashboardResponse\x12\'\n\x05\x65xams\x18\x01 \x03(\x0b\x32\x18.exams.StudentExamStatus\"q\n\x10\x45xamStatsRequest\x12\x0f\n\x07\x65xam_id\x18\x01 \x01(\x05\x12\x12\n\nteacher_id\x18\x02 \x01(\x05\x12\x0f\n\x07subject\x18\x03 \x01(\t\x12\x11\n\tpass_mark\x18\x04 \x01(\x05\x12\x14\n\x0crequester_id\x18\x05 \x01(\x05\"/\n\nPercentile\x12\x12\n\npercentile\x18\x01 \x01(\x05\x12\r\n\x05value\x18\x02 \x01(\x01\">\n\x0fHistogramBucket\x12\r\n\x05lower\x18\x01 \x01(\x05\x12\r\n\x05upper\x18\x02 \x01(\x05\x12\r\n\x05\x63ount\x18\x03 \x01(\x05\"\xcf\x01\n\x11\x45xamStatsResponse\x12\r\n\x05scope\x18\x01 \x01(\t\x12\r\n\x05\x63ount\x18\x02 \x01(\x05\x12\x0c\n\x04mean\x18\x03 \x01(\x01\x12\x0e\n\x06median\x18\x04 \x01(\x01\x12\x0b\n\x03min\x18\x05 \x01(\x01\x12\x0b\n\x03max\x18\x06 \x01(\x01\x12\x11\n\tpass_rate\x18\x07 \x01(\x01\x12&\n\x0bpercentiles\x18\x08 \x03(\x0b\x32\x11.exams.Percentile\x12)\n\thistogram\x18\t \x03(\x0b\x32\x16.exams.HistogramBucket\";\n\x0b\x41nswerEntry\x12\x13\n\x0bquestion_id\x18\x01 \x01(\x05\x12\x17\n\x0fselected_option\x18\x02 \x01(\t\"]\n\x11SubmitExamRequest\x12\x0f\n\x07\x65xam_id\x18\x01 \x01(\x05\x12\x12\n\nstudent_id\x18\x02 \x01(\x05\x12#\n\x07\x61nswers\x18\x03 \x03(\x0b\x32\x12.exams.AnswerEntry\"T\n\x12SubmitExamResponse\x12\x0f\n\x07message\x18\x01 \x01(\t\x12\r\n\x05score\x18\x02 \x01(\x05\x12\x0f\n\x07\x63orrect\x18\x03 \x01(\x05\x12\r\n\x05total\x18\x04 \x01(\x05\"N\n\x10\x45xamPaperRequest\x12\x0f\n\x07\x65xam_id\x18\x01 \x01(\x05\x12\x12\n\nstudent_id\x18\x02 \x01(\x05\x12\x15\n\rif_none_match\x18\x03 \x01(\t\"H\n\x11\x45xamPaperResponse\x12\x0c\n\x04\x65tag\x18\x01 \x01(\t\x12\x14\n\x0cnot_modified\x18\x02 \x01(\x08\x12\x0f\n\x07payload\x18\x03 \x01(\x0c\"\xba\x01\n\x11QuestionImportRow\x12\x0f\n\x07\x65xam_id\x18\x01 \x01(\x05\x12\x12\n\nrow_number\x18\x02 \x01(\x05\x12\x0c\n\x04text\x18\x03 \x01(\t\x12\x10\n\x08option_a\x18\x04 \x01(\t\x12\x10\n\x08option_b\x18\x05 \x01(\t\x12\x10\n\x08option_c\x18\x06 \x01(\t\x12\x10\n\x08option_d\x18\x07 \x01(\t\x12\x16\n\x0e\x63orrect_option\x18\x08 \x01(\t\x12\x12\n\nteacher_id\x18\t \x01(\x05\"K\n\x17ImportQuestionsResponse\x12\x0f\n\x07message\x18\x01 \x01(\t\x12\x0f\n\x07\x63reated\x18\x02 \x01(\x05\x12\x0e\n\x06\x65rrors\x18\x03 \x03(\t2\xaf\x06\n\x0b\x45xamService\x12\x32\n\x07GetExam\x12\x12.exams.ExamRequest\x1a\x13.exams.ExamResponse\x12\x33\n\tListExams\x12\x0c.exams.Empty\x1a\x18.exams.ListExamsResponse\x12\x41\n\nCreateExam\x12\x18.exams.CreateExamRequest\x1a\x19.exams.CreateExamResponse\x12\x41\n\nAssignExam\x12\x18.exams.AssignExamRequest\x1a\x19.exams.AssignExamResponse\x12\x44\n\x11GetExamsByStudent\x12\x15.exams.StudentRequest\x1a\x18.exams.ListExamsResponse\x12\x44\n\x11GetExamsByTeacher\x12\x15.exams.TeacherRequest\x1a\x18.exams.ListExamsResponse\x12M\n\x13GetStudentDashboard\x12\x15.exams.StudentRequest\x1a\x1f.exams.StudentDashboardResponse\x12\x41\n\x0cGetExamStats\x12\x17.exams.ExamStatsRequest\x1a\x18.exams.ExamStatsResponse\x12\x41\n\nSubmitExam\x12\x18.exams.SubmitExamRequest\x1a\x19.exams.SubmitExamResponse\x12\x41\n\x0cGetExamPaper\x12\x17.exams.ExamPaperRequest\x1a\x18.exams.ExamPaperResponse\x12M\n\x0fImportQuestions\x12\x18.exams.QuestionImportRow\x1a\x1e.exams.ImportQuestionsResponse(\x01\x12>\n\tStartExam\x12\x17.exams.StartExamRequest\x1a\x18.exams.StartExamResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -51,10 +51,36 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_STUDENTREQUEST']._serialized_end=530
   _globals['_TEACHERREQUEST']._serialized_start=532
   _globals['_TEACHERREQUEST']._serialized_end=568
-  _globals['_ATTEMPTEXAMREQUEST']._serialized_start=570
-  _globals['_ATTEMPTEXAMREQUEST']._serialized_end=642
-  _globals['_ATTEMPTEXAMRESPONSE']._serialized_start=644
-  _globals['_ATTEMPTEXAMRESPONSE']._serialized_end=682
-  _globals['_EXAMSERVICE']._serialized_start=685
-  _globals['_EXAMSERVICE']._serialized_end=1147
+  _globals['_STARTEXAMREQUEST']._serialized_start=570
+  _globals['_STARTEXAMREQUEST']._serialized_end=625
+  _globals['_STARTEXAMRESPONSE']._serialized_start=627
+  _globals['_STARTEXAMRESPONSE']._serialized_end=701
+  _globals['_STUDENTEXAMSTATUS']._serialized_start=704
+  _globals['_STUDENTEXAMSTATUS']._serialized_end=855
+  _globals['_STUDENTDASHBOARDRESPONSE']._serialized_start=857
+  _globals['_STUDENTDASHBOARDRESPONSE']._serialized_end=924
+  _globals['_EXAMSTATSREQUEST']._serialized_start=926
+  _globals['_EXAMSTATSREQUEST']._serialized_end=1039
+  _globals['_PERCENTILE']._serialized_start=1041
+  _globals['_PERCENTILE']._serialized_end=1088
+  _globals['_HISTOGRAMBUCKET']._serialized_start=1090
+  _globals['_HISTOGRAMBUCKET']._serialized_end=1152
+  _globals['_EXAMSTATSRESPONSE']._serialized_start=1155
+  _globals['_EXAMSTATSRESPONSE']._serialized_end=1362
+  _globals['_ANSWERENTRY']._serialized_start=1364
+  _globals['_ANSWERENTRY']._serialized_end=1423
+  _globals['_SUBMITEXAMREQUEST']._serialized_start=1425
+  _globals['_SUBMITEXAMREQUEST']._serialized_end=1518
+  _globals['_SUBMITEXAMRESPONSE']._serialized_start=1520
+  _globals['_SUBMITEXAMRESPONSE']._serialized_end=1604
+  _globals['_EXAMPAPERREQUEST']._serialized_start=1606
+  _globals['_EXAMPAPERREQUEST']._serialized_end=1684
+  _globals['_EXAMPAPERRESPONSE']._serialized_start=1686
+  _globals['_EXAMPAPERRESPONSE']._serialized_end=1758
+  _globals['_QUESTIONIMPORTROW']._serialized_start=1761
+  _globals['_QUESTIONIMPORTROW']._serialized_end=1947
+  _globals['_IMPORTQUESTIONSRESPONSE']._serialized_start=1949
+  _globals['_IMPORTQUESTIONSRESPONSE']._serialized_end=2024
+  _globals['_EXAMSERVICE']._serialized_start=2027
+  _globals['_EXAMSERVICE']._serialized_end=2842
 # @@protoc_insertion_point(module_scope)
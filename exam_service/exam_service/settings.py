@@ -10,8 +10,13 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import sys
 from pathlib import Path
 
+# modules shared by every service (common/) live at the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from common.database import database_config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -74,12 +79,8 @@ WSGI_APPLICATION = 'exam_service.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# DB_ENGINE / EXAM_DB_ENGINE etc. select SQLite (WAL) or PostgreSQL, see common/database.py
+DATABASES = database_config(BASE_DIR, 'exam_service', prefix='EXAM')
 
 
 # Password validation
@@ -131,6 +132,24 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Exam analytics
+EXAM_PASS_MARK = 40
+EXAM_STATS_CACHE_TIMEOUT = 60 * 60  # cached stats are also invalidated on every SubmitExam
+ANSWER_KEY_CACHE_TIMEOUT = 60 * 60
+
+# Exam paper delivery
+EXAM_PAPER_CACHE_DIR = BASE_DIR / 'paper_cache'
+EXAM_PAPER_VERSION_TIMEOUT = 5  # seconds a process trusts its cached content_version
+
+# Bulk question import
+QUESTION_IMPORT_CHUNK_SIZE = 500
+
+# Write-behind buffer for SubmitExam submissions (started by the gRPC server)
+EXAM_SUBMISSION_BUFFER_ENABLED = True
+EXAM_SUBMISSION_JOURNAL_DIR = BASE_DIR / 'submission_journal'
+EXAM_SUBMISSION_BATCH_SIZE = 200
+EXAM_SUBMISSION_FLUSH_INTERVAL = 0.5  # seconds
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
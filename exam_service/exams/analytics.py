@@ -0,0 +1,82 @@
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import StudentExamAttempt
+
+PERCENTILES = (25, 50, 75, 90)
+HISTOGRAM_EDGES = np.arange(0, 101, 10)
+
+SCOPE_FILTERS = {
+    'exam': 'exam_id',
+    'teacher': 'exam__teacher_id',
+    'subject': 'exam__subject',
+}
+
+
+def _version_key(scope, value):
+    return f"exam_stats_version:{scope}:{value}"
+
+
+def _stats_key(scope, value, pass_mark, teacher_id):
+    version = cache.get_or_set(_version_key(scope, value), 1, timeout=None)
+    return f"exam_stats:{scope}:{value}:{version}:{pass_mark}:{teacher_id or ''}"
+
+
+def compute_stats(scores, pass_mark):
+    scores = np.asarray(scores, dtype=np.float64)
+    stats = {
+        'count': int(scores.size),
+        'mean': 0.0,
+        'median': 0.0,
+        'min': 0.0,
+        'max': 0.0,
+        'pass_rate': 0.0,
+        'percentiles': {p: 0.0 for p in PERCENTILES},
+        'histogram': [],
+    }
+    if scores.size:
+        values = np.percentile(scores, PERCENTILES)
+        stats.update(
+            mean=float(scores.mean()),
+            median=float(np.median(scores)),
+            min=float(scores.min()),
+            max=float(scores.max()),
+            pass_rate=float(np.count_nonzero(scores >= pass_mark) / scores.size),
+            percentiles={p: float(v) for p, v in zip(PERCENTILES, values)},
+        )
+    # scores outside 0-100 are folded into the first/last bucket
+    counts, _ = np.histogram(np.clip(scores, 0, 100), bins=HISTOGRAM_EDGES)
+    stats['histogram'] = [
+        (int(lower), int(upper), int(count))
+        for lower, upper, count in zip(HISTOGRAM_EDGES[:-1], HISTOGRAM_EDGES[1:], counts)
+    ]
+    return stats
+
+
+def exam_stats(scope, value, pass_mark=None, teacher_id=None):
+    # teacher_id narrows the scope to one teacher's exams
+    if pass_mark is None:
+        pass_mark = settings.EXAM_PASS_MARK
+    key = _stats_key(scope, value, pass_mark, teacher_id)
+    stats = cache.get(key)
+    if stats is None:
+        filters = {SCOPE_FILTERS[scope]: value}
+        if teacher_id:
+            filters['exam__teacher_id'] = teacher_id
+        # single column fetch, no model instances
+        scores = StudentExamAttempt.objects.filter(
+            submitted=True, score__isnull=False, **filters
+        ).values_list('score', flat=True)
+        stats = compute_stats(np.fromiter(scores, dtype=np.float64), pass_mark)
+        cache.set(key, stats, timeout=settings.EXAM_STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def invalidate_exam_stats(exam):
+    # bumping the version orphans every cached pass_mark variant for the scope
+    for scope, value in (('exam', exam.id), ('teacher', exam.teacher_id), ('subject', exam.subject)):
+        try:
+            cache.incr(_version_key(scope, value))
+        except ValueError:
+            pass
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class ExamsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'exams'
+
+    def ready(self):
+        from django.db.models.signals import post_save
+
+        from .dashboard import refresh_exam_fields
+        from .models import Exam
+
+        post_save.connect(refresh_exam_fields, sender=Exam)
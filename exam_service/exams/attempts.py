@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import DateTimeField, DurationField, ExpressionWrapper, F
+from django.utils import timezone
+
+from .models import Exam, StudentExamAttempt
+
+
+class AttemptRejected(Exception):
+    pass
+
+
+class ExamNotFound(AttemptRejected):
+    pass
+
+
+class AttemptAlreadySubmitted(AttemptRejected):
+    pass
+
+
+class AttemptTimeOver(AttemptRejected):
+    pass
+
+
+class AttemptNotStarted(AttemptRejected):
+    pass
+
+
+def attempt_deadline():
+    # SQL form of StudentExamAttempt.is_time_over(): started_at + exam.duration minutes
+    duration = ExpressionWrapper(F('exam__duration') * timedelta(minutes=1), output_field=DurationField())
+    return ExpressionWrapper(F('started_at') + duration, output_field=DateTimeField())
+
+
+def open_attempts(exam_id, student_id, now):
+    return StudentExamAttempt.objects.annotate(deadline=attempt_deadline()).filter(
+        exam_id=exam_id, student_id=student_id, submitted=False, deadline__gte=now
+    )
+
+
+def _rejection(exam_id, student_id):
+    attempt = StudentExamAttempt.objects.filter(exam_id=exam_id, student_id=student_id).first()
+    if attempt is None:
+        if not Exam.objects.filter(id=exam_id).exists():
+            return ExamNotFound("Exam not found")
+        return AttemptNotStarted("Exam not started")
+    if attempt.submitted:
+        return AttemptAlreadySubmitted("Exam already submitted")
+    return AttemptTimeOver("Exam time is over")
+
+
+def check_submission(exam_id, student_id, submitted_at=None):
+    """Raise the AttemptRejected that submit_attempt would, without writing anything."""
+    if not open_attempts(exam_id, student_id, submitted_at or timezone.now()).exists():
+        raise _rejection(exam_id, student_id)
+
+
+def submit_attempt(exam_id, student_id, score, submitted_at=None):
+    """Record a submission and return the attempt id; must run inside a transaction.
+
+    Every exam is timed, so a submission needs an attempt opened by
+    start_attempt and still inside its window at ``submitted_at`` (default
+    now); it is finished with a single conditional UPDATE. When that matches
+    nothing, the reason (no such exam, never started, already submitted, time
+    over) is looked up to reject it.
+    """
+    now = submitted_at or timezone.now()
+    if open_attempts(exam_id, student_id, now).update(score=score, submitted=True):
+        return StudentExamAttempt.objects.filter(exam_id=exam_id, student_id=student_id).values_list('id', flat=True).get()
+    raise _rejection(exam_id, student_id)
+
+
+def start_attempt(exam_id, student_id):
+    """Open an attempt (idempotent) and return it; the time window runs from started_at."""
+    try:
+        with transaction.atomic():
+            return StudentExamAttempt.objects.create(
+                exam_id=exam_id, student_id=student_id, started_at=timezone.now(), submitted=False
+            )
+    except IntegrityError:
+        return StudentExamAttempt.objects.get(exam_id=exam_id, student_id=student_id)
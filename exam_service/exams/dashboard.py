@@ -0,0 +1,51 @@
+from .models import StudentExamStatus
+
+# Exam columns copied onto every StudentExamStatus row
+EXAM_FIELDS = ('title', 'subject', 'date', 'duration', 'teacher_id')
+
+
+def record_assignments(exam, student_ids):
+    # one insert for the whole batch; students already on the dashboard are left as they are
+    StudentExamStatus.objects.bulk_create(
+        [
+            StudentExamStatus(
+                student_id=sid,
+                exam=exam,
+                title=exam.title,
+                subject=exam.subject,
+                date=exam.date,
+                duration=exam.duration,
+                teacher_id=exam.teacher_id,
+                status='assigned',
+            )
+            for sid in student_ids
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def refresh_exam_fields(sender, instance, created, update_fields=None, **kwargs):
+    # post_save receiver for Exam (connected in ExamsConfig.ready); queryset
+    # .update() calls on Exam skip it, so edits must go through save()
+    if created:
+        return
+    fields = [f for f in EXAM_FIELDS if update_fields is None or f in update_fields]
+    if fields:
+        StudentExamStatus.objects.filter(exam_id=instance.id).update(
+            **{field: getattr(instance, field) for field in fields}
+        )
+
+
+def record_attempt(exam_id, student_id, score):
+    return StudentExamStatus.objects.filter(exam_id=exam_id, student_id=student_id).update(
+        status='attempted', score=score
+    )
+
+
+def student_dashboard(student_id, status=None):
+    rows = StudentExamStatus.objects.filter(student_id=student_id)
+    if status:
+        rows = rows.filter(status=status)
+    return rows.order_by('date', 'exam_id').values(
+        'exam_id', 'title', 'subject', 'date', 'duration', 'teacher_id', 'status', 'score'
+    )
@@ -34,9 +34,59 @@ class ExamGRPCClient:
     def get_exams_by_teacher(self, teacher_id):
         return self.stub.GetExamsByTeacher(pb.TeacherRequest(teacher_id=int(teacher_id)))
 
-    def attempt_exam(self, exam_id, student_id, score):
-        request = pb.AttemptExamRequest(exam_id=int(exam_id), student_id=int(student_id), score=int(score))
-        return self.stub.AttemptExam(request)
+    def get_student_dashboard(self, student_id):
+        return self.stub.GetStudentDashboard(pb.StudentRequest(student_id=int(student_id)))
+
+    def submit_exam(self, exam_id, student_id, answers):
+        request = pb.SubmitExamRequest(
+            exam_id=int(exam_id),
+            student_id=int(student_id),
+            answers=[
+                pb.AnswerEntry(question_id=int(a['question_id']), selected_option=a['selected_option'])
+                for a in answers
+            ]
+        )
+        return self.stub.SubmitExam(request)
+
+    def start_exam(self, exam_id, student_id):
+        request = pb.StartExamRequest(exam_id=int(exam_id), student_id=int(student_id))
+        return self.stub.StartExam(request)
+
+    def get_exam_paper(self, exam_id, student_id, if_none_match=""):
+        request = pb.ExamPaperRequest(
+            exam_id=int(exam_id),
+            student_id=int(student_id),
+            if_none_match=if_none_match
+        )
+        return self.stub.GetExamPaper(request)
+
+    def import_questions(self, exam_id, teacher_id, rows):
+        # rows is any iterable of (row_number, dict); messages are produced lazily while streaming
+        requests = (
+            pb.QuestionImportRow(
+                exam_id=int(exam_id),
+                row_number=int(row_number),
+                text=str(row.get('text') or ''),
+                option_a=str(row.get('option_a') or ''),
+                option_b=str(row.get('option_b') or ''),
+                option_c=str(row.get('option_c') or ''),
+                option_d=str(row.get('option_d') or ''),
+                correct_option=str(row.get('correct_option') or ''),
+                teacher_id=int(teacher_id)
+            )
+            for row_number, row in rows
+        )
+        return self.stub.ImportQuestions(requests)
+
+    def get_exam_stats(self, requester_id, exam_id=0, teacher_id=0, subject="", pass_mark=0):
+        request = pb.ExamStatsRequest(
+            exam_id=int(exam_id),
+            teacher_id=int(teacher_id),
+            subject=subject,
+            pass_mark=int(pass_mark),
+            requester_id=int(requester_id)
+        )
+        return self.stub.GetExamStats(request)
 
     def close(self):
         self.channel.close()
@@ -0,0 +1,95 @@
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .analytics import invalidate_exam_stats
+from .attempts import submit_attempt
+from .dashboard import record_attempt
+from .models import Question, StudentAnswer
+
+OPTIONS = 'abcd'
+# exact lookup: a str.index() search would also accept '' and runs like 'bc'
+OPTION_CODES = {option: code for code, option in enumerate(OPTIONS)}
+UNANSWERED = 255
+
+
+class GradingError(ValueError):
+    pass
+
+
+def _answer_key_cache_key(exam):
+    # a question edit bumps content_version, so stale keys are never read again
+    return f"answer_key:{exam.id}:{exam.content_version}"
+
+
+def load_answer_key(exam):
+    # (sorted question ids, option codes) -- small enough to sit in the process cache
+    cache_key = _answer_key_cache_key(exam)
+    key = cache.get(cache_key)
+    if key is None:
+        rows = list(
+            Question.objects.filter(exam_id=exam.id).order_by('id').values_list('id', 'correct_option')
+        )
+        key = (
+            np.array([qid for qid, _ in rows], dtype=np.int64),
+            np.array([OPTION_CODES[opt.lower()] for _, opt in rows], dtype=np.uint8),
+        )
+        cache.set(cache_key, key, timeout=settings.ANSWER_KEY_CACHE_TIMEOUT)
+    return key
+
+
+def grade(answer_key, answers):
+    """Grade (question_id, option) pairs against an answer key; returns (correct, total)."""
+    question_ids, correct_codes = answer_key
+    if not question_ids.size:
+        raise GradingError("Exam has no questions")
+
+    submitted_ids = np.fromiter((qid for qid, _ in answers), dtype=np.int64, count=len(answers))
+    if np.unique(submitted_ids).size != submitted_ids.size:
+        raise GradingError("Duplicate answers for the same question")
+    try:
+        submitted_codes = np.fromiter(
+            (OPTION_CODES[opt.lower()] for _, opt in answers), dtype=np.uint8, count=len(answers)
+        )
+    except (KeyError, AttributeError):
+        raise GradingError("Selected option must be one of A, B, C or D")
+
+    positions = np.searchsorted(question_ids, submitted_ids)
+    positions = np.minimum(positions, question_ids.size - 1)
+    if submitted_ids.size and not np.array_equal(question_ids[positions], submitted_ids):
+        raise GradingError("Answer references a question outside this exam")
+
+    # scatter the answers onto the key order; unanswered questions never match
+    selected = np.full(question_ids.size, UNANSWERED, dtype=np.uint8)
+    selected[positions] = submitted_codes
+    correct = int(np.count_nonzero(selected == correct_codes))
+    return correct, int(question_ids.size)
+
+
+def grade_submission(exam, answers):
+    """Grade a submission without writing it; returns (score, correct, total).
+
+    This is the only source of attempt scores: clients send answers, never a score.
+    """
+    correct, total = grade(load_answer_key(exam), answers)
+    return round(correct * 100 / total), correct, total
+
+
+def answer_rows(attempt_id, answers):
+    return [
+        StudentAnswer(attempt_id=attempt_id, question_id=qid, selected_option=opt.upper())
+        for qid, opt in answers
+    ]
+
+
+def submit_answers(exam, student_id, answers):
+    score, correct, total = grade_submission(exam, answers)
+
+    with transaction.atomic():
+        attempt_id = submit_attempt(exam.id, student_id, score)
+        StudentAnswer.objects.bulk_create(answer_rows(attempt_id, answers))
+        record_attempt(exam.id, student_id, score)
+        transaction.on_commit(lambda: invalidate_exam_stats(exam))
+
+    return score, correct, total
@@ -7,11 +7,24 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'exam_service.settings')
 django.setup()
 from concurrent import futures
 import time
-from .models import Exam,ExamAssignment,StudentExamAttempt
+import itertools
+from datetime import timedelta
+from .models import Exam,ExamAssignment,StudentExamAttempt,StudentExamStatus
+from .dashboard import record_assignments, student_dashboard
+from .analytics import exam_stats
+from .attempts import (
+    AttemptAlreadySubmitted, AttemptNotStarted, AttemptTimeOver, ExamNotFound, start_attempt
+)
+from .grading import GradingError, grade_submission, submit_answers
+from .papers import get_paper
+from .question_import import import_questions
+from .submission_buffer import get_buffer, start_buffer, stop_buffer
 import exam_pb2
 import exam_pb2_grpc
-from exam_pb2 import ExamResponse, ListExamsResponse, CreateExamResponse , AssignExamResponse,AttemptExamResponse
+from exam_pb2 import ExamResponse, ListExamsResponse, CreateExamResponse , AssignExamResponse
 from exam_pb2_grpc import ExamServiceServicer, add_ExamServiceServicer_to_server
+from django.conf import settings
+from django.db.models import Exists, OuterRef
 from django.utils import timezone
 from messaging.publisher import publish_event
 
@@ -86,6 +99,7 @@ class ExamService(ExamServiceServicer):
             return AssignExamResponse()
 
         assigned_count = 0
+        assigned = []
         skipped = []
 
         for sid in request.student_id:
@@ -93,11 +107,15 @@ class ExamService(ExamServiceServicer):
                 # Store only student_id
                 ExamAssignment.objects.get_or_create(exam=exam, student_id=sid)
                 assigned_count += 1
+                assigned.append(sid)
             except Exception as e:
                 skipped.append(sid)
                 # logging.error(f"Error assigning exam {exam.id} to student {sid}: {e}")
                 continue
 
+        if assigned:
+            record_assignments(exam, assigned)
+
         # After all assignments, publish event
         if assigned_count > 0:
             publish_event({
@@ -115,28 +133,33 @@ class ExamService(ExamServiceServicer):
 
     def GetExamsByStudent(self, request, context):
         response = exam_pb2.ListExamsResponse()
-        student_id = request.student_id
-
-        assignments = ExamAssignment.objects.filter(student_id=student_id)
 
-        attempted_ids = StudentExamAttempt.objects.filter(
-            student_id=student_id, submitted=1
-        ).values_list("exam_id", flat=True)
+        # attempted exams are filtered out by the read model's status column
+        for row in student_dashboard(request.student_id, status='assigned'):
+            response.exams.add(
+                exam_id=row['exam_id'],
+                title=row['title'],
+                subject=row['subject'],
+                date=str(row['date']),
+                duration=row['duration'],
+                teacher_id=row['teacher_id']
+            )
 
-        for assignment in assignments:
-            exam = assignment.exam
-            if exam.id in attempted_ids:
-                continue  # skip already attempted exams
+        return response
 
+    def GetStudentDashboard(self, request, context):
+        response = exam_pb2.StudentDashboardResponse()
+        for row in student_dashboard(request.student_id):
             response.exams.add(
-                exam_id=exam.id,
-                title=exam.title,
-                subject=exam.subject,
-                date=str(exam.date),
-                duration=exam.duration,
-                teacher_id=exam.teacher_id
+                exam_id=row['exam_id'],
+                title=row['title'],
+                subject=row['subject'],
+                date=str(row['date']),
+                duration=row['duration'],
+                teacher_id=row['teacher_id'],
+                status=row['status'],
+                score=row['score'] or 0
             )
-
         return response
 
     def GetExamsByTeacher(self, request, context):
@@ -154,43 +177,218 @@ class ExamService(ExamServiceServicer):
             )
         return response
 
-    def AttemptExam(self, request, context):
+    def SubmitExam(self, request, context):
         try:
-            try:
-                exam = Exam.objects.get(id=request.exam_id)
-            except Exam.DoesNotExist:
-                context.set_code(grpc.StatusCode.NOT_FOUND)
-                context.set_details("Exam not found")
-                return exam_pb2.AttemptExamResponse(message="Exam not found")
-
-            if StudentExamAttempt.objects.filter(
-                student_id=request.student_id,
-                exam=exam
-            ).exists():
-                context.set_code(grpc.StatusCode.ALREADY_EXISTS)
-                context.set_details("Exam already submitted")
-                return exam_pb2.AttemptExamResponse(message="Exam already submitted")
-
-            # Save attempt
-            StudentExamAttempt.objects.create(
-                student_id=request.student_id,
-                exam=exam,
-                score=request.score,
-                started_at=timezone.now(),
-                submitted=1
-            )
+            exam = Exam.objects.get(id=request.exam_id)
+        except Exam.DoesNotExist:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details("Exam not found")
+            return exam_pb2.SubmitExamResponse(message="Exam not found")
 
-            return exam_pb2.AttemptExamResponse(
-                message="Exam submitted successfully"
-            )
+        answers = [(a.question_id, a.selected_option) for a in request.answers]
+        message = "Exam submitted successfully"
+        try:
+            buffer = get_buffer()
+            if buffer is None:
+                score, correct, total = submit_answers(exam, request.student_id, answers)
+            else:
+                # graded and checked here and now; the write is journaled and done by the
+                # buffer's flush thread
+                score, correct, total = grade_submission(exam, answers)
+                buffer.submit(exam.id, request.student_id, score, answers)
+                message = "Exam submission received"
+        except GradingError as e:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(str(e))
+            return exam_pb2.SubmitExamResponse(message=str(e))
+        except ExamNotFound as e:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details(str(e))
+            return exam_pb2.SubmitExamResponse(message=str(e))
+        except AttemptAlreadySubmitted as e:
+            context.set_code(grpc.StatusCode.ALREADY_EXISTS)
+            context.set_details(str(e))
+            return exam_pb2.SubmitExamResponse(message=str(e))
+        except (AttemptNotStarted, AttemptTimeOver) as e:
+            context.set_code(grpc.StatusCode.FAILED_PRECONDITION)
+            context.set_details(str(e))
+            return exam_pb2.SubmitExamResponse(message=str(e))
+        except Exception as e:
+            logging.error(f"Error in SubmitExam: {e}")
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return exam_pb2.SubmitExamResponse(message="Error submitting exam")
+
+        return exam_pb2.SubmitExamResponse(
+            message=message,
+            score=score,
+            correct=correct,
+            total=total
+        )
+
+    def StartExam(self, request, context):
+        try:
+            exam = Exam.objects.get(id=request.exam_id)
+        except Exam.DoesNotExist:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details("Exam not found")
+            return exam_pb2.StartExamResponse(message="Exam not found")
+
+        try:
+            attempt = start_attempt(exam.id, request.student_id)
+        except Exception as e:
+            logging.error(f"Error in StartExam: {e}")
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return exam_pb2.StartExamResponse(message="Error starting exam")
+
+        if attempt.submitted:
+            context.set_code(grpc.StatusCode.ALREADY_EXISTS)
+            context.set_details("Exam already submitted")
+            return exam_pb2.StartExamResponse(message="Exam already submitted")
+
+        deadline = attempt.started_at + timedelta(minutes=exam.duration)
+        return exam_pb2.StartExamResponse(
+            message="Exam started",
+            started_at=attempt.started_at.isoformat(),
+            deadline=deadline.isoformat()
+        )
+
+    def GetExamPaper(self, request, context):
+        # one lookup: is the exam assigned to the student, and has the student started it?
+        started = StudentExamStatus.objects.filter(
+            exam_id=request.exam_id, student_id=request.student_id
+        ).annotate(
+            started=Exists(StudentExamAttempt.objects.filter(
+                exam_id=OuterRef('exam_id'), student_id=OuterRef('student_id')
+            ))
+        ).values_list('started', flat=True).first() if request.student_id else None
+        if started is None:
+            context.set_code(grpc.StatusCode.PERMISSION_DENIED)
+            context.set_details("Exam not assigned to student")
+            return exam_pb2.ExamPaperResponse()
+        if not started:
+            context.set_code(grpc.StatusCode.FAILED_PRECONDITION)
+            context.set_details("Exam not started")
+            return exam_pb2.ExamPaperResponse()
+
+        try:
+            etag, payload = get_paper(request.exam_id)
+        except Exam.DoesNotExist:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details("Exam not found")
+            return exam_pb2.ExamPaperResponse()
+        except Exception as e:
+            logging.error(f"Error in GetExamPaper: {e}")
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return exam_pb2.ExamPaperResponse()
+
+        if request.if_none_match == etag:
+            return exam_pb2.ExamPaperResponse(etag=etag, not_modified=True)
+        return exam_pb2.ExamPaperResponse(etag=etag, payload=payload)
+
+    def ImportQuestions(self, request_iterator, context):
+        first = next(request_iterator, None)
+        if first is None:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details("No questions received")
+            return exam_pb2.ImportQuestionsResponse(message="No questions received")
+
+        try:
+            exam = Exam.objects.get(id=first.exam_id)
+        except Exam.DoesNotExist:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details("Exam not found")
+            return exam_pb2.ImportQuestionsResponse(message="Exam not found")
+
+        if exam.teacher_id != first.teacher_id:
+            context.set_code(grpc.StatusCode.PERMISSION_DENIED)
+            context.set_details("Exam belongs to another teacher")
+            return exam_pb2.ImportQuestionsResponse(message="Exam belongs to another teacher")
+
+        rows = (
+            (row.row_number, {
+                'text': row.text,
+                'option_a': row.option_a,
+                'option_b': row.option_b,
+                'option_c': row.option_c,
+                'option_d': row.option_d,
+                'correct_option': row.correct_option,
+            })
+            for row in itertools.chain([first], request_iterator)
+        )
+        try:
+            created, errors = import_questions(exam, rows)
+        except Exception as e:
+            logging.error(f"Error in ImportQuestions: {e}")
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return exam_pb2.ImportQuestionsResponse(message="Question import failed")
+
+        return exam_pb2.ImportQuestionsResponse(
+            message=f"{created} questions imported successfully",
+            created=created,
+            errors=errors
+        )
+
+    def GetExamStats(self, request, context):
+        scopes = [
+            (scope, value) for scope, value in (
+                ('exam', request.exam_id),
+                ('teacher', request.teacher_id),
+                ('subject', request.subject),
+            ) if value
+        ]
+        if len(scopes) != 1:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details("Provide exactly one of exam_id, teacher_id or subject")
+            return exam_pb2.ExamStatsResponse()
+
+        scope, value = scopes[0]
+        teacher_id = request.requester_id
+        if (
+            not teacher_id
+            or (scope == 'teacher' and value != teacher_id)
+            or (scope == 'exam' and not Exam.objects.filter(id=value, teacher_id=teacher_id).exists())
+        ):
+            context.set_code(grpc.StatusCode.PERMISSION_DENIED)
+            context.set_details("Stats are only available for your own exams")
+            return exam_pb2.ExamStatsResponse()
 
+        try:
+            # subject stats are limited to the requesting teacher's exams
+            stats = exam_stats(
+                scope, value,
+                pass_mark=request.pass_mark or None,
+                teacher_id=teacher_id if scope == 'subject' else None
+            )
         except Exception as e:
+            logging.error(f"Error in GetExamStats: {e}")
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(str(e))
-            return exam_pb2.AttemptExamResponse(message="Error submitting exam")
+            return exam_pb2.ExamStatsResponse()
+
+        response = exam_pb2.ExamStatsResponse(
+            scope=scope,
+            count=stats['count'],
+            mean=stats['mean'],
+            median=stats['median'],
+            min=stats['min'],
+            max=stats['max'],
+            pass_rate=stats['pass_rate'],
+        )
+        for percentile, result in stats['percentiles'].items():
+            response.percentiles.add(percentile=percentile, value=result)
+        for lower, upper, count in stats['histogram']:
+            response.histogram.add(lower=lower, upper=upper, count=count)
+        return response
 
 def serve():
     try:
+        if settings.EXAM_SUBMISSION_BUFFER_ENABLED:
+            # replays any journal left by a crash before the port opens
+            start_buffer()
         server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
         add_ExamServiceServicer_to_server(ExamService(), server)
         server.add_insecure_port('0.0.0.0:50051')
@@ -201,6 +399,8 @@ def serve():
     except Exception as e:
         logging.error(f"Server failed to start: {e}")
         raise
+    finally:
+        stop_buffer()
 
 if __name__ == '__main__':
     serve()
\ No newline at end of file
@@ -0,0 +1,80 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from unittest.mock import MagicMock
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.utils import timezone
+
+from exams.grpc_server import ExamService
+from exams.models import Exam, Question, StudentExamAttempt
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure concurrent SubmitExam throughput against the configured database "
+        "(run once per DB_ENGINE to compare backends). Benchmark rows are removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--submissions', type=int, default=2000)
+        parser.add_argument('--workers', type=int, default=10)
+
+    def handle(self, *args, **options):
+        submissions = options['submissions']
+        workers = options['workers']
+        exam = Exam.objects.create(
+            title='bench_attempts', subject='benchmark', date=date.today(), duration=60, teacher_id=0
+        )
+        question = Question.objects.create(
+            exam=exam, text='bench', option_a='1', option_b='2', option_c='3', option_d='4', correct_option='a'
+        )
+        # submissions finish an open attempt, so every student starts first (not timed)
+        StudentExamAttempt.objects.bulk_create([
+            StudentExamAttempt(exam=exam, student_id=student_id, started_at=timezone.now(), submitted=False)
+            for student_id in range(1, submissions + 1)
+        ])
+        service = ExamService()
+        latencies = []
+        errors = []
+        guard = threading.Lock()
+
+        def run(student_ids):
+            local = []
+            failed = 0
+            try:
+                for student_id in student_ids:
+                    context = MagicMock()
+                    started = time.perf_counter()
+                    answer = MagicMock(question_id=question.id, selected_option='ABCD'[student_id % 4])
+                    service.SubmitExam(
+                        MagicMock(exam_id=exam.id, student_id=student_id, answers=[answer]), context
+                    )
+                    local.append(time.perf_counter() - started)
+                    failed += context.set_code.called
+            finally:
+                connection.close()
+            with guard:
+                latencies.extend(local)
+                errors.append(failed)
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(run, [range(i + 1, submissions + 1, workers) for i in range(workers)]))
+            elapsed = time.perf_counter() - started
+        finally:
+            connections.close_all()
+            exam.delete()
+
+        latencies.sort()
+        engine = connection.settings_dict['ENGINE'].rsplit('.', 1)[-1]
+        self.stdout.write(
+            f"SubmitExam on {engine}: {len(latencies)} calls, {workers} workers, {sum(errors)} errors\n"
+            f"  throughput {len(latencies) / elapsed:.1f} calls/s\n"
+            f"  latency p50 {statistics.median(latencies) * 1000:.1f} ms, "
+            f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms"
+        )
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_student_exam_status(apps, schema_editor):
+    ExamAssignment = apps.get_model('exams', 'ExamAssignment')
+    StudentExamAttempt = apps.get_model('exams', 'StudentExamAttempt')
+    StudentExamStatus = apps.get_model('exams', 'StudentExamStatus')
+
+    scores = {
+        (a.exam_id, a.student_id): a.score
+        for a in StudentExamAttempt.objects.filter(submitted=True, student_id__isnull=False)
+    }
+    rows = []
+    for assignment in ExamAssignment.objects.filter(student_id__isnull=False).select_related('exam'):
+        exam = assignment.exam
+        key = (exam.id, assignment.student_id)
+        rows.append(StudentExamStatus(
+            student_id=assignment.student_id,
+            exam=exam,
+            title=exam.title,
+            subject=exam.subject,
+            date=exam.date,
+            duration=exam.duration,
+            teacher_id=exam.teacher_id,
+            status='attempted' if key in scores else 'assigned',
+            score=scores.get(key),
+        ))
+    StudentExamStatus.objects.bulk_create(rows, batch_size=500, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0006_notification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentExamStatus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('student_id', models.IntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('subject', models.CharField(max_length=255)),
+                ('date', models.DateField()),
+                ('duration', models.IntegerField(default=30)),
+                ('teacher_id', models.IntegerField()),
+                ('status', models.CharField(choices=[('assigned', 'Assigned'), ('attempted', 'Attempted')], default='assigned', max_length=10)),
+                ('score', models.IntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_statuses', to='exams.exam')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['student_id', 'status', 'date'], name='exams_status_student_idx')],
+                'unique_together': {('student_id', 'exam')},
+            },
+        ),
+        migrations.RunPython(backfill_student_exam_status, migrations.RunPython.noop),
+    ]
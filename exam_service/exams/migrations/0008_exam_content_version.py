@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0007_studentexamstatus'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='content_version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
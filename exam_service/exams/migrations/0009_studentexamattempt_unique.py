@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:38
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_attempts(apps, schema_editor):
+    # keep the earliest attempt per (exam, student); later duplicates came from racing submits
+    StudentExamAttempt = apps.get_model('exams', 'StudentExamAttempt')
+    duplicates = (
+        StudentExamAttempt.objects.filter(student_id__isnull=False)
+        .values('exam_id', 'student_id')
+        .annotate(first_id=Min('id'), total=Count('id'))
+        .filter(total__gt=1)
+    )
+    for row in duplicates:
+        StudentExamAttempt.objects.filter(
+            exam_id=row['exam_id'], student_id=row['student_id']
+        ).exclude(id=row['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0008_exam_content_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_attempts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='studentexamattempt',
+            constraint=models.UniqueConstraint(fields=('exam', 'student_id'), name='unique_attempt_per_student'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0009_studentexamattempt_unique'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['teacher_id', 'date'], name='exams_exam_teacher_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['subject'], name='exams_exam_subject_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examassignment',
+            index=models.Index(fields=['student_id', 'exam'], name='exams_assign_student_idx'),
+        ),
+    ]
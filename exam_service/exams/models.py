@@ -1,5 +1,9 @@
 from django.db import models
+from django.db.models import F
+from django.core.cache import cache
 from django.contrib.auth.models import User
+from datetime import timedelta
+from django.utils import timezone
 
 class Exam(models.Model):
     title = models.CharField(max_length=255)
@@ -7,6 +11,23 @@ class Exam(models.Model):
     date = models.DateField()
     duration = models.IntegerField(default=30)
     teacher_id = models.IntegerField() 
+    # bumped whenever the question set changes; cached papers and answer keys are keyed on it
+    content_version = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['teacher_id', 'date'], name='exams_exam_teacher_idx'),  # GetExamsByTeacher, teacher stats
+            models.Index(fields=['subject'], name='exams_exam_subject_idx'),  # subject stats
+        ]
+
+    @staticmethod
+    def content_version_cache_key(exam_id):
+        return f"exam_content_version:{exam_id}"
+
+    @classmethod
+    def bump_content_version(cls, exam_id):
+        cls.objects.filter(id=exam_id).update(content_version=F('content_version') + 1)
+        cache.delete(cls.content_version_cache_key(exam_id))
 
 class Question(models.Model):
     exam = models.ForeignKey(Exam, related_name='questions', on_delete=models.CASCADE)
@@ -24,10 +45,27 @@ class Question(models.Model):
     ]
     correct_option = models.CharField(max_length=1, choices=CORRECT_OPTIONS)
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        Exam.bump_content_version(self.exam_id)
+
+    def delete(self, *args, **kwargs):
+        exam_id = self.exam_id
+        result = super().delete(*args, **kwargs)
+        Exam.bump_content_version(exam_id)
+        return result
+
 class ExamAssignment(models.Model):
     exam = models.ForeignKey(Exam, on_delete=models.CASCADE)
     student_id = models.IntegerField(null=True, blank=True)
     assigned_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # AssignExam's get_or_create(exam, student_id) and per-student lookups
+            models.Index(fields=['student_id', 'exam'], name='exams_assign_student_idx'),
+        ]
+
     def __str__(self):
         return f"StudentID {self.student_id} -> {self.exam.title}"
 
@@ -39,6 +77,12 @@ class StudentExamAttempt(models.Model):
     score = models.IntegerField(null=True, blank=True) 
     submitted = models.BooleanField(default=False)
 
+    class Meta:
+        constraints = [
+            # one attempt per student per exam, enforced by the database so concurrent submits cannot both land
+            models.UniqueConstraint(fields=['exam', 'student_id'], name='unique_attempt_per_student'),
+        ]
+
     def is_time_over(self):
         return self.started_at + timedelta(minutes=self.exam.duration) < timezone.now()
 
@@ -60,3 +104,30 @@ class Notification(models.Model):
 
     def __str__(self):
         return f"{self.title} for {self.student}"
+
+class StudentExamStatus(models.Model):
+    # read model for the student dashboard: one row per (student, exam),
+    # kept in sync by AssignExam / SubmitExam and Exam.save() so reads never join
+    STATUS_CHOICES = [
+        ('assigned', 'Assigned'),
+        ('attempted', 'Attempted'),
+    ]
+    student_id = models.IntegerField()
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name='student_statuses')
+    title = models.CharField(max_length=255)
+    subject = models.CharField(max_length=255)
+    date = models.DateField()
+    duration = models.IntegerField(default=30)
+    teacher_id = models.IntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='assigned')
+    score = models.IntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('student_id', 'exam')
+        indexes = [
+            models.Index(fields=['student_id', 'status', 'date'], name='exams_status_student_idx'),
+        ]
+
+    def __str__(self):
+        return f"StudentID {self.student_id} -> {self.title} ({self.status})"
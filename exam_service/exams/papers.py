@@ -0,0 +1,108 @@
+import glob
+import hashlib
+import json
+import os
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Exam, Question
+
+# exam_id -> (content_version, etag, payload bytes)
+_papers = {}
+_build_locks = {}
+_locks_guard = threading.Lock()
+
+
+def current_content_version(exam_id):
+    key = Exam.content_version_cache_key(exam_id)
+    version = cache.get(key)
+    if version is None:
+        version = Exam.objects.filter(id=exam_id).values_list('content_version', flat=True).first()
+        if version is None:
+            raise Exam.DoesNotExist(f"Exam {exam_id} not found")
+        cache.set(key, version, timeout=settings.EXAM_PAPER_VERSION_TIMEOUT)
+    return version
+
+
+def _etag(payload):
+    return '"%s"' % hashlib.sha256(payload).hexdigest()[:32]
+
+
+def _disk_path(exam_id, version):
+    return os.path.join(settings.EXAM_PAPER_CACHE_DIR, f"exam_{exam_id}_v{version}.json")
+
+
+def _lock_for(exam_id):
+    with _locks_guard:
+        return _build_locks.setdefault(exam_id, threading.Lock())
+
+
+def build_paper(exam_id):
+    """Serialize the exam and its questions (without correct_option) to JSON bytes."""
+    exam = Exam.objects.get(id=exam_id)
+    questions = Question.objects.filter(exam_id=exam_id).order_by('id').values(
+        'id', 'text', 'option_a', 'option_b', 'option_c', 'option_d'
+    )
+    paper = {
+        "exam_id": exam.id,
+        "title": exam.title,
+        "subject": exam.subject,
+        "date": str(exam.date),
+        "duration": exam.duration,
+        "version": exam.content_version,
+        "questions": [
+            {
+                "id": q['id'],
+                "text": q['text'],
+                "options": {"A": q['option_a'], "B": q['option_b'], "C": q['option_c'], "D": q['option_d']},
+            }
+            for q in questions
+        ],
+    }
+    return exam.content_version, json.dumps(paper, separators=(',', ':')).encode('utf-8')
+
+
+def _write_to_disk(exam_id, version, payload):
+    os.makedirs(settings.EXAM_PAPER_CACHE_DIR, exist_ok=True)
+    path = _disk_path(exam_id, version)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+    for stale in glob.glob(os.path.join(settings.EXAM_PAPER_CACHE_DIR, f"exam_{exam_id}_v*.json")):
+        if stale != path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+
+def get_paper(exam_id):
+    """Return (etag, payload) for the current version of an exam paper.
+
+    Lookup order is process memory, then the on-disk copy, then the database;
+    concurrent misses for the same exam wait on one builder instead of all querying.
+    """
+    version = current_content_version(exam_id)
+    cached = _papers.get(exam_id)
+    if cached and cached[0] == version:
+        return cached[1], cached[2]
+
+    with _lock_for(exam_id):
+        cached = _papers.get(exam_id)
+        if cached and cached[0] == version:
+            return cached[1], cached[2]
+
+        path = _disk_path(exam_id, version)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                payload = f.read()
+        else:
+            version, payload = build_paper(exam_id)
+            _write_to_disk(exam_id, version, payload)
+
+        etag = _etag(payload)
+        _papers[exam_id] = (version, etag, payload)
+        return etag, payload
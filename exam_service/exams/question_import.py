@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.db import transaction
+
+from .models import Exam, Question
+
+OPTION_FIELDS = ('option_a', 'option_b', 'option_c', 'option_d')
+VALID_OPTIONS = {choice for choice, _ in Question.CORRECT_OPTIONS}
+MAX_OPTION_LENGTH = Question._meta.get_field('option_a').max_length
+
+
+def validate_question_row(row):
+    """Check one imported row without touching the database; returns (fields, errors)."""
+    errors = []
+    text = (row.get('text') or '').strip()
+    if not text:
+        errors.append("text is required")
+
+    fields = {'text': text}
+    for name in OPTION_FIELDS:
+        value = (row.get(name) or '').strip()
+        if not value:
+            errors.append(f"{name} is required")
+        elif len(value) > MAX_OPTION_LENGTH:
+            errors.append(f"{name} is longer than {MAX_OPTION_LENGTH} characters")
+        fields[name] = value
+
+    correct_option = (row.get('correct_option') or '').strip().lower()
+    if correct_option not in VALID_OPTIONS:
+        errors.append("correct_option must be one of a, b, c, d")
+    fields['correct_option'] = correct_option
+    return fields, errors
+
+
+def import_questions(exam, rows, chunk_size=None):
+    """Validate and insert (row_number, row) pairs in chunks; returns (created, errors).
+
+    Rows are consumed lazily so the caller can stream them straight from an upload.
+    Invalid rows are reported and skipped, valid rows are inserted.
+    """
+    chunk_size = chunk_size or settings.QUESTION_IMPORT_CHUNK_SIZE
+    created = 0
+    errors = []
+    batch = []
+
+    def flush():
+        nonlocal created
+        with transaction.atomic():
+            Question.objects.bulk_create(batch)
+        created += len(batch)
+        batch.clear()
+
+    for row_number, row in rows:
+        fields, row_errors = validate_question_row(row)
+        if row_errors:
+            errors.append(f"Row {row_number}: {'; '.join(row_errors)}")
+            continue
+        batch.append(Question(exam=exam, **fields))
+        if len(batch) >= chunk_size:
+            flush()
+    if batch:
+        flush()
+
+    if created:
+        # bulk_create skips Question.save(), so bump the paper/answer-key version once here
+        Exam.bump_content_version(exam.id)
+    return created, errors
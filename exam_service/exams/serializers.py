@@ -1,4 +1,4 @@
-from .models import Exam, Question, ExamAssignment, StudentExamAttempt, StudentAnswer
+from .models import Exam, Question, ExamAssignment, StudentAnswer
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from rest_framework.exceptions import ValidationError, AuthenticationFailed
@@ -39,10 +39,25 @@ class ExamAssignmentSerializer(serializers.ModelSerializer):
             )
         ]
 
-class ExamAttemptSerializer(serializers.ModelSerializer):
-    score = serializers.IntegerField()
+class AnswerSerializer(serializers.Serializer):
+    question_id = serializers.IntegerField()
+    selected_option = serializers.ChoiceField(choices=['A', 'B', 'C', 'D', 'a', 'b', 'c', 'd'])
+
+class SubmitExamSerializer(serializers.Serializer):
     exam_id = serializers.IntegerField()
-    class Meta:
-        model = StudentExamAttempt
-        fields = ['score','exam_id']
-        
\ No newline at end of file
+    answers = AnswerSerializer(many=True, allow_empty=False)
+
+class StartExamSerializer(serializers.Serializer):
+    exam_id = serializers.IntegerField(min_value=1)
+
+class ExamStatsQuerySerializer(serializers.Serializer):
+    exam_id = serializers.IntegerField(required=False, min_value=1)
+    teacher_id = serializers.IntegerField(required=False, min_value=1)
+    subject = serializers.CharField(required=False, max_length=100)
+    pass_mark = serializers.IntegerField(required=False, min_value=0)
+
+    def validate(self, attrs):
+        scopes = [key for key in ('exam_id', 'teacher_id', 'subject') if attrs.get(key)]
+        if len(scopes) != 1:
+            raise serializers.ValidationError("Provide exactly one of exam_id, teacher_id or subject")
+        return attrs
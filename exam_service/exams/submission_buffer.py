@@ -0,0 +1,213 @@
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .analytics import invalidate_exam_stats
+from .attempts import AttemptAlreadySubmitted, AttemptRejected, check_submission, submit_attempt
+from .dashboard import record_attempt
+from .grading import answer_rows
+from .models import Exam, StudentAnswer
+
+logger = logging.getLogger(__name__)
+
+_buffer = None
+
+
+class SubmissionBuffer:
+    """Write-behind queue for graded SubmitExam submissions.
+
+    submit() takes the score grade_submission computed and the answers. It
+    rejects a submission the database would (AttemptRejected), or one for an
+    attempt still waiting in the journal, then appends it with its submission
+    time to an fsync'd journal and returns; a single background thread moves
+    the journal aside and writes attempts and answers to the database in
+    batched transactions, checking the time window against the journaled time
+    rather than the flush time. A segment is deleted only after its batches
+    commit, so anything left on disk after a crash is replayed by the next
+    start(). Replaying an entry that already landed is
+    harmless: the attempt is no longer open, so it is dropped.
+    """
+
+    def __init__(self, journal_dir=None, batch_size=None, flush_interval=None):
+        self.journal_dir = str(journal_dir or settings.EXAM_SUBMISSION_JOURNAL_DIR)
+        self.batch_size = batch_size or settings.EXAM_SUBMISSION_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.EXAM_SUBMISSION_FLUSH_INTERVAL
+        self.journal_path = os.path.join(self.journal_dir, 'submissions.jsonl')
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._journal = None
+        self._pending = 0
+        self._queued = set()  # (exam_id, student_id) journaled but not yet flushed
+        self._segment = 0
+        self._thread = None
+
+    def start(self):
+        os.makedirs(self.journal_dir, exist_ok=True)
+        # entries left by a previous process are flushed before new ones are accepted
+        self.replay()
+        self._journal = open(self.journal_path, 'ab')
+        self._thread = threading.Thread(target=self._run, name='submission-buffer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+        self.replay()
+
+    def replay(self):
+        self._rotate()
+        self.flush()
+
+    def _check_queued(self, exam_id, student_id):
+        if (exam_id, student_id) in self._queued:
+            raise AttemptAlreadySubmitted("Exam already submitted")
+
+    def submit(self, exam_id, student_id, score, answers):
+        submitted_at = timezone.now()
+        self._check_queued(exam_id, student_id)
+        check_submission(exam_id, student_id, submitted_at)
+        line = json.dumps({
+            'exam_id': exam_id, 'student_id': student_id, 'score': score,
+            'answers': [[question_id, option] for question_id, option in answers],
+            'submitted_at': submitted_at.isoformat(),
+        }) + '\n'
+        with self._lock:
+            if self._journal is None:
+                # never started, or stop() has closed the journal
+                raise RuntimeError("Submission buffer is not running; submission was not recorded")
+            self._check_queued(exam_id, student_id)
+            self._journal.write(line.encode('utf-8'))
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._queued.add((exam_id, student_id))
+            self._pending += 1
+            pending = self._pending
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stopping.is_set():
+                break  # stop() drains what is left on the caller's thread
+            if self._pending:
+                self._rotate()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Submission flush failed, will retry: {e}")
+            finally:
+                close_old_connections()
+
+    def _segments(self):
+        return sorted(
+            glob.glob(os.path.join(self.journal_dir, 'submissions.*.flushing')),
+            key=lambda path: int(path.rsplit('.', 2)[-2])
+        )
+
+    def _rotate(self):
+        # move the live journal aside so submit() keeps appending to a fresh file while it is flushed
+        with self._lock:
+            if not os.path.exists(self.journal_path) or not os.path.getsize(self.journal_path):
+                return
+            existing = self._segments()
+            if existing:
+                self._segment = max(self._segment, int(existing[-1].rsplit('.', 2)[-2]))
+            self._segment += 1
+            if self._journal is not None:
+                self._journal.close()
+            os.replace(self.journal_path, os.path.join(self.journal_dir, f'submissions.{self._segment}.flushing'))
+            if self._journal is not None:
+                self._journal = open(self.journal_path, 'ab')
+            self._pending = 0
+
+    def flush(self):
+        for path in self._segments():
+            entries = _read_journal(path)
+            for start in range(0, len(entries), self.batch_size):
+                _write_batch(entries[start:start + self.batch_size])
+            os.remove(path)
+            with self._lock:
+                # written (or dropped) now, so the database answers for duplicates
+                self._queued.difference_update((entry['exam_id'], entry['student_id']) for entry in entries)
+
+
+def _read_journal(path):
+    entries = []
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # a torn final line from a crash mid-append was never acknowledged
+                logger.warning(f"Skipping unreadable journal line in {path}")
+    return entries
+
+
+def _write_batch(entries, retries=3):
+    for attempt in range(retries):
+        try:
+            with transaction.atomic():
+                exams = Exam.objects.in_bulk({entry['exam_id'] for entry in entries})
+                written = set()
+                answers = []
+                for entry in entries:
+                    try:
+                        # entries journaled before submitted_at was recorded fall back to now
+                        attempt_id = submit_attempt(
+                            entry['exam_id'], entry['student_id'], entry['score'],
+                            parse_datetime(entry.get('submitted_at') or ''),
+                        )
+                    except AttemptRejected as e:
+                        logger.warning(
+                            f"Dropped buffered submission for exam {entry['exam_id']}, "
+                            f"student {entry['student_id']}: {e}"
+                        )
+                        continue
+                    answers.extend(answer_rows(attempt_id, entry.get('answers', ())))
+                    record_attempt(entry['exam_id'], entry['student_id'], entry['score'])
+                    written.add(entry['exam_id'])
+                StudentAnswer.objects.bulk_create(answers)
+                for exam_id in written:
+                    transaction.on_commit(lambda exam=exams[exam_id]: invalidate_exam_stats(exam))
+            return
+        except OperationalError as e:
+            # "database is locked": back off and retry the whole batch
+            if attempt == retries - 1:
+                raise
+            logger.warning(f"Submission batch retry after: {e}")
+            time.sleep(0.1 * (attempt + 1))
+
+
+def get_buffer():
+    return _buffer
+
+
+def start_buffer(**kwargs):
+    global _buffer
+    _buffer = SubmissionBuffer(**kwargs)
+    _buffer.start()
+    return _buffer
+
+
+def stop_buffer():
+    global _buffer
+    if _buffer is not None:
+        _buffer.stop()
+        _buffer = None
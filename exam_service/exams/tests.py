@@ -6,12 +6,28 @@ from rest_framework import status
 from django.contrib.auth.models import User
 import grpc
 import exam_pb2  # Ensure this matches the generated file location (e.g., from exams or exams.protos)
-from .models import Exam, ExamAssignment
-from datetime import date
+from .models import Exam, ExamAssignment, StudentExamStatus, StudentExamAttempt, Question, StudentAnswer
+from .attempts import start_attempt
+from .dashboard import record_assignments
+from .analytics import compute_stats
+from .grading import GradingError, grade, load_answer_key
+from . import papers
+from .question_import import import_questions
+from .submission_buffer import SubmissionBuffer
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+import json
+import os
+import tempfile
+import numpy as np
+from django.core.cache import cache
+from datetime import date, timedelta
+from django.utils import timezone
 import unittest
 from .grpc_server import ExamService
 from .exam_client import ExamGRPCClient
 from .grpc_client import UserGRPCClient
+from common.query_plans import QueryPlanMixin
 
 class ExamViewsTestCase(TestCase):
     def setUp(self):
@@ -320,65 +336,193 @@ class ExamViewsTestCase(TestCase):
         self.assertEqual(response.status_code, 403)
 
     @patch('exams.views.UserGRPCClient.get_student_by_user')
-    @patch('exams.views.ExamGRPCClient.attempt_exam')
-    def test_attempt_exam_success(self, mock_attempt_exam, mock_get_student):
-        mock_get_student.return_value = self.student_data
-        mock_attempt_exam.return_value = MagicMock(message='Submitted')
-        exam = Exam.objects.create(**self.exam_data)
-        attempt_data = {'exam_id': exam.id, 'score': 80}
+    @patch('exams.views.ExamGRPCClient.submit_exam')
+    def test_submit_exam_success(self, mock_submit_exam, mock_get_student):
+        mock_get_student.return_value = MagicMock(student=self.student_data)
+        mock_submit_exam.return_value = MagicMock(message='Exam submitted successfully', score=50, correct=1, total=2)
+        data = {'exam_id': 1, 'answers': [{'question_id': 1, 'selected_option': 'A'}, {'question_id': 2, 'selected_option': 'c'}]}
         self.client.force_authenticate(user=self.user_student)
-        response = self.client.post(reverse('exam-attempt'), attempt_data, format='json')
+        response = self.client.post(reverse('exam-submit'), data, format='json')
         self.assertEqual(response.status_code, 200)
-        self.assertIn('message', response.data)
+        self.assertEqual(response.data['score'], 50)
+        mock_submit_exam.assert_called_once()
+
+    def test_submit_exam_invalid_option(self):
+        data = {'exam_id': 1, 'answers': [{'question_id': 1, 'selected_option': 'E'}]}
+        self.client.force_authenticate(user=self.user_student)
+        response = self.client.post(reverse('exam-submit'), data, format='json')
+        self.assertEqual(response.status_code, 400)
 
     @patch('exams.views.UserGRPCClient.get_student_by_user')
-    def test_attempt_exam_not_student(self, mock_get_student):
-        mock_get_student.return_value = None
-        exam = Exam.objects.create(**self.exam_data)
-        attempt_data = {'exam_id': exam.id, 'score': 70}
+    @patch('exams.views.ExamGRPCClient.start_exam')
+    def test_start_exam_success(self, mock_start_exam, mock_get_student):
+        mock_get_student.return_value = MagicMock(student=self.student_data)
+        mock_start_exam.return_value = MagicMock(
+            message='Exam started', started_at='2025-10-10T09:00:00+00:00', deadline='2025-10-10T10:00:00+00:00'
+        )
         self.client.force_authenticate(user=self.user_student)
-        response = self.client.post(reverse('exam-attempt'), attempt_data, format='json')
-        self.assertEqual(response.status_code, 403)
+        response = self.client.post(reverse('exam-start'), {'exam_id': 1}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['deadline'], '2025-10-10T10:00:00+00:00')
+        mock_start_exam.assert_called_once_with(exam_id=1, student_id=1)
 
     @patch('exams.views.UserGRPCClient.get_student_by_user')
-    def test_attempt_exam_missing_fields(self, mock_get_student):
-        mock_get_student.return_value = self.student_data
+    @patch('exams.views.ExamGRPCClient.get_exam_paper')
+    def test_exam_paper_etag(self, mock_get_paper, mock_get_student):
+        mock_get_student.return_value = MagicMock(student=self.student_data)
+        mock_get_paper.return_value = MagicMock(etag='"abc"', not_modified=False, payload=b'{"exam_id":1}')
         self.client.force_authenticate(user=self.user_student)
-        response = self.client.post(reverse('exam-attempt'), {'score': 70}, format='json')
+        response = self.client.get(reverse('exam-paper', args=[1]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], '"abc"')
+        self.assertEqual(response.content, b'{"exam_id":1}')
+
+        mock_get_paper.return_value = MagicMock(etag='"abc"', not_modified=True, payload=b'')
+        response = self.client.get(reverse('exam-paper', args=[1]), HTTP_IF_NONE_MATCH='"abc"')
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(mock_get_paper.call_args.kwargs['if_none_match'], '"abc"')
+
+    @patch('exams.views.UserGRPCClient.get_teacher_by_user')
+    @patch('exams.views.ExamGRPCClient.import_questions')
+    def test_import_questions_streams_upload(self, mock_import, mock_get_teacher):
+        mock_get_teacher.return_value = self.teacher_data
+        received = []
+
+        def consume(exam_id, teacher_id, rows):
+            self.assertEqual(teacher_id, 1)
+            received.extend(rows)
+            return MagicMock(message='2 questions imported successfully', created=2, errors=[])
+
+        mock_import.side_effect = consume
+        upload = SimpleUploadedFile(
+            'bank.csv',
+            b'text,option_a,option_b,option_c,option_d,correct_option\n2+2?,1,2,3,4,d\n1+1?,2,3,4,5,a\n',
+            content_type='text/csv'
+        )
+        self.client.force_authenticate(user=self.user_teacher)
+        response = self.client.post(reverse('question-import', args=[1]), {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([n for n, _ in received], [1, 2])
+        self.assertEqual(received[0][1]['correct_option'], 'd')
+
+    @patch('exams.views.UserGRPCClient.get_teacher_by_user')
+    @patch('exams.views.ExamGRPCClient.import_questions')
+    def test_import_questions_jsonl_parse_errors(self, mock_import, mock_get_teacher):
+        mock_get_teacher.return_value = self.teacher_data
+        mock_import.side_effect = lambda exam_id, teacher_id, rows: MagicMock(
+            message='1 questions imported successfully', created=len(list(rows)), errors=[]
+        )
+        upload = SimpleUploadedFile(
+            'bank.jsonl',
+            b'{"text": "Q", "option_a": "1", "option_b": "2", "option_c": "3", "option_d": "4", "correct_option": "b"}\nnot json\n',
+        )
+        self.client.force_authenticate(user=self.user_teacher)
+        response = self.client.post(reverse('question-import', args=[1]), {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(len(response.data['errors']), 1)
+        self.assertTrue(response.data['errors'][0].startswith('Row 2'))
+
+    def test_import_questions_rejects_other_formats(self):
+        upload = SimpleUploadedFile('bank.txt', b'hello')
+        self.client.force_authenticate(user=self.user_teacher)
+        response = self.client.post(reverse('question-import', args=[1]), {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+
+    @patch('exams.views.UserGRPCClient.get_teacher_by_user')
+    @patch('exams.views.ExamGRPCClient.import_questions')
+    def test_import_questions_other_teachers_exam(self, mock_import, mock_get_teacher):
+        mock_get_teacher.return_value = self.teacher_data
+        error = grpc.RpcError()
+        error.code = lambda: grpc.StatusCode.PERMISSION_DENIED
+        error.details = lambda: 'Exam belongs to another teacher'
+        mock_import.side_effect = error
+        upload = SimpleUploadedFile('bank.csv', b'text,option_a,option_b,option_c,option_d,correct_option\n')
+        self.client.force_authenticate(user=self.user_teacher)
+        response = self.client.post(reverse('question-import', args=[1]), {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 403)
+
+    @patch('exams.views.UserGRPCClient.get_teacher_by_user')
+    @patch('exams.views.ExamGRPCClient.get_exam_stats')
+    def test_exam_stats_success(self, mock_get_stats, mock_get_teacher):
+        mock_get_teacher.return_value = self.teacher_data
+        mock_get_stats.return_value = MagicMock(
+            scope='exam', count=2, mean=70.0, median=70.0, min=60.0, max=80.0, pass_rate=1.0,
+            percentiles=[MagicMock(percentile=50, value=70.0)],
+            histogram=[MagicMock(lower=60, upper=70, count=1), MagicMock(lower=70, upper=80, count=1)]
+        )
+        self.client.force_authenticate(user=self.user_teacher)
+        response = self.client.get(reverse('exam-stats'), {'exam_id': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_get_stats.call_args.args, (1,))
+        self.assertEqual(response.data['percentiles'], {'50': 70.0})
+        self.assertEqual(len(response.data['histogram']), 2)
+
+    @patch('exams.views.UserGRPCClient.get_teacher_by_user')
+    @patch('exams.views.ExamGRPCClient.get_exam_stats')
+    def test_exam_stats_other_teachers_exam(self, mock_get_stats, mock_get_teacher):
+        mock_get_teacher.return_value = self.teacher_data
+        error = grpc.RpcError()
+        error.code = lambda: grpc.StatusCode.PERMISSION_DENIED
+        error.details = lambda: 'Stats are only available for your own exams'
+        mock_get_stats.side_effect = error
+        self.client.force_authenticate(user=self.user_teacher)
+        response = self.client.get(reverse('exam-stats'), {'exam_id': 1})
+        self.assertEqual(response.status_code, 403)
+
+    def test_exam_stats_requires_one_scope(self):
+        self.client.force_authenticate(user=self.user_teacher)
+        response = self.client.get(reverse('exam-stats'), {'exam_id': 1, 'subject': 'Math'})
         self.assertEqual(response.status_code, 400)
-        self.assertIn('exam_id', response.data)
 
     @patch('exams.views.UserGRPCClient.get_student_by_user')
-    @patch('exams.views.ExamGRPCClient.attempt_exam')
-    def test_attempt_exam_invalid_exam_id(self, mock_attempt_exam, mock_get_student):
-        mock_get_student.return_value = self.student_data
-        mock_error = grpc.RpcError()
-        mock_error.code = lambda: grpc.StatusCode.NOT_FOUND
-        mock_error.details = lambda: 'Exam not found'
-        mock_attempt_exam.side_effect = mock_error
-        attempt_data = {'exam_id': 999, 'score': 70}
+    @patch('exams.views.ExamGRPCClient.get_student_dashboard')
+    def test_student_dashboard_success(self, mock_get_dashboard, mock_get_student):
+        mock_get_student.return_value = MagicMock(student=self.student_data)
+        attempted = MagicMock(exam_id=1, title='Math', subject='Science', date='2025-10-10', duration=90, teacher_id=1, status='attempted', score=75)
+        pending = MagicMock(exam_id=2, title='Art', subject='Drawing', date='2025-10-11', duration=30, teacher_id=1, status='assigned', score=0)
+        mock_get_dashboard.return_value = MagicMock(exams=[attempted, pending])
         self.client.force_authenticate(user=self.user_student)
-        response = self.client.post(reverse('exam-attempt'), attempt_data, format='json')
-        self.assertEqual(response.status_code, 500)
+        response = self.client.get(reverse('student-dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['score'], 75)
+        self.assertIsNone(response.data[1]['score'])
+
+    def test_student_dashboard_not_student(self):
+        self.client.force_authenticate(user=self.user_teacher)
+        response = self.client.get(reverse('student-dashboard'))
+        self.assertEqual(response.status_code, 403)
 
     @patch('exams.views.UserGRPCClient.get_student_by_user')
-    @patch('exams.views.ExamGRPCClient.attempt_exam')
-    def test_attempt_exam_grpc_error(self, mock_attempt_exam, mock_get_student):
-        mock_get_student.return_value = self.student_data
-        mock_error = grpc.RpcError()
-        mock_error.code = lambda: grpc.StatusCode.UNAVAILABLE
-        mock_error.details = lambda: 'Exam attempt failed'
-        mock_attempt_exam.side_effect = mock_error
-        exam = Exam.objects.create(**self.exam_data)
-        attempt_data = {'exam_id': exam.id, 'score': 80}
+    def test_submit_exam_not_student(self, mock_get_student):
+        mock_get_student.return_value = None
+        data = {'exam_id': 1, 'answers': [{'question_id': 1, 'selected_option': 'A'}]}
         self.client.force_authenticate(user=self.user_student)
-        response = self.client.post(reverse('exam-attempt'), attempt_data, format='json')
-        self.assertEqual(response.status_code, 500)
+        response = self.client.post(reverse('exam-submit'), data, format='json')
+        self.assertEqual(response.status_code, 403)
 
-    def test_attempt_exam_unauthenticated(self):
-        exam = Exam.objects.create(**self.exam_data)
-        attempt_data = {'exam_id': exam.id, 'score': 70}
-        response = self.client.post(reverse('exam-attempt'), attempt_data, format='json')
+    @patch('exams.views.UserGRPCClient.get_student_by_user')
+    @patch('exams.views.ExamGRPCClient.submit_exam')
+    def test_submit_exam_rejections(self, mock_submit_exam, mock_get_student):
+        mock_get_student.return_value = MagicMock(student=self.student_data)
+        data = {'exam_id': 1, 'answers': [{'question_id': 1, 'selected_option': 'A'}]}
+        self.client.force_authenticate(user=self.user_student)
+        for code, expected in [
+            (grpc.StatusCode.NOT_FOUND, 404),
+            (grpc.StatusCode.ALREADY_EXISTS, 409),
+            (grpc.StatusCode.FAILED_PRECONDITION, 403),
+            (grpc.StatusCode.UNAVAILABLE, 500),
+        ]:
+            mock_error = grpc.RpcError()
+            mock_error.code = lambda code=code: code
+            mock_error.details = lambda: 'rejected'
+            mock_submit_exam.side_effect = mock_error
+            response = self.client.post(reverse('exam-submit'), data, format='json')
+            self.assertEqual(response.status_code, expected)
+
+    def test_submit_exam_unauthenticated(self):
+        data = {'exam_id': 1, 'answers': [{'question_id': 1, 'selected_option': 'A'}]}
+        response = self.client.post(reverse('exam-submit'), data, format='json')
         self.assertEqual(response.status_code, 403)
 
     @patch('exams.exam_client.grpc.insecure_channel')
@@ -458,14 +602,6 @@ class ExamViewsTestCase(TestCase):
         self.assertEqual(len(result.exams), 1)
         self.assertEqual(result.exams[0].title, 'Math')
 
-    @patch('exams.exam_client.exam_pb2_grpc.ExamServiceStub')
-    def test_exam_grpc_client_attempt_exam(self, mock_stub):
-        client = ExamGRPCClient()
-        mock_stub_instance = mock_stub.return_value
-        mock_stub_instance.AttemptExam.return_value = MagicMock(message='Submitted')
-        result = client.attempt_exam(1, 1, 80)
-        mock_stub_instance.AttemptExam.assert_called_once()
-        self.assertEqual(result.message, 'Submitted')
 
 class ExamServiceTestCase(TestCase):
     def setUp(self):
@@ -503,7 +639,8 @@ class ExamServiceTestCase(TestCase):
     @patch('exams.grpc_server.Exam.objects.get')
     @patch('exams.grpc_server.ExamAssignment.objects.get_or_create')
     @patch('exams.grpc_server.publish_event')
-    def test_AssignExam_success(self, mock_publish, mock_get_or_create, mock_get):
+    @patch('exams.grpc_server.record_assignments')
+    def test_AssignExam_success(self, mock_record, mock_publish, mock_get_or_create, mock_get):
         mock_exam = MagicMock(id=1)
         mock_get.return_value = mock_exam
         request = MagicMock(exam_id=1, student_id=[1, 2, 3])
@@ -511,18 +648,57 @@ class ExamServiceTestCase(TestCase):
         self.assertIn('Exam assigned to 3 students', response.message)
         mock_publish.assert_called()
 
-    @patch('exams.grpc_server.ExamAssignment.objects.filter')
-    @patch('exams.grpc_server.StudentExamAttempt.objects.filter')
-    def test_GetExamsByStudent(self, mock_attempt_filter, mock_assign_filter):
-        exam1 = MagicMock(id=1, title='Math', subject='Algebra', date=date.today(), duration=60, teacher_id=10)
-        assign1 = MagicMock(exam=exam1)
-        mock_assign_filter.return_value = [assign1]
-        mock_attempt_filter.return_value.values_list.return_value = []
+    @patch('exams.grpc_server.student_dashboard')
+    def test_GetExamsByStudent(self, mock_dashboard):
+        row = dict(exam_id=1, title='Math', subject='Algebra', date=date.today(), duration=60, teacher_id=10)
+        mock_dashboard.return_value = [row]
         request = MagicMock(student_id=1)
         response = self.service.GetExamsByStudent(request, self.context)
+        mock_dashboard.assert_called_once_with(1, status='assigned')
         self.assertEqual(len(response.exams), 1)
         self.assertEqual(response.exams[0].title, 'Math')
 
+    def _answers(self, exam, options):
+        questions = Question.objects.filter(exam=exam).order_by('id')
+        return [MagicMock(question_id=q.id, selected_option=option) for q, option in zip(questions, options)]
+
+    def _submit(self, exam, student_id, options, context=None):
+        request = MagicMock(exam_id=exam.id, student_id=student_id, answers=self._answers(exam, options))
+        return self.service.SubmitExam(request, context or self.context)
+
+    @patch('exams.grpc_server.publish_event')
+    def test_dashboard_tracks_assign_and_attempt(self, mock_publish):
+        cache.clear()
+        exam, _ = self._exam_with_questions(['a', 'b', 'c', 'd'])
+        self.service.AssignExam(MagicMock(exam_id=exam.id, student_id=[1, 2]), self.context)
+        self.service.AssignExam(MagicMock(exam_id=exam.id, student_id=[1]), self.context)
+        self.assertEqual(StudentExamStatus.objects.filter(exam=exam).count(), 2)
+
+        self.service.StartExam(MagicMock(exam_id=exam.id, student_id=1), self.context)
+        self._submit(exam, 1, ['A', 'B', 'C', 'A'])
+
+        pending = self.service.GetExamsByStudent(MagicMock(student_id=1), self.context)
+        self.assertEqual(len(pending.exams), 0)
+        dashboard = self.service.GetStudentDashboard(MagicMock(student_id=1), self.context)
+        self.assertEqual(len(dashboard.exams), 1)
+        self.assertEqual(dashboard.exams[0].status, 'attempted')
+        self.assertEqual(dashboard.exams[0].score, 75)
+        other = self.service.GetExamsByStudent(MagicMock(student_id=2), self.context)
+        self.assertEqual([e.exam_id for e in other.exams], [exam.id])
+
+    def test_dashboard_follows_exam_edits(self):
+        exam, _ = self._exam_with_questions(['a'])
+        record_assignments(exam, [1, 2])
+        exam.title = 'Physics (rescheduled)'
+        exam.date = date.today() + timedelta(days=7)
+        exam.save()
+        rows = StudentExamStatus.objects.filter(exam=exam).values_list('title', 'date').distinct()
+        self.assertEqual(list(rows), [('Physics (rescheduled)', exam.date)])
+
+        exam.duration = 45
+        exam.save(update_fields=['content_version'])
+        self.assertFalse(StudentExamStatus.objects.filter(exam=exam, duration=45).exists())
+
     @patch('exams.grpc_server.Exam.objects.filter')
     def test_GetExamsByTeacher(self, mock_filter):
         exam1 = MagicMock(id=1, title='Math', subject='Algebra', date=date.today(), duration=60, teacher_id=10)
@@ -532,26 +708,362 @@ class ExamServiceTestCase(TestCase):
         self.assertEqual(len(response.exams), 1)
         self.assertEqual(response.exams[0].title, 'Math')
 
-    @patch('exams.grpc_server.StudentExamAttempt.objects.filter')
-    @patch('exams.grpc_server.Exam.objects.get')
-    @patch('exams.grpc_server.StudentExamAttempt.objects.create')
-    def test_AttemptExam_success(self, mock_create, mock_get, mock_filter):
-        mock_exam = MagicMock(id=1)
-        mock_get.return_value = mock_exam
-        mock_filter.return_value.exists.return_value = False
-        request = MagicMock(exam_id=1, student_id=1, score=95)
-        response = self.service.AttemptExam(request, self.context)
+    def test_SubmitExam_success(self):
+        cache.clear()
+        exam, _ = self._exam_with_questions(['a', 'b'])
+        self.service.StartExam(MagicMock(exam_id=exam.id, student_id=1), self.context)
+        response = self._submit(exam, 1, ['A', 'B'])
         self.assertEqual(response.message, 'Exam submitted successfully')
+        attempt = StudentExamAttempt.objects.get(exam=exam, student_id=1)
+        self.assertTrue(attempt.submitted)
+        self.assertEqual(attempt.score, 100)
 
-    @patch('exams.grpc_server.Exam.objects.get')
-    def test_AttemptExam_not_found(self, mock_get):
-        mock_get.side_effect = Exam.DoesNotExist
-        request = MagicMock(exam_id=1, student_id=1, score=95)
-        response = self.service.AttemptExam(request, self.context)
+    def test_SubmitExam_not_found(self):
+        request = MagicMock(exam_id=999, student_id=1, answers=[])
+        response = self.service.SubmitExam(request, self.context)
         self.context.set_code.assert_called_with(grpc.StatusCode.NOT_FOUND)
         self.context.set_details.assert_called_with('Exam not found')
         self.assertEqual(response.message, 'Exam not found')
+        self.assertFalse(StudentExamAttempt.objects.exists())
+
+    def test_SubmitExam_requires_started_attempt(self):
+        cache.clear()
+        exam, _ = self._exam_with_questions(['a'])
+        response = self._submit(exam, 1, ['A'])
+        self.context.set_code.assert_called_with(grpc.StatusCode.FAILED_PRECONDITION)
+        self.assertEqual(response.message, 'Exam not started')
+        self.assertFalse(StudentExamAttempt.objects.exists())
+
+    def test_SubmitExam_duplicate_rejected(self):
+        cache.clear()
+        exam, _ = self._exam_with_questions(['a', 'b'])
+        self.service.StartExam(MagicMock(exam_id=exam.id, student_id=1), self.context)
+        self._submit(exam, 1, ['A', 'B'])
+        response = self._submit(exam, 1, ['C', 'C'])
+        self.context.set_code.assert_called_with(grpc.StatusCode.ALREADY_EXISTS)
+        self.assertEqual(response.message, 'Exam already submitted')
+        self.assertEqual(StudentExamAttempt.objects.get(exam=exam, student_id=1).score, 100)
+
+    def test_StartExam_then_SubmitExam_within_window(self):
+        cache.clear()
+        exam, _ = self._exam_with_questions(['a', 'b'])
+        started = self.service.StartExam(MagicMock(exam_id=exam.id, student_id=1), self.context)
+        self.assertEqual(started.message, 'Exam started')
+        again = self.service.StartExam(MagicMock(exam_id=exam.id, student_id=1), self.context)
+        self.assertEqual(again.started_at, started.started_at)
+
+        exam.refresh_from_db()  # question inserts bumped content_version
+        load_answer_key(exam)
+        request = MagicMock(exam_id=exam.id, student_id=1, answers=self._answers(exam, ['A', 'C']))
+        # exam, savepoint, UPDATE, id lookup, answers INSERT, dashboard UPDATE, release
+        with self.assertNumQueries(7):
+            self.service.SubmitExam(request, self.context)
+        attempt = StudentExamAttempt.objects.get(exam=exam, student_id=1)
+        self.assertTrue(attempt.submitted)
+        self.assertEqual(attempt.score, 50)
+
+    def test_SubmitExam_time_over(self):
+        cache.clear()
+        exam, _ = self._exam_with_questions(['a'])
+        self.service.StartExam(MagicMock(exam_id=exam.id, student_id=1), self.context)
+        StudentExamAttempt.objects.filter(exam=exam).update(started_at=timezone.now() - timedelta(minutes=31))
+        response = self._submit(exam, 1, ['A'])
+        self.context.set_code.assert_called_with(grpc.StatusCode.FAILED_PRECONDITION)
+        self.assertEqual(response.message, 'Exam time is over')
+        self.assertFalse(StudentExamAttempt.objects.get(exam=exam, student_id=1).submitted)
+
+    def test_compute_stats(self):
+        stats = compute_stats([10, 40, 60, 90, 100], pass_mark=40)
+        self.assertEqual(stats['count'], 5)
+        self.assertEqual(stats['mean'], 60.0)
+        self.assertEqual(stats['median'], 60.0)
+        self.assertEqual(stats['pass_rate'], 0.8)
+        self.assertEqual(stats['percentiles'][25], 40.0)
+        self.assertEqual(sum(count for _, _, count in stats['histogram']), 5)
+        self.assertEqual(stats['histogram'][-1], (90, 100, 2))
+
+    def test_GetExamStats_invalidated_by_attempt(self):
+        cache.clear()
+        exam, _ = self._exam_with_questions(['a', 'b'])
+        StudentExamAttempt.objects.create(exam=exam, student_id=1, score=30, submitted=True)
+        request = MagicMock(exam_id=exam.id, teacher_id=0, subject='', pass_mark=0, requester_id=10)
+        first = self.service.GetExamStats(request, self.context)
+        self.assertEqual(first.count, 1)
+        self.assertEqual(first.pass_rate, 0.0)
+
+        self.service.StartExam(MagicMock(exam_id=exam.id, student_id=2), self.context)
+        with self.captureOnCommitCallbacks(execute=True):
+            self._submit(exam, 2, ['A', 'B'])
+        second = self.service.GetExamStats(request, self.context)
+        self.assertEqual(second.count, 2)
+        self.assertEqual(second.mean, 65.0)
+        self.assertEqual(second.pass_rate, 0.5)
+        by_subject = self.service.GetExamStats(MagicMock(exam_id=0, teacher_id=0, subject='Physics', pass_mark=101, requester_id=10), self.context)
+        self.assertEqual(by_subject.count, 2)
+        self.assertEqual(by_subject.pass_rate, 0.0)
+        other_teacher = self.service.GetExamStats(MagicMock(exam_id=0, teacher_id=0, subject='Physics', pass_mark=0, requester_id=11), self.context)
+        self.assertEqual(other_teacher.count, 0)
+
+    def test_GetExamStats_only_own_exams(self):
+        exam, _ = self._exam_with_questions(['a'])
+        StudentExamAttempt.objects.create(exam=exam, student_id=1, score=30, submitted=True)
+        for request in (
+            MagicMock(exam_id=exam.id, teacher_id=0, subject='', pass_mark=0, requester_id=11),
+            MagicMock(exam_id=0, teacher_id=10, subject='', pass_mark=0, requester_id=11),
+            MagicMock(exam_id=exam.id, teacher_id=0, subject='', pass_mark=0, requester_id=0),
+        ):
+            self.context.reset_mock()
+            response = self.service.GetExamStats(request, self.context)
+            self.context.set_code.assert_called_with(grpc.StatusCode.PERMISSION_DENIED)
+            self.assertEqual(response.count, 0)
+
+    def test_grade(self):
+        key = (np.array([3, 5, 9]), np.array([0, 2, 3], dtype=np.uint8))
+        self.assertEqual(grade(key, [(9, 'D'), (3, 'a')]), (2, 3))
+        self.assertEqual(grade(key, [(5, 'B')]), (0, 3))
+        with self.assertRaises(GradingError):
+            grade(key, [(4, 'A')])
+        with self.assertRaises(GradingError):
+            grade(key, [(3, 'A'), (3, 'B')])
+        with self.assertRaises(GradingError):
+            grade(key, [(3, 'E')])
+        with self.assertRaises(GradingError):
+            grade(key, [(3, '')])
+        with self.assertRaises(GradingError):
+            grade(key, [(5, 'bc')])
+
+    def _exam_with_questions(self, answers):
+        exam = Exam.objects.create(title='Quiz', subject='Physics', date=date.today(), duration=30, teacher_id=10)
+        questions = [
+            Question.objects.create(exam=exam, text=f'Q{i}', option_a='1', option_b='2', option_c='3', option_d='4', correct_option=opt)
+            for i, opt in enumerate(answers)
+        ]
+        return exam, questions
+
+    def test_SubmitExam_grades_on_server(self):
+        cache.clear()
+        exam, questions = self._exam_with_questions(['a', 'b', 'c', 'd'])
+        answers = [
+            MagicMock(question_id=questions[0].id, selected_option='A'),
+            MagicMock(question_id=questions[1].id, selected_option='B'),
+            MagicMock(question_id=questions[2].id, selected_option='D'),
+        ]
+        self.service.StartExam(MagicMock(exam_id=exam.id, student_id=7), self.context)
+        response = self.service.SubmitExam(MagicMock(exam_id=exam.id, student_id=7, answers=answers), self.context)
+        self.assertEqual((response.score, response.correct, response.total), (50, 2, 4))
+        attempt = StudentExamAttempt.objects.get(exam=exam, student_id=7)
+        self.assertEqual(attempt.score, 50)
+        self.assertEqual(StudentAnswer.objects.filter(attempt=attempt).count(), 3)
+        exam.refresh_from_db()
+        with self.assertNumQueries(0):
+            load_answer_key(exam)
+
+        again = self.service.SubmitExam(MagicMock(exam_id=exam.id, student_id=7, answers=answers), self.context)
+        self.assertEqual(again.message, 'Exam already submitted')
+
+    def test_SubmitExam_rejects_foreign_question(self):
+        cache.clear()
+        exam, _ = self._exam_with_questions(['a'])
+        other, other_questions = self._exam_with_questions(['b'])
+        answers = [MagicMock(question_id=other_questions[0].id, selected_option='B')]
+        self.service.SubmitExam(MagicMock(exam_id=exam.id, student_id=7, answers=answers), self.context)
+        self.context.set_code.assert_called_with(grpc.StatusCode.INVALID_ARGUMENT)
+        self.assertFalse(StudentExamAttempt.objects.filter(exam=exam).exists())
+
+    def test_SubmitExam_write_behind(self):
+        cache.clear()
+        exam, _ = self._exam_with_questions(['a', 'b'])
+        StudentExamStatus.objects.create(
+            student_id=1, exam=exam, title=exam.title, subject=exam.subject, date=exam.date, duration=30, teacher_id=10
+        )
+        for student_id in (1, 2):
+            self.service.StartExam(MagicMock(exam_id=exam.id, student_id=student_id), self.context)
+        with tempfile.TemporaryDirectory() as tmp:
+            buffer = SubmissionBuffer(journal_dir=tmp, batch_size=1000, flush_interval=60)
+            buffer.start()
+            with patch('exams.grpc_server.get_buffer', return_value=buffer):
+                first = self._submit(exam, 1, ['A', 'B'])
+                self._submit(exam, 2, ['A', 'C'])
+                duplicate = self._submit(exam, 1, ['C', 'C'])
+                self.context.set_code.assert_called_with(grpc.StatusCode.ALREADY_EXISTS)
+                self.assertEqual(duplicate.message, 'Exam already submitted')
+                missing = self.service.SubmitExam(MagicMock(exam_id=999, student_id=1, answers=[]), self.context)
+                self.context.set_code.assert_called_with(grpc.StatusCode.NOT_FOUND)
+                self.assertEqual(missing.message, 'Exam not found')
+            self.assertEqual((first.message, first.score), ('Exam submission received', 100))
+            self.assertFalse(StudentExamAttempt.objects.filter(submitted=True).exists())
+
+            buffer.stop()
+            self.assertEqual(os.listdir(tmp), [])
+            with patch('exams.grpc_server.get_buffer', return_value=buffer):
+                self.service.StartExam(MagicMock(exam_id=exam.id, student_id=3), self.context)
+                late = self._submit(exam, 3, ['A', 'B'])
+                self.context.set_code.assert_called_with(grpc.StatusCode.INTERNAL)
+                self.assertEqual(late.message, 'Error submitting exam')
+            self.assertEqual(os.listdir(tmp), [])
+        scores = dict(StudentExamAttempt.objects.filter(exam=exam).values_list('student_id', 'score'))
+        self.assertEqual(scores, {1: 100, 2: 50, 3: None})
+        self.assertEqual(StudentAnswer.objects.filter(attempt__exam=exam).count(), 4)
+        self.assertEqual(StudentExamStatus.objects.get(exam=exam, student_id=1).status, 'attempted')
+
+    def test_SubmitExam_write_behind_flushed_after_deadline(self):
+        cache.clear()
+        exam, _ = self._exam_with_questions(['a', 'b', 'c', 'd'])
+        self.service.StartExam(MagicMock(exam_id=exam.id, student_id=1), self.context)
+        with tempfile.TemporaryDirectory() as tmp:
+            buffer = SubmissionBuffer(journal_dir=tmp, batch_size=1000, flush_interval=60)
+            buffer.start()
+            with patch('exams.grpc_server.get_buffer', return_value=buffer):
+                response = self._submit(exam, 1, ['A', 'B', 'C', 'A'])
+                self.assertEqual(response.message, 'Exam submission received')
+                again = self._submit(exam, 1, ['A', 'B', 'C', 'D'])
+                self.context.set_code.assert_called_with(grpc.StatusCode.ALREADY_EXISTS)
+                self.assertEqual(again.message, 'Exam already submitted')
+            # submitted in time, but the window has closed by the time the flush runs
+            with patch('django.utils.timezone.now', return_value=timezone.now() + timedelta(minutes=31)):
+                buffer.stop()
+        attempt = StudentExamAttempt.objects.get(exam=exam, student_id=1)
+        self.assertTrue(attempt.submitted)
+        self.assertEqual(attempt.score, 75)
+
+    def test_submission_journal_replayed_after_crash(self):
+        exam = Exam.objects.create(title='Math', subject='Algebra', date=date.today(), duration=60, teacher_id=10)
+        StudentExamAttempt.objects.create(exam=exam, student_id=1, score=50, submitted=True)
+        for student_id in (2, 3):
+            start_attempt(exam.id, student_id)
+        with tempfile.TemporaryDirectory() as tmp:
+            # a segment that was mid-flush and a live journal ending in a torn write
+            with open(os.path.join(tmp, 'submissions.3.flushing'), 'w') as f:
+                f.write(json.dumps({'exam_id': exam.id, 'student_id': 1, 'score': 50}) + '\n')
+                f.write(json.dumps({'exam_id': exam.id, 'student_id': 2, 'score': 70}) + '\n')
+            with open(os.path.join(tmp, 'submissions.jsonl'), 'w') as f:
+                f.write(json.dumps({'exam_id': exam.id, 'student_id': 3, 'score': 90}) + '\n')
+                f.write('{"exam_id": ')
+            SubmissionBuffer(journal_dir=tmp, batch_size=1).replay()
+            self.assertEqual(os.listdir(tmp), [])
+        scores = dict(StudentExamAttempt.objects.filter(exam=exam).values_list('student_id', 'score'))
+        self.assertEqual(scores, {1: 50, 2: 70, 3: 90})
+
+    def test_GetExamPaper_cached_per_version(self):
+        cache.clear()
+        papers._papers.clear()
+        exam, questions = self._exam_with_questions(['a', 'b'])
+        StudentExamStatus.objects.create(
+            student_id=3, exam=exam, title=exam.title, subject=exam.subject,
+            date=exam.date, duration=exam.duration, teacher_id=exam.teacher_id
+        )
+        start_attempt(exam.id, 3)
+        with tempfile.TemporaryDirectory() as tmp, override_settings(EXAM_PAPER_CACHE_DIR=tmp):
+            first = self.service.GetExamPaper(MagicMock(exam_id=exam.id, student_id=3, if_none_match=''), self.context)
+            paper = json.loads(first.payload)
+            self.assertEqual(len(paper['questions']), 2)
+            self.assertNotIn('correct_option', first.payload.decode())
+
+            with self.assertNumQueries(0):
+                etag, _ = papers.get_paper(exam.id)
+            self.assertEqual(etag, first.etag)
+
+            same = self.service.GetExamPaper(MagicMock(exam_id=exam.id, student_id=3, if_none_match=first.etag), self.context)
+            self.assertTrue(same.not_modified)
+            self.assertEqual(same.payload, b'')
+
+            papers._papers.clear()
+            with self.assertNumQueries(1):  # version lookup only, payload comes from disk
+                cache.delete(Exam.content_version_cache_key(exam.id))
+                self.assertEqual(papers.get_paper(exam.id)[0], first.etag)
+
+            questions[0].text = 'Changed'
+            questions[0].save()
+            changed = self.service.GetExamPaper(MagicMock(exam_id=exam.id, student_id=3, if_none_match=first.etag), self.context)
+            self.assertFalse(changed.not_modified)
+            self.assertNotEqual(changed.etag, first.etag)
+            self.assertEqual(json.loads(changed.payload)['questions'][0]['text'], 'Changed')
+
+    def test_GetExamPaper_requires_assignment_and_start(self):
+        exam, _ = self._exam_with_questions(['a'])
+        StudentExamStatus.objects.create(
+            student_id=3, exam=exam, title=exam.title, subject=exam.subject,
+            date=exam.date, duration=exam.duration, teacher_id=exam.teacher_id
+        )
+        for student_id in (99, 0):
+            response = self.service.GetExamPaper(
+                MagicMock(exam_id=exam.id, student_id=student_id, if_none_match=''), self.context
+            )
+            self.context.set_code.assert_called_with(grpc.StatusCode.PERMISSION_DENIED)
+            self.assertEqual(response.payload, b'')
+
+        self.service.GetExamPaper(MagicMock(exam_id=exam.id, student_id=3, if_none_match=''), self.context)
+        self.context.set_code.assert_called_with(grpc.StatusCode.FAILED_PRECONDITION)
+        self.context.set_details.assert_called_with('Exam not started')
+
+    def test_import_questions_in_chunks(self):
+        exam = Exam.objects.create(title='Bank', subject='Math', date=date.today(), duration=30, teacher_id=10)
+        good = {'text': 'Q', 'option_a': '1', 'option_b': '2', 'option_c': '3', 'option_d': '4', 'correct_option': 'C'}
+        rows = [(1, good), (2, good), (3, dict(good, correct_option='e', option_b='')), (4, good), (5, good)]
+        created, errors = import_questions(exam, iter(rows), chunk_size=2)
+        self.assertEqual(created, 4)
+        self.assertEqual(len(errors), 1)
+        self.assertIn('Row 3', errors[0])
+        self.assertIn('option_b is required', errors[0])
+        self.assertIn('correct_option', errors[0])
+        self.assertEqual(Question.objects.filter(exam=exam, correct_option='c').count(), 4)
+        exam.refresh_from_db()
+        self.assertEqual(exam.content_version, 2)
+
+    def test_ImportQuestions_rpc(self):
+        exam = Exam.objects.create(title='Bank', subject='Math', date=date.today(), duration=30, teacher_id=10)
+        rows = [
+            MagicMock(exam_id=exam.id, teacher_id=10, row_number=i, text=f'Q{i}', option_a='1', option_b='2', option_c='3', option_d='4', correct_option='a')
+            for i in range(1, 4)
+        ]
+        denied = self.service.ImportQuestions(iter([MagicMock(exam_id=exam.id, teacher_id=11)]), self.context)
+        self.context.set_code.assert_called_with(grpc.StatusCode.PERMISSION_DENIED)
+        self.assertEqual(denied.created, 0)
+        self.assertFalse(Question.objects.filter(exam=exam).exists())
+
+        response = self.service.ImportQuestions(iter(rows), self.context)
+        self.assertEqual(response.created, 3)
+        self.assertEqual(list(response.errors), [])
+
+        missing = self.service.ImportQuestions(iter([MagicMock(exam_id=9999)]), self.context)
+        self.assertEqual(missing.message, 'Exam not found')
+
+    def test_GetExamStats_requires_scope(self):
+        request = MagicMock(exam_id=0, teacher_id=0, subject='', pass_mark=0, requester_id=10)
+        self.service.GetExamStats(request, self.context)
+        self.context.set_code.assert_called_with(grpc.StatusCode.INVALID_ARGUMENT)
 
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
+
+
+class ExamQueryPlanTestCase(QueryPlanMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = ExamService()
+        self.exam = Exam.objects.create(title='Math', subject='Algebra', date=date.today(), duration=60, teacher_id=10)
+        self.question = Question.objects.create(
+            exam=self.exam, text='2+2?', option_a='3', option_b='4', option_c='5', option_d='6', correct_option='b'
+        )
+
+    @patch('exams.grpc_server.publish_event')
+    def test_hot_rpcs_use_indexes(self, mock_publish):
+        exam_id = self.exam.id
+        with self.assertNoFullTableScans():
+            self.service.AssignExam(MagicMock(exam_id=exam_id, student_id=[1, 2]), MagicMock())
+            self.service.GetExamsByTeacher(MagicMock(teacher_id=10), MagicMock())
+            self.service.GetExamsByStudent(MagicMock(student_id=1), MagicMock())
+            self.service.GetStudentDashboard(MagicMock(student_id=1), MagicMock())
+            self.service.StartExam(MagicMock(exam_id=exam_id, student_id=1), MagicMock())
+            self.service.StartExam(MagicMock(exam_id=exam_id, student_id=2), MagicMock())
+            for student_id, option in ((1, 'B'), (2, 'C')):
+                answers = [MagicMock(question_id=self.question.id, selected_option=option)]
+                self.service.SubmitExam(MagicMock(exam_id=exam_id, student_id=student_id, answers=answers), MagicMock())
+            for scope in (
+                MagicMock(exam_id=exam_id, teacher_id=0, subject='', pass_mark=0, requester_id=10),
+                MagicMock(exam_id=0, teacher_id=10, subject='', pass_mark=0, requester_id=10),
+                MagicMock(exam_id=0, teacher_id=0, subject='Algebra', pass_mark=0, requester_id=10),
+            ):
+                self.service.GetExamStats(scope, MagicMock())
+        self.assertEqual(StudentExamAttempt.objects.filter(exam=self.exam, submitted=True).count(), 2)
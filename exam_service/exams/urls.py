@@ -7,12 +7,19 @@ from .views import (
     ExamCreateView,
     AssignExamView,
     TeacherCreatedExamsView,
-    StudentAssignedExamsView,AttemptExamView
+    StudentAssignedExamsView,
+    StudentExamDashboardView, ExamStatsView, SubmitExamView, StartExamView,
+    ExamPaperView, ImportQuestionsView
 )
 urlpatterns = [
     path("exams", ExamCreateView.as_view(), name="create-exam"),
     path('exams/assign/', AssignExamView.as_view(), name='exam-assign'),
     path("exams/teacher/", TeacherCreatedExamsView.as_view(), name="teacher-exams"),
     path("exams/student/", StudentAssignedExamsView.as_view(), name="student-exams"),
-    path('exam/attempt/', AttemptExamView.as_view(), name='exam-attempt'),
+    path("exams/student/dashboard/", StudentExamDashboardView.as_view(), name="student-dashboard"),
+    path("exams/stats/", ExamStatsView.as_view(), name="exam-stats"),
+    path('exam/submit/', SubmitExamView.as_view(), name='exam-submit'),
+    path('exam/start/', StartExamView.as_view(), name='exam-start'),
+    path("exams/<int:exam_id>/paper/", ExamPaperView.as_view(), name="exam-paper"),
+    path("exams/<int:exam_id>/questions/import/", ImportQuestionsView.as_view(), name="question-import"),
 ]
@@ -1,4 +1,9 @@
 from rest_framework.views import APIView
+from django.http import HttpResponse
+from rest_framework.parsers import MultiPartParser
+from io import TextIOWrapper
+import csv
+import json
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
@@ -7,7 +12,7 @@ import logging
 from .grpc_client import UserGRPCClient
 from .exam_client import ExamGRPCClient
 from rest_framework import permissions
-from .serializers import ExamAttemptSerializer, ExamSerializer, ExamAssignmentSerializer
+from .serializers import ExamSerializer, ExamAssignmentSerializer, ExamStatsQuerySerializer, SubmitExamSerializer, StartExamSerializer
 from .permission import IsStudent, IsTeacher
 # logger = logging.getLogger(__name__)
 
@@ -207,6 +212,142 @@ class TeacherCreatedExamsView(APIView):
         finally:
             client.close()
 
+class ExamStatsView(APIView):
+    permission_classes = [IsAuthenticated, IsTeacher]
+
+    def get(self, request):
+        serializer = ExamStatsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        user_client = UserGRPCClient(timeout_seconds=5)
+        try:
+            try:
+                teacher_response = user_client.get_teacher_by_user(request.user.id)
+            except grpc.RpcError as e:
+                try:
+                    details = e.details()
+                except Exception:
+                    details = str(e)
+                return Response({"error": "User service error", "detail": details}, status=status.HTTP_502_BAD_GATEWAY)
+
+            teacher_id = getattr(teacher_response, 'teacher_id', 0)
+            if not teacher_id:
+                return Response({"error": "Only teachers can view exam stats."}, status=status.HTTP_403_FORBIDDEN)
+        finally:
+            user_client.close()
+
+        client = ExamGRPCClient()
+        try:
+            response = client.get_exam_stats(
+                teacher_id,
+                exam_id=data.get("exam_id", 0),
+                teacher_id=data.get("teacher_id", 0),
+                subject=data.get("subject", ""),
+                pass_mark=data.get("pass_mark", 0)
+            )
+            return Response(
+                {
+                    "scope": response.scope,
+                    "count": response.count,
+                    "mean": response.mean,
+                    "median": response.median,
+                    "min": response.min,
+                    "max": response.max,
+                    "pass_rate": response.pass_rate,
+                    "percentiles": {str(p.percentile): p.value for p in response.percentiles},
+                    "histogram": [
+                        {"lower": b.lower, "upper": b.upper, "count": b.count}
+                        for b in response.histogram
+                    ],
+                },
+                status=status.HTTP_200_OK
+            )
+        except grpc.RpcError as e:
+            error_status = {
+                grpc.StatusCode.INVALID_ARGUMENT: status.HTTP_400_BAD_REQUEST,
+                grpc.StatusCode.PERMISSION_DENIED: status.HTTP_403_FORBIDDEN,
+            }.get(e.code(), status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return Response({"error": e.details()}, status=error_status)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        finally:
+            client.close()
+
+def iter_question_rows(upload, errors):
+    # yields (row_number, dict) straight off the uploaded file; nothing is buffered beyond one line
+    stream = TextIOWrapper(upload.file, encoding="utf-8")
+    if upload.name.endswith(".csv"):
+        for i, row in enumerate(csv.DictReader(stream), start=1):
+            yield i, row
+        return
+    for i, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            errors.append(f"Row {i}: invalid JSON ({e.msg})")
+            continue
+        if not isinstance(row, dict):
+            errors.append(f"Row {i}: expected a JSON object")
+            continue
+        yield i, row
+
+class ImportQuestionsView(APIView):
+    parser_classes = [MultiPartParser]
+    permission_classes = [IsAuthenticated, IsTeacher]
+
+    def post(self, request, exam_id):
+        upload = request.FILES.get("file")
+        if not upload or not upload.name.endswith((".csv", ".jsonl")):
+            return Response(
+                {"error": "Upload a .csv or .jsonl file"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        user_client = UserGRPCClient(timeout_seconds=5)
+        try:
+            try:
+                teacher_response = user_client.get_teacher_by_user(request.user.id)
+            except grpc.RpcError as e:
+                try:
+                    details = e.details()
+                except Exception:
+                    details = str(e)
+                return Response({"error": "User service error", "detail": details}, status=status.HTTP_502_BAD_GATEWAY)
+
+            teacher_id = getattr(teacher_response, 'teacher_id', 0)
+            if not teacher_id:
+                return Response({"error": "Only teachers can import questions."}, status=status.HTTP_403_FORBIDDEN)
+        finally:
+            user_client.close()
+
+        parse_errors = []
+        client = ExamGRPCClient()
+        try:
+            response = client.import_questions(exam_id, teacher_id, iter_question_rows(upload, parse_errors))
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.NOT_FOUND:
+                return Response({"error": e.details()}, status=status.HTTP_404_NOT_FOUND)
+            if e.code() == grpc.StatusCode.PERMISSION_DENIED:
+                return Response({"error": e.details()}, status=status.HTTP_403_FORBIDDEN)
+            if e.code() == grpc.StatusCode.INVALID_ARGUMENT:
+                return Response({"error": e.details(), "errors": parse_errors}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({"error": e.details()}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        finally:
+            client.close()
+
+        errors = parse_errors + list(response.errors)
+        return Response(
+            {
+                "message": response.message,
+                "created": response.created,
+                "errors": errors,
+            },
+            status=status.HTTP_201_CREATED if response.created else status.HTTP_400_BAD_REQUEST
+        )
+
 class StudentAssignedExamsView(APIView):
     def get(self, request):
         user = request.user
@@ -251,18 +392,136 @@ class StudentAssignedExamsView(APIView):
         except Exception as e:
             return Response({"error": "Failed to fetch exams", "detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class AttemptExamView(APIView):
+class StudentExamDashboardView(APIView):
+    permission_classes = [IsAuthenticated, IsStudent]
+
+    def get(self, request):
+        user = request.user
+        user_client = UserGRPCClient(timeout_seconds=5)
+        try:
+            try:
+                student_response = user_client.get_student_by_user(user.id)
+            except grpc.RpcError as e:
+                try:
+                    details = e.details()
+                except Exception:
+                    details = str(e)
+                return Response({"error": "Student GRPC error", "detail": details}, status=status.HTTP_502_BAD_GATEWAY)
+            if not getattr(student_response, 'student', None):
+                return Response({"error": "Only students can view their dashboard."}, status=status.HTTP_403_FORBIDDEN)
+        finally:
+            try:
+                user_client.close()
+            except Exception:
+                pass
+
+        client = ExamGRPCClient()
+        try:
+            response = client.get_student_dashboard(student_response.student.student_id)
+            exams = [
+                {
+                    'exam_id': exam.exam_id,
+                    'title': exam.title,
+                    'subject': exam.subject,
+                    'date': exam.date,
+                    'duration': exam.duration,
+                    'teacher_id': exam.teacher_id,
+                    'status': exam.status,
+                    'score': exam.score if exam.status == 'attempted' else None
+                } for exam in response.exams
+            ]
+            return Response(exams, status=status.HTTP_200_OK)
+        except grpc.RpcError as e:
+            try:
+                details = e.details()
+            except Exception:
+                details = str(e)
+            return Response({"error": "Failed to fetch dashboard", "detail": details}, status=status.HTTP_502_BAD_GATEWAY)
+        except Exception as e:
+            return Response({"error": "Failed to fetch dashboard", "detail": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        finally:
+            client.close()
+
+class ExamPaperView(APIView):
+    permission_classes = [IsAuthenticated, IsStudent]
+
+    def get(self, request, exam_id):
+        user_client = UserGRPCClient(timeout_seconds=5)
+        try:
+            try:
+                student_response = user_client.get_student_by_user(request.user.id)
+            except grpc.RpcError as e:
+                try:
+                    details = e.details()
+                except Exception:
+                    details = str(e)
+                return Response({"error": "Student GRPC error", "detail": details}, status=status.HTTP_502_BAD_GATEWAY)
+            if not getattr(student_response, 'student', None):
+                return Response({"error": "Only students can fetch exam papers."}, status=status.HTTP_403_FORBIDDEN)
+        finally:
+            try:
+                user_client.close()
+            except Exception:
+                pass
+
+        client = ExamGRPCClient()
+        try:
+            response = client.get_exam_paper(
+                exam_id=exam_id,
+                student_id=student_response.student.student_id,
+                if_none_match=request.headers.get("If-None-Match", "")
+            )
+            # the payload is already serialized JSON; hand the bytes straight through
+            if response.not_modified:
+                http_response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                http_response = HttpResponse(response.payload, content_type="application/json")
+            http_response["ETag"] = response.etag
+            http_response["Cache-Control"] = "private, no-cache"
+            return http_response
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.NOT_FOUND:
+                return Response({"error": e.details()}, status=status.HTTP_404_NOT_FOUND)
+            if e.code() in (grpc.StatusCode.PERMISSION_DENIED, grpc.StatusCode.FAILED_PRECONDITION):
+                return Response({"error": e.details()}, status=status.HTTP_403_FORBIDDEN)
+            return Response({"error": e.details()}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        finally:
+            client.close()
+
+# how SubmitExam rejections surface over REST; anything else is a 500
+SUBMISSION_ERROR_STATUS = {
+    grpc.StatusCode.INVALID_ARGUMENT: status.HTTP_400_BAD_REQUEST,
+    grpc.StatusCode.ALREADY_EXISTS: status.HTTP_409_CONFLICT,
+    grpc.StatusCode.FAILED_PRECONDITION: status.HTTP_403_FORBIDDEN,
+    grpc.StatusCode.NOT_FOUND: status.HTTP_404_NOT_FOUND,
+}
+
+
+def submission_error_response(e):
+    try:
+        details = e.details()
+    except Exception:
+        details = str(e)
+    try:
+        code = e.code()
+    except Exception:
+        code = None
+    return Response(
+        {"error": details}, status=SUBMISSION_ERROR_STATUS.get(code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+    )
+
+
+class SubmitExamView(APIView):
     permission_classes = [IsAuthenticated, IsStudent]
 
     def post(self, request):
-        user_id = request.user.id
-        serializer = ExamAttemptSerializer(data=request.data)
+        serializer = SubmitExamSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
         user_client = UserGRPCClient()
         try:
             try:
-                student_response = user_client.get_student_by_user(user_id)
+                student_response = user_client.get_student_by_user(request.user.id)
             except grpc.RpcError as e:
                 try:
                     details = e.details()
@@ -270,7 +529,7 @@ class AttemptExamView(APIView):
                     details = str(e)
                 return Response({"error": "Student GRPC error", "detail": details}, status=status.HTTP_502_BAD_GATEWAY)
             if not getattr(student_response, 'student', None):
-                return Response({"error": "Only students can attempt exams"}, status=status.HTTP_403_FORBIDDEN)
+                return Response({"error": "Only students can submit exams"}, status=status.HTTP_403_FORBIDDEN)
         finally:
             try:
                 user_client.close()
@@ -279,20 +538,80 @@ class AttemptExamView(APIView):
 
         client = ExamGRPCClient()
         try:
-            response = client.attempt_exam(
-                exam_id=int(data['exam_id']),
+            response = client.submit_exam(
+                exam_id=data['exam_id'],
                 student_id=student_response.student.student_id,
-                score=float(data['score'])
+                answers=data['answers']
+            )
+            return Response(
+                {
+                    "message": response.message,
+                    "score": response.score,
+                    "correct": response.correct,
+                    "total": response.total,
+                },
+                status=status.HTTP_200_OK
+            )
+        except grpc.RpcError as e:
+            return submission_error_response(e)
+        finally:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+
+class StartExamView(APIView):
+    permission_classes = [IsAuthenticated, IsStudent]
+
+    def post(self, request):
+        serializer = StartExamSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user_client = UserGRPCClient()
+        try:
+            try:
+                student_response = user_client.get_student_by_user(request.user.id)
+            except grpc.RpcError as e:
+                try:
+                    details = e.details()
+                except Exception:
+                    details = str(e)
+                return Response({"error": "Student GRPC error", "detail": details}, status=status.HTTP_502_BAD_GATEWAY)
+            if not getattr(student_response, 'student', None):
+                return Response({"error": "Only students can start exams"}, status=status.HTTP_403_FORBIDDEN)
+        finally:
+            try:
+                user_client.close()
+            except Exception:
+                pass
+
+        client = ExamGRPCClient()
+        try:
+            response = client.start_exam(
+                exam_id=serializer.validated_data['exam_id'],
+                student_id=student_response.student.student_id
+            )
+            return Response(
+                {
+                    "message": response.message,
+                    "started_at": response.started_at,
+                    "deadline": response.deadline,
+                },
+                status=status.HTTP_200_OK
             )
-            return Response({"message": response.message}, status=status.HTTP_200_OK)
         except grpc.RpcError as e:
             try:
                 details = e.details()
             except Exception:
                 details = str(e)
+            code = e.code()
+            if code == grpc.StatusCode.ALREADY_EXISTS:
+                return Response({"error": details}, status=status.HTTP_409_CONFLICT)
+            if code == grpc.StatusCode.NOT_FOUND:
+                return Response({"error": details}, status=status.HTTP_404_NOT_FOUND)
             return Response({"error": details}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         finally:
             try:
                 client.close()
             except Exception:
-                pass
\ No newline at end of file
+                pass
@@ -10,8 +10,13 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import sys
 from pathlib import Path
 
+# modules shared by every service (common/) live at the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from common.database import database_config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -72,12 +77,8 @@ WSGI_APPLICATION = 'notification_service.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# DB_ENGINE / NOTIFICATION_DB_ENGINE etc. select SQLite (WAL) or PostgreSQL, see common/database.py
+DATABASES = database_config(BASE_DIR, 'notification_service', prefix='NOTIFICATION')
 
 
 # Password validation
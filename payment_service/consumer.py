@@ -4,6 +4,9 @@ import django
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "payment_service.settings")
 django.setup()
 from payments.models import StudentFee, FeeStructure
+from payments.ledger import refresh_balances
+from payments.reports import mark_report_stale
+from payments.fee_structures import fee_structure_for_class, get_fee_structures
 from datetime import date
 
 def callback(ch, method, properties, body):
@@ -15,7 +18,9 @@ def callback(ch, method, properties, body):
     print(f"[RabbitMQ] Creating StudentFee for student {student_id}...")
 
     try:
-        fee_structure = FeeStructure.objects.get(grade=grade, academic_year=academic_year)
+        fee_structure = fee_structure_for_class(grade, academic_year)
+        if fee_structure is None:
+            raise FeeStructure.DoesNotExist
         student_fee = StudentFee.objects.create(
             student_id=student_id,
             fee_structure=fee_structure,
@@ -23,6 +28,8 @@ def callback(ch, method, properties, body):
             total_amount=fee_structure.base_fee,
             status="pending"
         )
+        refresh_balances([student_id])
+        mark_report_stale([fee_structure.id])
         print(f"[Payment] StudentFee created: {student_fee.id} for student {student_id}")
 
         ch.basic_ack(delivery_tag=method.delivery_tag)  # acknowledge message,removes from q
@@ -32,6 +39,7 @@ def callback(ch, method, properties, body):
         print(f"[ERROR] Failed to create StudentFee for student {student_id}: {str(e)}")
 
 def start_consumer():
+    get_fee_structures().load()
     connection = pika.BlockingConnection(pika.ConnectionParameters('localhost'))
     channel = connection.channel()
     channel.queue_declare(queue='student_fee_queue', durable=True)#msg exist even if rabbit mq restarts
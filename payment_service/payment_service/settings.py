@@ -11,7 +11,12 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from datetime import timedelta
+import sys
 from pathlib import Path
+
+# modules shared by every service (common/) live at the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from common.database import database_config
 from dotenv import load_dotenv
 import os
 
@@ -102,12 +107,8 @@ SIMPLE_JWT = {
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# DB_ENGINE / PAYMENT_DB_ENGINE etc. select SQLite (WAL) or PostgreSQL, see common/database.py
+DATABASES = database_config(BASE_DIR, 'payment_service', prefix='PAYMENT')
 
 LOGGING = {
     'version': 1,
@@ -169,4 +170,54 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 RAZORPAY_KEY_ID = os.getenv("RAZORPAY_KEY_ID")
-RAZORPAY_KEY_SECRET = os.getenv("RAZORPAY_KEY_SECRET")
\ No newline at end of file
+RAZORPAY_KEY_SECRET = os.getenv("RAZORPAY_KEY_SECRET")
+
+# Fine engine (manage.py refresh_fines, run nightly)
+FINE_REFRESH_CHUNK_SIZE = 1000
+
+# InitiatePayment reservations older than this are reclaimed (seconds)
+PAYMENT_RESERVATION_TTL = 120
+
+# Razorpay gateway: one pooled HTTP session per process. Set PAYMENT_GATEWAY_BASE_URL
+# to a `manage.py fake_gateway` server to run without network (unset = api.razorpay.com)
+PAYMENT_GATEWAY_BASE_URL = os.getenv("PAYMENT_GATEWAY_BASE_URL")
+PAYMENT_GATEWAY_POOL_SIZE = int(os.getenv("PAYMENT_GATEWAY_POOL_SIZE", "10"))
+PAYMENT_GATEWAY_TIMEOUT = float(os.getenv("PAYMENT_GATEWAY_TIMEOUT", "10"))
+
+# Receipt PDFs (MEDIA_ROOT/receipts), rendered by a process pool off the gRPC threads;
+# kept out of the source tree
+MEDIA_URL = '/media/'
+MEDIA_ROOT = Path(os.getenv("MEDIA_ROOT", BASE_DIR / 'media'))
+RECEIPT_WORKERS = int(os.getenv("RECEIPT_WORKERS", "2"))
+RECEIPT_BULK_CHUNK_SIZE = 200
+# content-addressed receipt files; S3: 'payments.receipt_storage.S3ReceiptStorage' with
+# {'bucket': ..., 'endpoint_url': ...} (needs boto3)
+RECEIPT_STORAGE_BACKEND = 'payments.receipt_storage.LocalReceiptStorage'
+RECEIPT_STORAGE_OPTIONS = {}
+
+# ListTransactionLogs streams the table in keyset pages of this many rows
+TRANSACTION_LOG_PAGE_SIZE = 500
+# the gRPC server buffers log writes and bulk-inserts them from a background thread
+TRANSACTION_LOG_BATCH_SIZE = 200
+TRANSACTION_LOG_FLUSH_INTERVAL = 1.0  # seconds
+TRANSACTION_LOG_MAX_PENDING = 50000  # kept across failed flushes before the oldest are dropped
+# retention (manage.py archive_transaction_logs, run daily): older rows move to monthly .jsonl.gz files
+TRANSACTION_LOG_RETENTION_DAYS = int(os.getenv("TRANSACTION_LOG_RETENTION_DAYS", "90"))
+TRANSACTION_LOG_ARCHIVE_DIR = os.getenv("TRANSACTION_LOG_ARCHIVE_DIR", BASE_DIR / 'log_archive')
+TRANSACTION_LOG_ARCHIVE_CHUNK_SIZE = 5000
+
+# cash counter uploads are posted in batches of this many rows, one transaction each
+OFFLINE_PAYMENT_BATCH_SIZE = 1000
+
+# manage.py reconcile_payments: gateway payments still initiated after this many seconds are
+# looked up at the gateway (keep it above the checkout's lifetime)
+PAYMENT_RECONCILE_AFTER = int(os.getenv("PAYMENT_RECONCILE_AFTER", "3600"))
+PAYMENT_RECONCILE_BATCH_SIZE = 200
+PAYMENT_RECONCILE_WORKERS = 8  # concurrent gateway lookups, within PAYMENT_GATEWAY_POOL_SIZE
+
+# payment RPC responses are replayed for retries with the same idempotency key for this long
+PAYMENT_IDEMPOTENCY_TTL = int(os.getenv("PAYMENT_IDEMPOTENCY_TTL", str(24 * 3600)))
+
+# FeeStructure is cached whole in each process; changes made by other processes are noticed
+# within this many seconds (changes in the same process, e.g. AllocateFee, at once)
+FEE_STRUCTURE_CACHE_TTL = float(os.getenv("FEE_STRUCTURE_CACHE_TTL", "5"))
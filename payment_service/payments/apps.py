@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class PaymentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'payments'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from .fee_structures import invalidate_fee_structures
+        from .models import FeeStructure
+
+        post_save.connect(invalidate_fee_structures, sender=FeeStructure)
+        post_delete.connect(invalidate_fee_structures, sender=FeeStructure)
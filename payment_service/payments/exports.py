@@ -0,0 +1,110 @@
+"""Streaming CSV and XLSX writers for report downloads.
+
+Both are generators of bytes, meant for a StreamingHttpResponse: rows are
+encoded as they are produced and nothing holds the whole file. The XLSX writer
+emits a minimal single-sheet workbook through zipfile's streaming mode, so no
+spreadsheet library is needed.
+"""
+import csv
+import itertools
+import zipfile
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="xl/workbook.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+    '</Relationships>'
+)
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_END = '</sheetData></worksheet>'
+
+
+class _Echo:
+    # csv.writer target that returns each encoded line instead of storing it
+    def write(self, value):
+        return value
+
+
+class _Pipe:
+    """Unseekable write target whose written bytes are collected with take()."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def csv_stream(header, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header).encode()
+    for row in rows:
+        yield writer.writerow(row).encode()
+
+
+def _cell(value):
+    if value is None:
+        return '<c/>'
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f'<c><v>{value}</v></c>'
+    return f'<c t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+
+
+def xlsx_stream(header, rows, sheet_name='Report', flush_rows=500):
+    """Yield an .xlsx workbook with one sheet: ``header`` then ``rows``."""
+    pipe = _Pipe()
+    with zipfile.ZipFile(pipe, 'w', compression=zipfile.ZIP_DEFLATED) as workbook:
+        workbook.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        workbook.writestr('_rels/.rels', _ROOT_RELS)
+        workbook.writestr('xl/workbook.xml', _WORKBOOK.format(name=escape(sheet_name, {'"': '&quot;'})))
+        workbook.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+        yield pipe.take()
+        with workbook.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            sheet.write(_SHEET_START.encode())
+            for count, row in enumerate(itertools.chain([header], rows), 1):
+                sheet.write(('<row>' + ''.join(_cell(value) for value in row) + '</row>').encode())
+                if count % flush_rows == 0:
+                    yield pipe.take()
+            sheet.write(_SHEET_END.encode())
+    yield pipe.take()
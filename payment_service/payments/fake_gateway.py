@@ -0,0 +1,165 @@
+"""Local stand-in for the Razorpay REST API, for load tests without network.
+
+Point PAYMENT_GATEWAY_BASE_URL at it and the real client talks to it unchanged:
+
+* ``POST /v1/orders`` creates an order,
+* ``GET /v1/orders/<id>`` and ``GET /v1/orders/<id>/payments`` read it back,
+* ``POST /v1/orders/<id>/pay`` plays the checkout: it captures a payment and
+  returns the ids and signature the browser would post back, signed with the
+  server's key secret so RazorpayGateway.verify_payment_signature accepts it.
+
+Every request sleeps ``latency`` (+/- ``jitter``) seconds, and ``error_rate`` of
+them fail with a Razorpay-shaped 502 so retry and error paths can be exercised.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_ORDER_PATH = re.compile(r'^/v1/orders/(order_\w+)(/payments|/pay)?$')
+
+
+class FakeGatewayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, key_id, key_secret, latency=0.0, jitter=0.0, error_rate=0.0):
+        super().__init__(address, FakeGatewayHandler)
+        self.key_id = key_id or ''
+        self.key_secret = key_secret or ''
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.orders = {}
+        self.payments = {}
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def sign(self, order_id, payment_id):
+        return hmac.new(
+            self.key_secret.encode(), f"{order_id}|{payment_id}".encode(), hashlib.sha256
+        ).hexdigest()
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, name='fake-gateway', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class FakeGatewayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        server = self.server
+
+        delay = server.latency + random.uniform(-server.jitter, server.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if not self._authorized():
+            return self._error(401, "BAD_REQUEST_ERROR", "Authentication failed")
+        if random.random() < server.error_rate:
+            return self._error(502, "SERVER_ERROR", "The server encountered an error (injected)")
+
+        if method == 'POST' and self.path == '/v1/orders':
+            return self._create_order(json.loads(body or b'{}'))
+        match = _ORDER_PATH.match(self.path)
+        if match is None:
+            return self._error(404, "BAD_REQUEST_ERROR", "The requested URL was not found on the server.")
+        with server.lock:
+            order = server.orders.get(match.group(1))
+        if order is None:
+            return self._error(400, "BAD_REQUEST_ERROR", "The id provided does not exist")
+        action = match.group(2)
+        if method == 'GET' and action is None:
+            return self._send(200, order)
+        if method == 'GET' and action == '/payments':
+            with server.lock:
+                items = [p for p in server.payments.values() if p['order_id'] == order['id']]
+            return self._send(200, {"entity": "collection", "count": len(items), "items": items})
+        if method == 'POST' and action == '/pay':
+            return self._pay(order)
+        return self._error(405, "BAD_REQUEST_ERROR", "Method not allowed")
+
+    def _authorized(self):
+        header = self.headers.get('Authorization', '')
+        if not header.startswith('Basic '):
+            return False
+        try:
+            key_id, _, key_secret = base64.b64decode(header[6:]).decode().partition(':')
+        except ValueError:
+            return False
+        return key_id == self.server.key_id and key_secret == self.server.key_secret
+
+    def _create_order(self, data):
+        if not isinstance(data.get('amount'), int) or data['amount'] < 100:
+            return self._error(400, "BAD_REQUEST_ERROR", "The amount must be atleast INR 1.00")
+        order = {
+            "id": f"order_{uuid.uuid4().hex[:14]}",
+            "entity": "order",
+            "amount": data['amount'],
+            "amount_paid": 0,
+            "amount_due": data['amount'],
+            "currency": data.get('currency', 'INR'),
+            "receipt": data.get('receipt'),
+            "status": "created",
+            "attempts": 0,
+            "created_at": int(time.time()),
+        }
+        with self.server.lock:
+            self.server.orders[order['id']] = order
+        self._send(200, order)
+
+    def _pay(self, order):
+        payment_id = f"pay_{uuid.uuid4().hex[:14]}"
+        with self.server.lock:
+            order.update(status="paid", amount_paid=order['amount'], amount_due=0, attempts=order['attempts'] + 1)
+            self.server.payments[payment_id] = {
+                "id": payment_id,
+                "entity": "payment",
+                "order_id": order['id'],
+                "amount": order['amount'],
+                "currency": order['currency'],
+                "status": "captured",
+                "created_at": int(time.time()),
+            }
+        self._send(200, {
+            "razorpay_order_id": order['id'],
+            "razorpay_payment_id": payment_id,
+            "razorpay_signature": self.server.sign(order['id'], payment_id),
+        })
+
+    def _error(self, status, code, description):
+        self._send(status, {"error": {"code": code, "description": description}})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
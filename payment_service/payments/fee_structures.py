@@ -0,0 +1,103 @@
+"""Process-local cache of every FeeStructure.
+
+The table holds one row per grade and academic year, so each process (the gRPC
+server, the RabbitMQ consumer) keeps all of it in memory and hot paths read
+structures from here instead of joining or querying for them.
+
+Writes in this process drop the cache at once (post_save / post_delete,
+connected in PaymentsConfig.ready), which covers AllocateFee. Writes made by
+another process are picked up through the table's version, its row count and
+latest ``updated_at``, which is compared at most every FEE_STRUCTURE_CACHE_TTL
+seconds; an id or class that is not cached yet forces that comparison at once.
+Cached instances are shared between threads and must not be modified.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .models import FeeStructure
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class FeeStructureCache:
+    def __init__(self, ttl=None):
+        self.ttl = settings.FEE_STRUCTURE_CACHE_TTL if ttl is None else ttl
+        self._lock = threading.Lock()
+        self._maps = None  # (by id, by (grade, academic_year)), replaced as a whole
+        self._version = None
+        self._checked_at = 0.0
+
+    def _current_version(self):
+        version = FeeStructure.objects.aggregate(count=Count('id'), updated=Max('updated_at'))
+        return version['count'], version['updated']
+
+    def _load(self):
+        with self._lock:
+            structures = list(FeeStructure.objects.all())
+            self._version = (len(structures), max((s.updated_at for s in structures), default=None))
+            self._checked_at = time.monotonic()
+            maps = self._maps = (
+                {structure.id: structure for structure in structures},
+                {(structure.grade, structure.academic_year): structure for structure in structures},
+            )
+        return maps
+
+    def load(self):
+        """Read the whole table now (at process start); returns the number of structures."""
+        return len(self._load()[0])
+
+    def invalidate(self):
+        self._maps = None
+
+    def _current_maps(self, force=False):
+        maps = self._maps
+        if maps is None:
+            return self._load()
+        if force or time.monotonic() - self._checked_at >= self.ttl:
+            if self._current_version() != self._version:
+                return self._load()
+            self._checked_at = time.monotonic()
+        return maps
+
+    def _lookup(self, index, key):
+        found = self._current_maps()[index].get(key)
+        if found is None:
+            # created by another process since the last check?
+            found = self._current_maps(force=True)[index].get(key)
+        return found
+
+    def get(self, fee_structure_id):
+        """The FeeStructure with this id, or None."""
+        return self._lookup(0, fee_structure_id)
+
+    def for_class(self, grade, academic_year):
+        """The FeeStructure of a grade and academic year, or None."""
+        return self._lookup(1, (grade, academic_year))
+
+
+def get_fee_structures():
+    """Return this process's cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = FeeStructureCache()
+    return _cache
+
+
+def get_fee_structure(fee_structure_id):
+    return get_fee_structures().get(fee_structure_id)
+
+
+def fee_structure_for_class(grade, academic_year):
+    return get_fee_structures().for_class(grade, academic_year)
+
+
+def invalidate_fee_structures(**kwargs):
+    # also the post_save / post_delete receiver for FeeStructure
+    if _cache is not None:
+        _cache.invalidate()
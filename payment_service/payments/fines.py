@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DecimalField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .ledger import UNPAID_STATUSES, refresh_balances
+from .models import FeeStructure, Fine, StudentFee
+from .reports import mark_report_stale
+
+
+def _upsert_fines(batch):
+    with transaction.atomic():
+        Fine.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=['student_fee'],
+            update_fields=['student_id', 'days_overdue', 'fine_amount', 'calculated_on'],
+        )
+
+
+def refresh_fines(today=None, fees=None, chunk_size=None):
+    """Recompute overdue status, fines and totals for unpaid fees with set-based writes.
+
+    ``fees`` narrows the run (defaults to every StudentFee). Statuses and totals are
+    single UPDATE statements; fines are upserted in keyset-ordered chunks so a large
+    run never holds the write lock for long. The affected students' balances are
+    refreshed at the end. Returns counts for logging.
+    """
+    today = today or timezone.now().date()
+    chunk_size = chunk_size or settings.FINE_REFRESH_CHUNK_SIZE
+    everyone = fees is None
+    fees = StudentFee.objects.all() if everyone else fees
+
+    became_overdue = fees.filter(status='pending', due_date__lt=today).update(status='overdue')
+    became_pending = fees.filter(status='overdue', due_date__gte=today).update(status='pending')
+
+    fines = 0
+    last_id = 0
+    overdue = fees.filter(status='overdue').order_by('id').values_list(
+        'id', 'student_id', 'due_date', 'fee_structure__fine_per_day'
+    )
+    while True:
+        rows = list(overdue.filter(id__gt=last_id)[:chunk_size])
+        if not rows:
+            break
+        _upsert_fines([
+            Fine(
+                student_fee_id=fee_id,
+                student_id=student_id,
+                days_overdue=(today - due_date).days,
+                fine_amount=(today - due_date).days * fine_per_day,
+                calculated_on=today,
+            )
+            for fee_id, student_id, due_date, fine_per_day in rows
+        ])
+        fines += len(rows)
+        if len(rows) < chunk_size:
+            break
+        last_id = rows[-1][0]
+
+    # a due date moved into the future cancels the fine
+    Fine.objects.filter(student_fee__in=fees.filter(status='pending')).delete()
+
+    money = DecimalField(max_digits=10, decimal_places=2)
+    totals = fees.filter(status__in=UNPAID_STATUSES).update(
+        total_amount=Subquery(
+            FeeStructure.objects.filter(id=OuterRef('fee_structure_id')).values('base_fee')[:1]
+        ) + Coalesce(
+            Subquery(Fine.objects.filter(student_fee_id=OuterRef('id')).values('fine_amount')[:1]),
+            Value(0, output_field=money),
+            output_field=money,
+        )
+    )
+    # fines and totals moved: bring the affected students' balance summaries up to date
+    balances = refresh_balances(None if everyone else fees.values('student_id'))
+    mark_report_stale(None if everyone else fees.values('fee_structure_id'))
+    return {
+        'overdue': became_overdue,
+        'pending': became_pending,
+        'fines': fines,
+        'totals': totals,
+        'balances': balances,
+    }
+
+
+def refresh_stale_fines(student_fee_ids, today=None):
+    """Incremental path: refresh only past-due fees the batch run has not covered today."""
+    today = today or timezone.now().date()
+    stale = list(
+        StudentFee.objects.filter(
+            id__in=student_fee_ids, status__in=UNPAID_STATUSES, due_date__lt=today
+        ).exclude(fine__calculated_on=today).values_list('id', flat=True)
+    )
+    if stale:
+        refresh_fines(today, StudentFee.objects.filter(id__in=stale))
+    return stale
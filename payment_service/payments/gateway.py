@@ -0,0 +1,78 @@
+import threading
+
+import razorpay
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+class RazorpayGateway:
+    """Razorpay client built once per process around a pooled HTTP session.
+
+    Every servicer thread shares the same keep-alive connections instead of
+    opening a new TLS session per call. ``base_url`` points the client at another
+    host with the Razorpay REST layout, e.g. ``manage.py fake_gateway``.
+    """
+
+    def __init__(self, key_id, key_secret, base_url=None, pool_size=None, timeout=None):
+        pool_size = pool_size or settings.PAYMENT_GATEWAY_POOL_SIZE
+        self.timeout = timeout or settings.PAYMENT_GATEWAY_TIMEOUT
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        options = {'base_url': base_url} if base_url else {}
+        self.client = razorpay.Client(session=self.session, auth=(key_id, key_secret), **options)
+
+    def create_order(self, amount, receipt, currency="INR"):
+        """Create an order for ``amount`` rupees and return the gateway's order dict."""
+        return self.client.order.create(
+            {
+                "amount": int(amount * 100),
+                "currency": currency,
+                "receipt": receipt,
+                "payment_capture": 1,
+            },
+            timeout=self.timeout,
+        )
+
+    def fetch_order_payments(self, order_id):
+        """Return the payment attempts made against ``order_id`` (Razorpay payment dicts)."""
+        return self.client.order.payments(order_id, timeout=self.timeout)['items']
+
+    def verify_payment_signature(self, order_id, payment_id, signature):
+        """Raise razorpay.errors.SignatureVerificationError unless the checkout signature matches."""
+        return self.client.utility.verify_payment_signature({
+            "razorpay_order_id": order_id,
+            "razorpay_payment_id": payment_id,
+            "razorpay_signature": signature,
+        })
+
+    def close(self):
+        self.session.close()
+
+
+def get_gateway():
+    """Return the process-wide gateway, creating it from settings on first use."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = RazorpayGateway(
+                    settings.RAZORPAY_KEY_ID,
+                    settings.RAZORPAY_KEY_SECRET,
+                    base_url=settings.PAYMENT_GATEWAY_BASE_URL,
+                )
+    return _gateway
+
+
+def reset_gateway():
+    """Drop the shared gateway so the next call picks up changed settings."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is not None:
+            _gateway.close()
+            _gateway = None
@@ -4,7 +4,6 @@ from concurrent import futures
 import time
 import os
 import django
-import hmac, hashlib
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "payment_service.settings")
 django.setup()
 from django.conf import settings
@@ -14,13 +13,25 @@ from payment_pb2 import FeeAllocationResponse,FeeAllocationRequest , AllocateFee
 from payment_pb2_grpc import PaymentServiceServicer
 from django.utils import timezone
 from django.db import transaction
-import razorpay
 from payment_pb2 import InitiatePaymentRequest, InitiatePaymentResponse
 from payments.models import Payment,TransactionLog
-from reportlab.pdfgen import canvas
 from payments.models import Receipt
 from datetime import datetime
-from .user_client import UserGRPCClient
+from decimal import Decimal
+from .fines import refresh_fines, refresh_stale_fines
+from .gateway import get_gateway
+from .verification import get_verifier, settle_payments, verify_batch
+from .receipts import receipt_url, request_receipt, stop_receipt_queue
+from .ledger import get_balance, student_fees
+from .reports import collection_report
+from .offline import POSTED, post_offline_batch
+from .idempotency import idempotent
+from .fee_structures import get_fee_structure, get_fee_structures
+from .logs import InvalidLogQuery, encode_cursor, iter_logs, start_log_writer, stop_log_writer, write_log
+from .initiation import (
+    FeeAlreadyPaid, FeeNotFound, FeeReserved, ReservationExpired,
+    finalize_payment, release_reservation, reserve_fee,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -53,10 +64,14 @@ class PaymentService(payment_pb2_grpc.PaymentServiceServicer):
                 fee_structure.due_date = due_date
                 fee_structure.fine_per_day = fine_per_day
                 fee_structure.save()
+                # unpaid fees pick up the new due date, base fee and fine rate
+                fees = StudentFee.objects.filter(fee_structure=fee_structure)
+                fees.exclude(status="paid").update(due_date=due_date)
+                refresh_fines(fees=fees)
                 logger.info(f"Updated FeeStructure for grade {grade}, year {academic_year}")
             else:
                 logger.info(f"Created FeeStructure for grade {grade}, year {academic_year}")
-            TransactionLog.objects.create(
+            write_log(
                 log_message=f"FeeStructure created/updated for grade {grade}",
                 log_type="info"
             )
@@ -67,7 +82,7 @@ class PaymentService(payment_pb2_grpc.PaymentServiceServicer):
 
         except Exception as e:
             logger.exception(f"Fee allocation failed for grade {request.grade}, year {request.academic_year}")
-            TransactionLog.objects.create(
+            write_log(
                 log_message=f"Fee allocation failed: {str(e)}",
                 log_type="error"
             )
@@ -75,137 +90,121 @@ class PaymentService(payment_pb2_grpc.PaymentServiceServicer):
             context.set_details(str(e))
             return payment_pb2.FeeAllocationResponse(message="Fee allocation failed")
         
-    def InitiatePayment(self, request, context):
-        try:
-            with transaction.atomic():
-                student_fee = StudentFee.objects.select_for_update().get(
-                    id=request.student_fee_id, student_id=request.student_id
-                )
-                
-                if student_fee.lock == 1:
-                    TransactionLog.objects.create(
-                        log_message=f"Payment lock conflict for StudentFee {student_fee.id}",#f- fromatted string literal
-                        log_type="warning"
-                    )
-                    context.set_code(grpc.StatusCode.ABORTED)#status code which returns when a transaction conflict or lock happens
-                    context.set_details("Payment is already being processed")
-                    return InitiatePaymentResponse(message="Payment already in process")
-
-                student_fee.lock = 1
-                student_fee.save()
+    def GetStudentFees(self, request, context):
+        balance = get_balance(request.student_id)
+        response = payment_pb2.StudentFeeListResponse(
+            balance=payment_pb2.StudentBalance(
+                total_due=float(balance.total_due),
+                total_paid=float(balance.total_paid),
+                total_fines=float(balance.total_fines),
+                overdue_count=balance.overdue_count,
+                fee_count=balance.fee_count,
+                updated_at=balance.updated_at.isoformat(),
+            )
+        )
+        if request.summary_only:
+            return response
+        for fee in student_fees(request.student_id):
+            fee_structure = get_fee_structure(fee.fee_structure_id)
+            response.fees.add(
+                id=fee.id,
+                student_id=fee.student_id,
+                fee_structure_id=fee.fee_structure_id,
+                total_amount=float(fee.total_amount),
+                paid_amount=float(fee.paid_amount),
+                status=fee.status,
+                due_date=str(fee.due_date),
+                grade=fee_structure.grade or 0,
+                academic_year=fee_structure.academic_year,
+                base_fee=float(fee_structure.base_fee),
+                fine_amount=float(fee.fine_amount),
+                days_overdue=fee.days_overdue,
+            )
+        return response
 
-                if student_fee.status == "paid":
-                    TransactionLog.objects.create(
-                        log_message=f"Fee already paid for StudentFee {student_fee.id}",
-                        log_type="info"
-                    )
-                    student_fee.lock = 0
-                    student_fee.save()
-                    return InitiatePaymentResponse(message="Fee already paid")
-
-                today = timezone.now().date()
-                fine_amount = 0
-                if today > student_fee.due_date:
-                    days_overdue = (today - student_fee.due_date).days
-                    fine_amount = days_overdue * student_fee.fee_structure.fine_per_day
-
-                    Fine.objects.update_or_create(
-                        student_fee=student_fee,
-                        student_id=request.student_id,
-                        defaults={
-                            "days_overdue": days_overdue,
-                            "fine_amount": fine_amount,
-                            "calculated_on": today,
-                        },
-                    )
-                    TransactionLog.objects.create(
-                        log_message=f"Fine calculated: {fine_amount} for StudentFee {student_fee.id}",
-                        log_type="info"
-                    )
-                student_fee.total_amount = student_fee.fee_structure.base_fee + fine_amount
-                student_fee.save()
-
-                existing_payment = Payment.objects.filter(
-                    student_fee=student_fee, status="initiated"
-                ).first()
-                if existing_payment:
-                    return InitiatePaymentResponse(message="Payment already initiated")
-                if request.gateway == "razorpay":
-                    client = razorpay.Client(
-                        auth=(os.getenv("RAZORPAY_KEY_ID"), os.getenv("RAZORPAY_KEY_SECRET"))
-                    )
-                    order = client.order.create(
-                        {
-                            "amount": int(student_fee.total_amount * 100),
-                            "currency": "INR",
-                            "receipt": f"{student_fee.id}",
-                            "payment_capture": 1,
-                        }
-                    )
-                    payment = Payment.objects.create(
-                        student_fee=student_fee,
-                        gateway="razorpay",
-                        transaction_id=order["id"],
-                        amount=student_fee.total_amount,
-                        status="initiated",
-                    )
-                    TransactionLog.objects.create(
-                        log_message=f"Razorpay order {order['id']} created",
-                        log_type="info",
-                    )
-                    return InitiatePaymentResponse(
-                        message="Razorpay order created",
-                        payment_id=payment.id,
-                        order_id=order["id"],
-                        amount=float(student_fee.total_amount),
-                        currency="INR",
-                    )
+    def GetFeeCollectionReport(self, request, context):
+        rows = collection_report(
+            academic_year=request.academic_year, grades=list(request.grades), statuses=list(request.statuses)
+        )
+        response = payment_pb2.FeeReportResponse()
+        for row in rows:
+            response.rows.add(
+                grade=row['grade'] or 0,
+                academic_year=row['academic_year'],
+                status=row['status'],
+                fee_count=row['fee_count'],
+                billed_amount=float(row['billed_amount']),
+                collected_amount=float(row['collected_amount']),
+                outstanding_amount=float(row['outstanding_amount']),
+            )
+        response.billed_amount = sum(row.billed_amount for row in response.rows)
+        response.collected_amount = sum(row.collected_amount for row in response.rows)
+        response.outstanding_amount = sum(row.outstanding_amount for row in response.rows)
+        return response
 
-                elif request.gateway == "offline":
-                    payment = Payment.objects.create(
-                        student_fee=student_fee,
-                        gateway="offline",
-                        amount=student_fee.total_amount,
-                        status="success",
-                        remarks="Cash/Offline",
-                    )
-                    student_fee.paid_amount = student_fee.total_amount
-                    student_fee.status = "paid"
-                    student_fee.save()
-                    try:
-                        TransactionLog.objects.create(
-                            log_message="Offline payment recorded",
-                            log_type="info",
-                        )
-                    except Exception as e:
-                        print("TransactionLog creation failed:", str(e))
-                    return InitiatePaymentResponse(
-                        message="Offline payment successful",
-                        payment_id=payment.id,
-                        order_id="",
-                        amount=float(student_fee.total_amount),
-                        currency="INR",
-                    )
+    @idempotent(InitiatePaymentResponse)
+    def InitiatePayment(self, request, context):
+        if request.gateway not in ("razorpay", "offline"):
+            write_log(
+                log_message=f"Unsupported gateway: {request.gateway} for StudentFee {request.student_fee_id}",
+                log_type="error"
+            )
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details("Unsupported gateway")
+            return InitiatePaymentResponse(message="Unsupported gateway")
 
-                else:
-                    TransactionLog.objects.create(
-                        log_message=f"Unsupported gateway: {request.gateway} for StudentFee {student_fee.id}",
-                        log_type="error"
-                    )
-                    context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-                    context.set_details("Unsupported gateway")
-                    return InitiatePaymentResponse(message="Unsupported gateway")
+        try:
+            # fines are precomputed by the batch job; only fill in a fee it has not covered today
+            refresh_stale_fines([request.student_fee_id])
+
+            # phase 1: short reservation, no row lock held across the gateway call
+            reservation = reserve_fee(request.student_fee_id, request.student_id)
+            if isinstance(reservation, Payment):
+                return InitiatePaymentResponse(
+                    message="Payment already initiated",
+                    payment_id=reservation.id,
+                    order_id=reservation.transaction_id or "",
+                    amount=float(reservation.amount),
+                    currency="INR",
+                )
 
-        except StudentFee.DoesNotExist:
-            TransactionLog.objects.create(
+            # phase 2: gateway order, outside any transaction
+            order_id = None
+            if request.gateway == "razorpay":
+                try:
+                    order = get_gateway().create_order(reservation.amount, f"{reservation.student_fee_id}")
+                    order_id = order["id"]
+                except Exception:
+                    release_reservation(reservation)
+                    raise
+
+            # phase 3: idempotent finalize
+            payment = finalize_payment(reservation, request.gateway, order_id)
+
+        except FeeNotFound:
+            write_log(
                 log_message=f"Student fee not found",
                 log_type="error"
             )
             context.set_code(grpc.StatusCode.NOT_FOUND)
             context.set_details("StudentFee not found")
             return InitiatePaymentResponse(message="StudentFee not found")
+        except FeeAlreadyPaid:
+            write_log(
+                log_message=f"Fee already paid for StudentFee {request.student_fee_id}",
+                log_type="info"
+            )
+            return InitiatePaymentResponse(message="Fee already paid")
+        except (FeeReserved, ReservationExpired) as e:
+            write_log(
+                log_message=f"Payment lock conflict for StudentFee {request.student_fee_id}",
+                log_type="warning"
+            )
+            context.set_code(grpc.StatusCode.ABORTED)#status code which returns when a transaction conflict or lock happens
+            context.set_details(str(e))
+            return InitiatePaymentResponse(message="Payment already in process")
         except Exception as e:
-            TransactionLog.objects.create(
+            write_log(
                 log_message=f"Payment initiation failed: {str(e)}",
                 log_type="error"
             )
@@ -213,6 +212,31 @@ class PaymentService(payment_pb2_grpc.PaymentServiceServicer):
             context.set_details(str(e))
             return InitiatePaymentResponse(message="Payment initiation failed")
 
+        if request.gateway == "razorpay":
+            write_log(
+                log_message=f"Razorpay order {order_id} created",
+                log_type="info",
+            )
+            return InitiatePaymentResponse(
+                message="Razorpay order created",
+                payment_id=payment.id,
+                order_id=order_id,
+                amount=float(payment.amount),
+                currency="INR",
+            )
+
+        write_log(
+            log_message="Offline payment recorded",
+            log_type="info",
+        )
+        return InitiatePaymentResponse(
+            message="Offline payment successful",
+            payment_id=payment.id,
+            order_id="",
+            amount=float(payment.amount),
+            currency="INR",
+        )
+
     def SimulateRazorpayPayment(self, request, context):
         try:
             payment = Payment.objects.get(
@@ -220,7 +244,7 @@ class PaymentService(payment_pb2_grpc.PaymentServiceServicer):
                 transaction_id=request.razorpay_order_id
             )
         except Payment.DoesNotExist:
-            TransactionLog.objects.create(
+            write_log(
                 log_message=f"Simulate payment failed: Payment record not found (payment_id={request.payment_id}, order_id={request.razorpay_order_id})",
                 log_type="error"
             )
@@ -232,14 +256,9 @@ class PaymentService(payment_pb2_grpc.PaymentServiceServicer):
             razorpay_payment_id = str(request.payment_id) 
             razorpay_order_id = request.razorpay_order_id
             # generate signature
-            msg = f"{razorpay_order_id}|{razorpay_payment_id}"
-            generated_signature = hmac.new(
-                bytes(settings.RAZORPAY_KEY_SECRET, "utf-8"),
-                bytes(msg, "utf-8"),
-                hashlib.sha256
-            ).hexdigest()
+            generated_signature = get_verifier().sign(razorpay_order_id, razorpay_payment_id)
         except Exception as e:
-            TransactionLog.objects.create(
+            write_log(
                 log_message=f"Signature generation failed: {str(e)}",
                 log_type="error"
             )
@@ -247,7 +266,7 @@ class PaymentService(payment_pb2_grpc.PaymentServiceServicer):
             context.set_details(f"Failed to generate signature: {str(e)}")
             return payment_pb2.SimulateRazorpayResponse()
 
-        TransactionLog.objects.create(
+        write_log(
             log_message=f"Simulated Razorpay payment generated. razorpay_payment_id={razorpay_payment_id}",
             log_type="info"
         )
@@ -259,6 +278,7 @@ class PaymentService(payment_pb2_grpc.PaymentServiceServicer):
             razorpay_signature=generated_signature
         )
     
+    @idempotent(payment_pb2.VerifyRazorpayResponse)
     def VerifyRazorpayPayment(self, request, context):
         try:
             payment_id = request.payment_id
@@ -274,7 +294,7 @@ class PaymentService(payment_pb2_grpc.PaymentServiceServicer):
             try:
                 payment = Payment.objects.get(id=payment_id)
             except Payment.DoesNotExist:
-                TransactionLog.objects.create(
+                write_log(
                     log_message=f"Payment record not found for payment_id={payment_id}",
                     log_type="error"
                 )
@@ -282,15 +302,8 @@ class PaymentService(payment_pb2_grpc.PaymentServiceServicer):
                 context.set_details("Payment record not found")
                 return payment_pb2.VerifyRazorpayResponse()
 
-            client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
-            try:
-                client.utility.verify_payment_signature({
-                    "razorpay_order_id": razorpay_order_id,
-                    "razorpay_payment_id": razorpay_payment_id,
-                    "razorpay_signature": razorpay_signature
-                })
-            except razorpay.errors.SignatureVerificationError:
-                TransactionLog.objects.create(
+            if not get_verifier().verify(razorpay_order_id, razorpay_payment_id, razorpay_signature):
+                write_log(
                     log_message="Razorpay signature verification failed",
                     log_type="error"
                 )
@@ -298,21 +311,34 @@ class PaymentService(payment_pb2_grpc.PaymentServiceServicer):
                 context.set_details("Payment verification failed")
                 return payment_pb2.VerifyRazorpayResponse()
 
+            if payment.status == "success" and payment.transaction_id == razorpay_payment_id:
+                # a repeated callback for a payment that is already settled
+                return payment_pb2.VerifyRazorpayResponse(message="Payment verified successfully", receipt_url="")
+
             with transaction.atomic():
-                # Update payment and student fee
-                payment.status = "success"
-                payment.transaction_id = razorpay_payment_id
-                payment.save()
-
-                student_fee = payment.student_fee
-                student_fee.paid_amount = student_fee.total_amount
-                student_fee.status = "paid"
-                student_fee.lock = 0
-                student_fee.save()
-
-                TransactionLog.objects.create(
+                # re-read under lock: a concurrent verify or a reconciliation run may have settled
+                # or failed the payment since it was read above
+                payments = Payment.objects.select_for_update().in_bulk([payment.id])
+                payment = payments.get(payment.id)
+                if payment is not None and payment.status == "success" and payment.transaction_id == razorpay_payment_id:
+                    return payment_pb2.VerifyRazorpayResponse(message="Payment verified successfully", receipt_url="")
+                if payment is None or payment.status != "initiated" or payment.transaction_id != razorpay_order_id:
+                    write_log(
+                        log_message=f"Payment {payment_id} is not awaiting verification of order {razorpay_order_id}",
+                        log_type="error"
+                    )
+                    context.set_code(grpc.StatusCode.FAILED_PRECONDITION)
+                    context.set_details("Payment is not awaiting verification")
+                    return payment_pb2.VerifyRazorpayResponse()
+
+                # same write path as batch verification and reconciliation: balances and the
+                # fee report move only for a fee that was not already paid
+                settle_payments(payments, {payment.id: razorpay_payment_id})
+
+                write_log(
                     log_message=f"Payment verified successfully. Razorpay Payment ID: {razorpay_payment_id}",
-                    log_type="success"
+                    log_type="success",
+                    audit=True,
                 )
 
                 return payment_pb2.VerifyRazorpayResponse(
@@ -321,7 +347,7 @@ class PaymentService(payment_pb2_grpc.PaymentServiceServicer):
                 )
         #db error , invalid input error , server connection error,gateway error
         except Exception as e:
-            TransactionLog.objects.create(
+            write_log(
                 log_message=f"Unexpected error in VerifyRazorpayPayment: {str(e)}",
                 log_type="error"
             )
@@ -329,126 +355,166 @@ class PaymentService(payment_pb2_grpc.PaymentServiceServicer):
             context.set_details(str(e))
             return payment_pb2.VerifyRazorpayResponse()
 
-    def GenerateReceipt(self, request, context):
+    @idempotent(payment_pb2.BatchVerifyRazorpayResponse)
+    def BatchVerifyRazorpayPayments(self, request, context):
         try:
-            try:
-                payment = Payment.objects.get(id=request.payment_id)
-            except Payment.DoesNotExist:
-                TransactionLog.objects.create(
-                    log_message=f"Payment record not found for payment_id={request.payment_id}",
-                    log_type="error"
-                )
-                context.set_code(grpc.StatusCode.NOT_FOUND)
-                context.set_details("Payment record not found")
-                return payment_pb2.GenerateReceiptResponse()
-            
-            # import pdb; pdb.set_trace()
-            user_client = UserGRPCClient()
-            student_resp = user_client.get_student_by_id(request.student_id)
-            print(student_resp)
-            if not student_resp.found:
-                TransactionLog.objects.create(
-                    log_message=f"Student not found for id={request.student_id}",
-                    log_type="error"
-                )
-                context.set_code(grpc.StatusCode.NOT_FOUND)
-                context.set_details("Student not found")
-                return payment_pb2.GenerateReceiptResponse()
-            
-            student_name = f"{student_resp.student.first_name} {student_resp.student.last_name}"
-            grade = student_resp.student.grade
-            academic_year = student_resp.student.academic_year
-
-            try:
-            # Generate PDF receipt
-                receipt_folder = os.path.join(settings.MEDIA_ROOT, 'receipts')
-                os.makedirs(receipt_folder, exist_ok=True)
-                filename = f"RCPT_{payment.id}_{datetime.now().strftime('%Y%m%d%H%M%S')}.pdf"
-                file_path = os.path.join(receipt_folder, filename)
-                receipt_path = f"receipts/{filename}"
-
-                c = canvas.Canvas(file_path)
-                c.setFont("Helvetica-Bold", 16)
-                c.drawString(200, 800, "Fee Payment Receipt")
-                c.setFont("Helvetica", 12)
-                c.drawString(50, 750, f"Student Name: {student_name}")
-                c.drawString(50, 710, f"Class/Grade: {grade}")
-                c.drawString(50, 690, f"Academic Year: {academic_year}")
-                c.drawString(50, 670, f"Total Fee Paid: Rs.{payment.amount}")
-                c.drawString(50, 650, f"Payment Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                c.drawString(50, 630, f"Payment Method: {payment.gateway}")
-                c.drawString(50, 610, f"Transaction ID: {payment.transaction_id}")
-                c.showPage()
-                c.save()
-
-                TransactionLog.objects.create(
-                    log_message=f"Receipt PDF generated at {file_path}",
-                    log_type="info"
-                )
-            except Exception as e:
-                TransactionLog.objects.create(
-                    log_message=f"Receipt PDF generation failed: {str(e)}",
-                    log_type="error"
-                )
-                context.set_code(grpc.StatusCode.INTERNAL)
-                context.set_details(f"PDF generation failed: {str(e)}")
-                return payment_pb2.GenerateReceiptResponse()
-
-            try:
-                receipt = Receipt.objects.create(
-                    payment=payment,
-                    receipt_number=f"RCPT{payment.id}",
-                    student_id=request.student_id,  # from user_service
-                    fee_structure=payment.student_fee.fee_structure,
-                    amount_paid=payment.amount,
-                    fine_amount=0,
-                    total_amount=payment.amount,
-                    receipt_file=receipt_path,
-                    issued_date=timezone.now()
-                )
+            results = verify_batch(
+                (p.payment_id, p.razorpay_order_id, p.razorpay_payment_id, p.razorpay_signature)
+                for p in request.payments
+            )
+        except Exception as e:
+            write_log(
+                log_message=f"Batch payment verification failed: {str(e)}",
+                log_type="error"
+            )
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return payment_pb2.BatchVerifyRazorpayResponse()
+
+        response = payment_pb2.BatchVerifyRazorpayResponse()
+        for payment_id, razorpay_payment_id, status in results:
+            response.results.add(
+                payment_id=payment_id,
+                razorpay_payment_id=razorpay_payment_id,
+                valid=status in ("verified", "already_verified"),
+                status=status,
+            )
+        response.verified = sum(status == "verified" for _, _, status in results)
+        response.rejected = sum(not result.valid for result in response.results)
+        write_log(
+            log_message=f"Batch verification: {response.verified} verified, {response.rejected} rejected "
+                        f"of {len(results)}",
+            log_type="warning" if response.rejected else "success",
+            audit=True,
+        )
+        return response
 
-                receipt_url = settings.MEDIA_URL + receipt.receipt_file
+    @idempotent(payment_pb2.OfflinePaymentBatchResponse)
+    def PostOfflinePayments(self, request, context):
+        try:
+            results = post_offline_batch(
+                (p.student_fee_id, p.student_id, Decimal(str(p.amount)), p.reference) for p in request.payments
+            )
+        except Exception as e:
+            write_log(
+                log_message=f"Offline batch posting failed: {str(e)}",
+                log_type="error"
+            )
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return payment_pb2.OfflinePaymentBatchResponse()
+
+        response = payment_pb2.OfflinePaymentBatchResponse()
+        for student_fee_id, reference, status, payment_id, amount in results:
+            response.results.add(
+                student_fee_id=student_fee_id,
+                reference=reference,
+                status=status,
+                payment_id=payment_id or 0,
+                amount=float(amount),
+            )
+            if status == POSTED:
+                response.posted += 1
+                response.posted_amount += float(amount)
+        response.rejected = len(results) - response.posted
+        return response
 
-                TransactionLog.objects.create(
-                    log_message=f"Receipt record created successfully, receipt_id={receipt.id}, url={receipt_url}",
-                    log_type="success"
-                )
+    def GenerateReceipt(self, request, context):
+        try:
+            payment = Payment.objects.select_related('student_fee').get(id=request.payment_id)
+        except Payment.DoesNotExist:
+            write_log(
+                log_message=f"Payment record not found for payment_id={request.payment_id}",
+                log_type="error"
+            )
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details("Payment record not found")
+            return payment_pb2.GenerateReceiptResponse()
 
-                return payment_pb2.GenerateReceiptResponse(
-                    message="Receipt generated successfully",
-                    receipt_url=receipt_url
-                )
-            except Exception as e:
-                TransactionLog.objects.create(
-                    log_message=f"Receipt DB entry creation failed: {str(e)}",
-                    log_type="error"
-                )
-                context.set_code(grpc.StatusCode.INTERNAL)
-                context.set_details(f"Receipt save failed: {str(e)}")
+        if payment.status != 'success':
+            context.set_code(grpc.StatusCode.FAILED_PRECONDITION)
+            context.set_details(f"Payment is {payment.status}; receipts are only issued for successful payments")
             return payment_pb2.GenerateReceiptResponse()
 
+        # the student and class are the fee's, never the caller's; the worker pool
+        # looks up the name and renders the PDF
+        fee = payment.student_fee
+        structure = get_fee_structure(fee.fee_structure_id)
+        student = None
+        if structure is not None:
+            student = {"grade": structure.grade, "academic_year": structure.academic_year}
+        try:
+            receipt = request_receipt(payment, fee.student_id, student)
         except Exception as e:
+            write_log(
+                log_message=f"Receipt generation could not be queued: {str(e)}",
+                log_type="error"
+            )
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(str(e))
             return payment_pb2.GenerateReceiptResponse()
 
-    def ListTransactionLogs(self, request, context):
-        logs = TransactionLog.objects.all().order_by('-created_at')
-        response = payment_pb2.ListTransactionLogsResponse()
-
-        for log in logs:
-            response.logs.add(
-                id=log.id,
-                log_message=log.log_message,
-                log_type=log.log_type,
-                created_at=str(log.created_at)
+        if receipt.status == "ready":
+            message = "Receipt generated successfully"
+        else:
+            message = "Receipt generation queued"
+            write_log(
+                log_message=f"Receipt {receipt.receipt_number} queued for payment_id={payment.id}",
+                log_type="info"
             )
-        return response
+        return payment_pb2.GenerateReceiptResponse(
+            message=message,
+            receipt_url=receipt_url(receipt),
+            receipt_number=receipt.receipt_number,
+            status=receipt.status,
+        )
+
+    def GetReceipt(self, request, context):
+        receipt = Receipt.objects.filter(receipt_number=request.receipt_number).first()
+        if receipt is None:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details("Receipt not found")
+            return payment_pb2.GetReceiptResponse()
+        return payment_pb2.GetReceiptResponse(
+            receipt_number=receipt.receipt_number,
+            status=receipt.status,
+            receipt_url=receipt_url(receipt),
+            payment_id=receipt.payment_id,
+            student_id=receipt.student_id,
+            receipt_file=receipt.receipt_file or "",
+            content_hash=receipt.receipt_hash or "",
+        )
+
+    def ListTransactionLogs(self, request, context):
+        logs = iter_logs(
+            log_type=request.log_type,
+            since=request.since,
+            until=request.until,
+            cursor=request.cursor,
+            page_size=request.page_size,
+            limit=request.limit,
+        )
+        try:
+            for log_id, log_message, log_type, created_at in logs:
+                if not context.is_active():
+                    return  # client went away: stop paging the table
+                yield payment_pb2.TransactionLog(
+                    id=log_id,
+                    log_message=log_message,
+                    log_type=log_type,
+                    created_at=str(created_at),
+                    cursor=encode_cursor(created_at, log_id),
+                )
+        except InvalidLogQuery as e:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(str(e))
             
 def serve():
     server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
     payment_pb2_grpc.add_PaymentServiceServicer_to_server(PaymentService(), server)
     server.add_insecure_port("[::]:50052")  # listen on port 50052
+    start_log_writer()
+    get_fee_structures().load()
     server.start()
     print("Payment gRPC server started on port 50052")
     try:
@@ -456,6 +522,8 @@ def serve():
             time.sleep(86400)
     except KeyboardInterrupt:
         server.stop(0)
+        stop_receipt_queue()
+        stop_log_writer()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,98 @@
+"""Idempotency keys for the payment RPCs.
+
+A client that may retry sends an ``idempotency-key`` metadata entry (the REST
+views forward the ``Idempotency-Key`` header). The first successful response
+for a key is stored with a hash of its request, and a retry with the same key
+and request gets that response back after one lookup on the unique key: no
+fee locks, no gateway call, no log writes. Reusing a key for a different
+request is refused with ALREADY_EXISTS. Error responses are not stored, so a
+retry after a failure runs again.
+
+Entries live for PAYMENT_IDEMPOTENCY_TTL seconds; ``manage.py
+purge_idempotency_keys`` deletes expired ones. Two first attempts racing with
+the same key both run (the payment flows are safe to repeat) and the later
+response is the one kept.
+"""
+import functools
+import hashlib
+from datetime import timedelta
+
+import grpc
+from django.conf import settings
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+METADATA_KEY = 'idempotency-key'
+
+
+class _StatusRecorder:
+    """Servicer context proxy that remembers the status code the method set."""
+
+    def __init__(self, context):
+        self._context = context
+        self.code = None
+
+    def set_code(self, code):
+        self.code = code
+        self._context.set_code(code)
+
+    def __getattr__(self, name):
+        return getattr(self._context, name)
+
+
+def request_key(context):
+    for name, value in context.invocation_metadata() or ():
+        if name == METADATA_KEY:
+            return value
+    return None
+
+
+def request_hash(method, request):
+    payload = request.SerializeToString(deterministic=True)
+    return hashlib.sha256(method.encode() + b'\0' + payload).hexdigest()
+
+
+def idempotent(response_class):
+    """Decorate a unary servicer method so retries carrying the same key are answered from storage."""
+    def decorator(method):
+        name = method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self, request, context):
+            key = request_key(context)
+            if not key:
+                return method(self, request, context)
+            digest = request_hash(name, request)
+            now = timezone.now()
+            stored = IdempotencyKey.objects.filter(key=key).values_list(
+                'request_hash', 'response', 'expires_at'
+            ).first()
+            if stored and stored[2] > now:
+                if stored[0] != digest:
+                    context.set_code(grpc.StatusCode.ALREADY_EXISTS)
+                    context.set_details("Idempotency key was already used for a different request")
+                    return response_class()
+                return response_class.FromString(bytes(stored[1]))
+
+            recorder = _StatusRecorder(context)
+            response = method(self, request, recorder)
+            if recorder.code in (None, grpc.StatusCode.OK):
+                IdempotencyKey.objects.bulk_create(
+                    [IdempotencyKey(
+                        key=key, method=name, request_hash=digest, response=response.SerializeToString(),
+                        created_at=now, expires_at=now + timedelta(seconds=settings.PAYMENT_IDEMPOTENCY_TTL),
+                    )],
+                    update_conflicts=True,
+                    unique_fields=['key'],
+                    update_fields=['method', 'request_hash', 'response', 'created_at', 'expires_at'],
+                )
+            return response
+        return wrapper
+    return decorator
+
+
+def purge_expired_keys(now=None):
+    """Delete expired idempotency entries; returns how many were removed."""
+    deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=now or timezone.now()).delete()
+    return deleted
@@ -0,0 +1,120 @@
+import uuid
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .ledger import record_payments
+from .reports import mark_report_stale_on_commit
+from .models import Payment, StudentFee
+
+Reservation = namedtuple('Reservation', ['token', 'student_fee_id', 'amount'])
+
+
+class InitiationRejected(Exception):
+    pass
+
+
+class FeeNotFound(InitiationRejected):
+    pass
+
+
+class FeeAlreadyPaid(InitiationRejected):
+    pass
+
+
+class FeeReserved(InitiationRejected):
+    pass
+
+
+class ReservationExpired(InitiationRejected):
+    pass
+
+
+def reserve_fee(student_fee_id, student_id):
+    """Phase 1: claim the fee with one conditional UPDATE and return a Reservation.
+
+    A reservation older than PAYMENT_RESERVATION_TTL is treated as abandoned and
+    can be claimed again, so a crashed initiation never blocks a fee for good.
+    Returns the existing Payment instead when one is already initiated.
+    """
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    with transaction.atomic():
+        claimed = StudentFee.objects.filter(
+            Q(reserved_until__isnull=True) | Q(reserved_until__lt=now),
+            id=student_fee_id, student_id=student_id,
+        ).exclude(status='paid').update(
+            reservation_token=token,
+            reserved_until=now + timedelta(seconds=settings.PAYMENT_RESERVATION_TTL),
+        )
+        if not claimed:
+            status = StudentFee.objects.filter(
+                id=student_fee_id, student_id=student_id
+            ).values_list('status', flat=True).first()
+            if status is None:
+                raise FeeNotFound("StudentFee not found")
+            if status == 'paid':
+                raise FeeAlreadyPaid("Fee already paid")
+            raise FeeReserved("Payment is already being processed")
+
+        existing = Payment.objects.filter(student_fee_id=student_fee_id, status='initiated').first()
+        if existing:
+            _release(student_fee_id, token)
+            return existing
+        amount = StudentFee.objects.filter(id=student_fee_id).values_list('total_amount', flat=True).get()
+    return Reservation(token, student_fee_id, amount)
+
+
+def _release(student_fee_id, token):
+    return StudentFee.objects.filter(id=student_fee_id, reservation_token=token).update(
+        reservation_token=None, reserved_until=None
+    )
+
+
+def release_reservation(reservation):
+    """Give the fee back after a failed gateway call."""
+    return _release(reservation.student_fee_id, reservation.token)
+
+
+def finalize_payment(reservation, gateway, order_id=None):
+    """Phase 3: record the payment and release the reservation; safe to retry.
+
+    A retry for a gateway order that was already recorded returns the same
+    Payment. If the reservation expired and was reclaimed meanwhile, nothing is
+    written and ReservationExpired is raised.
+    """
+    with transaction.atomic():
+        if order_id:
+            existing = Payment.objects.filter(transaction_id=order_id).first()
+            if existing:
+                return existing
+        if not _release(reservation.student_fee_id, reservation.token):
+            raise ReservationExpired("Payment reservation expired, please retry")
+
+        if gateway == 'offline':
+            fee = StudentFee.objects.filter(id=reservation.student_fee_id)
+            student_id, fee_structure_id, status, total = fee.values_list(
+                'student_id', 'fee_structure_id', 'status', 'total_amount'
+            ).get()
+            fee.update(status='paid')
+            payment = Payment.objects.create(
+                student_fee_id=reservation.student_fee_id,
+                gateway='offline',
+                amount=reservation.amount,
+                status='success',
+                remarks='Cash/Offline',
+            )
+            record_payments([(student_id, payment.amount, total, status == 'overdue')])
+            mark_report_stale_on_commit([fee_structure_id])
+            return payment
+        return Payment.objects.create(
+            student_fee_id=reservation.student_fee_id,
+            gateway=gateway,
+            transaction_id=order_id,
+            amount=reservation.amount,
+            status='initiated',
+        )
@@ -0,0 +1,129 @@
+"""Student fee ledger: the joined fee listing and the per-student balance summary.
+
+StudentBalance is maintained incrementally. Payments, the hot path, apply
+deltas with record_payments (one UPDATE for any number of students). Fine runs
+and new fees change totals in ways a delta would have to replay, so they call
+refresh_balances for just the students involved, which recomputes those rows
+from the source tables; the nightly fine run recomputes everyone, which also
+corrects any drift.
+"""
+from decimal import Decimal
+
+from django.db.models import Case, Count, DecimalField, F, IntegerField, Max, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Fine, Payment, StudentBalance, StudentFee
+
+UNPAID_STATUSES = ('pending', 'overdue')  # also used by the fine engine
+BALANCE_FIELDS = ['total_due', 'total_paid', 'total_fines', 'overdue_count', 'fee_count', 'updated_at']
+_MONEY = DecimalField(max_digits=12, decimal_places=2)
+_ZERO = Value(Decimal('0'), output_field=_MONEY)
+
+
+def student_fees(student_id):
+    """Every fee of a student with its current fine and amount paid, in one query.
+
+    Structures come from the process cache (fee_structures.py), not the join.
+
+    Fine is unique per fee, so joining it next to Payment does not multiply the
+    payment rows being summed.
+    """
+    return (
+        StudentFee.objects.filter(student_id=student_id)
+        .annotate(
+            fine_amount=Coalesce(Max('fine__fine_amount'), _ZERO, output_field=_MONEY),
+            days_overdue=Coalesce(Max('fine__days_overdue'), Value(0)),
+            paid_amount=Coalesce(
+                Sum('payment__amount', filter=Q(payment__status='success')), _ZERO, output_field=_MONEY
+            ),
+        )
+        .order_by('due_date', 'id')
+    )
+
+
+def refresh_balances(student_ids=None):
+    """Recompute StudentBalance for ``student_ids`` (an iterable or a values queryset; None = everyone)."""
+    fees = StudentFee.objects.all()
+    fines = Fine.objects.all()
+    payments = Payment.objects.filter(status='success')
+    if student_ids is not None:
+        fees = fees.filter(student_id__in=student_ids)
+        fines = fines.filter(student_id__in=student_ids)
+        payments = payments.filter(student_fee__student_id__in=student_ids)
+
+    now = timezone.now()
+    balances = {}
+
+    def balance(student_id):
+        if student_id not in balances:
+            balances[student_id] = StudentBalance(student_id=student_id, updated_at=now)
+        return balances[student_id]
+
+    for row in fees.values('student_id').annotate(
+        due=Sum('total_amount', filter=Q(status__in=UNPAID_STATUSES)),
+        overdue=Count('id', filter=Q(status='overdue')),
+        count=Count('id'),
+    ).order_by():
+        entry = balance(row['student_id'])
+        entry.total_due = row['due'] or 0
+        entry.overdue_count = row['overdue']
+        entry.fee_count = row['count']
+    for row in fines.values('student_id').annotate(total=Sum('fine_amount')).order_by():
+        balance(row['student_id']).total_fines = row['total'] or 0
+    for row in payments.values('student_fee__student_id').annotate(total=Sum('amount')).order_by():
+        balance(row['student_fee__student_id']).total_paid = row['total'] or 0
+
+    if student_ids is not None and not hasattr(student_ids, 'query'):
+        for student_id in student_ids:
+            balance(student_id)  # a student with nothing left still gets a zeroed row
+    StudentBalance.objects.bulk_create(
+        balances.values(),
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['student_id'],
+        update_fields=BALANCE_FIELDS,
+    )
+    return len(balances)
+
+
+def record_payments(settled):
+    """Apply newly paid fees to the balance summaries as deltas.
+
+    ``settled`` holds (student_id, amount_paid, fee_total, was_overdue) per fee
+    that just became paid. Runs one UPDATE; students without a summary row yet
+    are given one by a full refresh instead.
+    """
+    deltas = {}
+    for student_id, amount, fee_total, was_overdue in settled:
+        paid, due, overdue = deltas.get(student_id, (0, 0, 0))
+        deltas[student_id] = (paid + amount, due + fee_total, overdue + int(was_overdue))
+    if not deltas:
+        return
+
+    def per_student(index, output_field):
+        return Case(
+            *[When(student_id=student_id, then=Value(delta[index])) for student_id, delta in deltas.items()],
+            output_field=output_field,
+        )
+
+    updated = StudentBalance.objects.filter(student_id__in=deltas).update(
+        total_paid=F('total_paid') + per_student(0, _MONEY),
+        total_due=F('total_due') - per_student(1, _MONEY),
+        overdue_count=F('overdue_count') - per_student(2, IntegerField()),
+        updated_at=timezone.now(),
+    )
+    if updated < len(deltas):
+        missing = set(deltas) - set(
+            StudentBalance.objects.filter(student_id__in=deltas).values_list('student_id', flat=True)
+        )
+        refresh_balances(missing)
+
+
+def get_balance(student_id):
+    """The student's summary row, built on first use for students that predate the ledger."""
+    summary = StudentBalance.objects.filter(student_id=student_id).first()
+    if summary is None:
+        refresh_balances([student_id])
+        summary = StudentBalance.objects.get(student_id=student_id)
+    return summary
@@ -0,0 +1,189 @@
+"""TransactionLog writes (buffered, batched) and reads (keyset-paginated, newest first).
+
+Writes go through write_log. Inside the gRPC server a TransactionLogWriter
+buffers entries and a background thread inserts them with bulk_create once
+TRANSACTION_LOG_BATCH_SIZE entries are waiting or TRANSACTION_LOG_FLUSH_INTERVAL
+seconds have passed, so RPCs never wait on a log INSERT or hold their transaction
+open for one. ``audit=True`` entries, and every entry when no writer is running
+(management commands, tests), are written immediately in the caller's transaction.
+
+Reads are ordered by (created_at, id) descending and each page starts strictly
+after the last row of the previous one, so a page costs the same however deep
+into the table it is, and rows inserted while a client is reading do not shift
+it. A cursor is that position, ``<created_at iso>|<id>``, and can resume a listing.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import TransactionLog
+
+logger = logging.getLogger(__name__)
+
+LOG_FIELDS = ('id', 'log_message', 'log_type', 'created_at')
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+class TransactionLogWriter:
+    """Buffers TransactionLog rows and inserts them in batches on a background thread.
+
+    Entries keep the time they were logged, not the time they were flushed. A
+    failed flush keeps its rows for the next attempt, up to ``max_pending`` rows;
+    past that the oldest are dropped (and reported) rather than growing without bound.
+    """
+
+    def __init__(self, batch_size=None, flush_interval=None, max_pending=None):
+        self.batch_size = batch_size or settings.TRANSACTION_LOG_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.TRANSACTION_LOG_FLUSH_INTERVAL
+        self.max_pending = max_pending or settings.TRANSACTION_LOG_MAX_PENDING
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='transaction-log-writer', daemon=True)
+        self._thread.start()
+
+    def write(self, log_message, log_type='info'):
+        entry = TransactionLog(log_message=log_message, log_type=log_type, created_at=timezone.now())
+        with self._lock:
+            self._pending.append(entry)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """Insert everything buffered so far; returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                TransactionLog.objects.bulk_create(batch, batch_size=self.batch_size)
+            except Exception:
+                logger.exception("Could not write %d transaction log entries", len(batch))
+                with self._lock:
+                    self._pending[:0] = batch
+                    dropped = len(self._pending) - self.max_pending
+                    if dropped > 0:
+                        del self._pending[:dropped]
+                        logger.error("Dropped %d transaction log entries", dropped)
+                connection.close()
+                return 0
+            return len(batch)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            close_old_connections()
+            self.flush()
+        connection.close()
+
+    def close(self):
+        """Stop the background thread and flush what is left from the calling thread."""
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+
+
+def write_log(log_message, log_type='info', audit=False):
+    """Record a TransactionLog entry.
+
+    Buffered while a writer is running unless ``audit`` is set: audit entries are
+    inserted now, inside the caller's transaction, so they commit or roll back
+    together with the change they record.
+    """
+    writer = _writer
+    if audit or writer is None:
+        TransactionLog.objects.create(log_message=log_message, log_type=log_type)
+    else:
+        writer.write(log_message, log_type)
+
+
+def start_log_writer(**options):
+    """Buffer write_log entries in this process from now on (the gRPC server calls this)."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = TransactionLogWriter(**options)
+    return _writer
+
+
+def stop_log_writer():
+    """Flush buffered entries and go back to immediate writes."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.close()
+
+
+class InvalidLogQuery(ValueError):
+    pass
+
+
+def encode_cursor(created_at, log_id):
+    return f"{created_at.isoformat()}|{log_id}"
+
+
+def decode_cursor(cursor):
+    created_at, _, log_id = cursor.rpartition('|')
+    try:
+        return _parse_time(created_at, 'cursor'), int(log_id)
+    except ValueError:
+        raise InvalidLogQuery(f"Invalid cursor: {cursor!r}")
+
+
+def _parse_time(value, name):
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise InvalidLogQuery(f"Invalid {name}: {value!r}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def iter_logs(log_type=None, since=None, until=None, cursor=None, page_size=None, limit=None):
+    """Yield TransactionLog rows as (id, log_message, log_type, created_at) tuples.
+
+    ``since`` is inclusive and ``until`` exclusive (ISO-8601 strings); ``cursor``
+    resumes after a previously returned row. Each page is one indexed query of
+    ``page_size`` rows; nothing is read beyond what the caller consumes.
+    """
+    page_size = page_size or settings.TRANSACTION_LOG_PAGE_SIZE
+    logs = TransactionLog.objects.order_by('-created_at', '-id')
+    if log_type:
+        logs = logs.filter(log_type=log_type)
+    if since:
+        logs = logs.filter(created_at__gte=_parse_time(since, 'since'))
+    if until:
+        logs = logs.filter(created_at__lt=_parse_time(until, 'until'))
+    position = decode_cursor(cursor) if cursor else None
+
+    remaining = limit or None
+    while True:
+        size = min(page_size, remaining) if remaining else page_size
+        page = logs
+        if position:
+            created_at, log_id = position
+            # (created_at, id) < position, written so created_at stays a range bound on the index
+            page = page.filter(created_at__lte=created_at).exclude(created_at=created_at, id__gte=log_id)
+        rows = list(page.values_list(*LOG_FIELDS)[:size])
+        yield from rows
+        if remaining:
+            remaining -= len(rows)
+        if len(rows) < size or remaining == 0:
+            return
+        position = (rows[-1][3], rows[-1][0])
@@ -0,0 +1,41 @@
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from payments.logs import write_log
+from payments.retention import archive_logs
+
+
+class Command(BaseCommand):
+    help = (
+        "Move TransactionLog rows older than the retention window into monthly .jsonl.gz archives and "
+        "per-month summaries (schedule daily, or keep running with --every)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help="Retention window (default TRANSACTION_LOG_RETENTION_DAYS)")
+        parser.add_argument('--before', type=date.fromisoformat, help="Archive rows before this date (YYYY-MM-DD)")
+        parser.add_argument('--chunk-size', type=int)
+        parser.add_argument('--every', type=float, help="Repeat every N seconds instead of running once")
+
+    def handle(self, *args, **options):
+        while True:
+            self.run_once(options)
+            if not options['every']:
+                return
+            time.sleep(options['every'])
+
+    def run_once(self, options):
+        before = None
+        if options['before']:
+            before = timezone.make_aware(datetime.combine(options['before'], dt_time.min))
+        elif options['days'] is not None:
+            before = timezone.now() - timedelta(days=options['days'])
+        summary = archive_logs(before=before, chunk_size=options['chunk_size'])
+        message = f"Log retention: {summary['archived']} entries archived"
+        if summary['months']:
+            message += f" ({', '.join(summary['months'])})"
+        write_log(log_message=message, log_type="info")
+        self.stdout.write(message)
@@ -0,0 +1,131 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.db.models import Max
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from payments.fake_gateway import FakeGatewayServer
+from payments.gateway import reset_gateway
+from payments.grpc_server import PaymentService
+from payments.ledger import refresh_balances
+from payments.logs import start_log_writer, stop_log_writer
+from payments.models import FeeStructure, StudentFee, TransactionLog
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure concurrent payment throughput against the configured database (run once per DB_ENGINE "
+        "to compare backends). --gateway razorpay runs initiate, checkout and verify against an in-process "
+        "fake gateway with --latency/--error-rate. --buffered-logs batches TransactionLog writes as the gRPC "
+        "server does. Benchmark rows are removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--payments', type=int, default=2000)
+        parser.add_argument('--workers', type=int, default=10)
+        parser.add_argument('--gateway', choices=['offline', 'razorpay'], default='offline')
+        parser.add_argument('--latency', type=float, default=0.05, help="Fake gateway seconds per request")
+        parser.add_argument('--error-rate', type=float, default=0.0, help="Fake gateway failure fraction")
+        parser.add_argument('--buffered-logs', action='store_true', help="Write TransactionLogs in batches")
+
+    def handle(self, *args, **options):
+        count = options['payments']
+        workers = options['workers']
+        gateway = options['gateway']
+        due_date = timezone.now().date() + timedelta(days=30)
+        last_log_id = TransactionLog.objects.aggregate(last=Max('id'))['last'] or 0
+        fee_structure = FeeStructure.objects.create(
+            grade=-1, academic_year='bench_payments', base_fee=1000, due_date=due_date, fine_per_day=0
+        )
+        StudentFee.objects.bulk_create(
+            StudentFee(student_id=student_id, fee_structure=fee_structure, total_amount=1000, due_date=due_date)
+            for student_id in range(1, count + 1)
+        )
+        fees = list(StudentFee.objects.filter(fee_structure=fee_structure).values_list('id', 'student_id'))
+        student_ids = [student_id for _, student_id in fees]
+        refresh_balances(student_ids)  # as the fee consumer does when it creates a fee
+        service = PaymentService()
+        fake = None
+        if gateway == 'razorpay':
+            fake = FakeGatewayServer(
+                ('127.0.0.1', 0), 'rzp_bench', 'bench_secret',
+                latency=options['latency'], error_rate=options['error_rate'],
+            )
+            fake.start()
+            gateway_settings = override_settings(
+                RAZORPAY_KEY_ID='rzp_bench', RAZORPAY_KEY_SECRET='bench_secret',
+                PAYMENT_GATEWAY_BASE_URL=fake.base_url, PAYMENT_GATEWAY_POOL_SIZE=workers,
+            )
+            gateway_settings.enable()
+            reset_gateway()
+        if options['buffered_logs']:
+            start_log_writer()
+        latencies = []
+        errors = []
+        guard = threading.Lock()
+
+        def run(batch):
+            local = []
+            failed = 0
+            try:
+                for fee_id, student_id in batch:
+                    context = MagicMock()
+                    started = time.perf_counter()
+                    response = service.InitiatePayment(
+                        MagicMock(student_fee_id=fee_id, student_id=student_id, gateway=gateway), context
+                    )
+                    if gateway == 'razorpay' and not context.set_code.called:
+                        checkout = self.checkout(fake, response.order_id)
+                        service.VerifyRazorpayPayment(
+                            MagicMock(payment_id=response.payment_id, **checkout), context
+                        )
+                    local.append(time.perf_counter() - started)
+                    failed += context.set_code.called
+            finally:
+                connection.close()
+            with guard:
+                latencies.extend(local)
+                errors.append(failed)
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(run, [fees[i::workers] for i in range(workers)]))
+            elapsed = time.perf_counter() - started
+        finally:
+            stop_log_writer()
+            if fake is not None:
+                reset_gateway()
+                gateway_settings.disable()
+                fake.stop()
+            connections.close_all()
+            fee_structure.delete()
+            refresh_balances(student_ids)
+            TransactionLog.objects.filter(id__gt=last_log_id).delete()
+
+        latencies.sort()
+        engine = connection.settings_dict['ENGINE'].rsplit('.', 1)[-1]
+        self.stdout.write(
+            f"{gateway} payments on {engine}{' (buffered logs)' if options['buffered_logs'] else ''}: "
+            f"{len(latencies)} calls, {workers} workers, {sum(errors)} errors\n"
+            f"  throughput {len(latencies) / elapsed:.1f} calls/s\n"
+            f"  latency p50 {statistics.median(latencies) * 1000:.1f} ms, "
+            f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms"
+        )
+
+    def checkout(self, fake, order_id):
+        # what the browser does between InitiatePayment and VerifyRazorpayPayment
+        order = fake.orders[order_id]
+        payment_id = f"pay_bench{order_id}"
+        return {
+            'razorpay_order_id': order['id'],
+            'razorpay_payment_id': payment_id,
+            'razorpay_signature': fake.sign(order['id'], payment_id),
+        }
@@ -0,0 +1,95 @@
+import io
+import os
+import tempfile
+import time
+import zipfile
+
+from django.core.management.base import BaseCommand
+from reportlab.pdfgen import canvas
+
+from payments.receipt_render import render_chunk, render_receipt_document
+from payments.receipt_storage import LocalReceiptStorage
+from payments.receipts import _in_order, _spawn_pool
+
+
+def _legacy_receipt(path, fields):
+    # the per-call layout GenerateReceipt drew before the cached template
+    c = canvas.Canvas(path)
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(200, 800, "Fee Payment Receipt")
+    c.setFont("Helvetica", 12)
+    c.drawString(50, 750, f"Student Name: {fields['student_name']}")
+    c.drawString(50, 710, f"Class/Grade: {fields['grade']}")
+    c.drawString(50, 690, f"Academic Year: {fields['academic_year']}")
+    c.drawString(50, 670, f"Total Fee Paid: Rs.{fields['amount']}")
+    c.drawString(50, 650, f"Payment Date: {fields['payment_date']}")
+    c.drawString(50, 630, f"Payment Method: {fields['gateway']}")
+    c.drawString(50, 610, f"Transaction ID: {fields['transaction_id']}")
+    c.showPage()
+    c.save()
+
+
+class Command(BaseCommand):
+    help = "Measure receipts/second for the per-call renderer and each bulk output mode (no database needed)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=2000)
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument('--chunk-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        count, workers, chunk_size = options['count'], options['workers'], options['chunk_size']
+        with tempfile.TemporaryDirectory() as out:
+            receipts = [
+                {
+                    'receipt_number': f"RCPT{n}",
+                    'student_name': f"Student {n}",
+                    'grade': 5,
+                    'academic_year': '2025-2026',
+                    'amount': '12500.00',
+                    'payment_date': '2026-03-31 10:00:00',
+                    'gateway': 'razorpay',
+                    'transaction_id': f"pay_{n:014d}",
+                }
+                for n in range(count)
+            ]
+            os.makedirs(os.path.join(out, 'legacy'))
+            chunks = [receipts[i:i + chunk_size] for i in range(0, count, chunk_size)]
+            storage = LocalReceiptStorage(out)
+
+            def per_call():
+                for fields in receipts:
+                    _legacy_receipt(os.path.join(out, 'legacy', f"{fields['receipt_number']}.pdf"), fields)
+
+            def pool_run(output):
+                with _spawn_pool(workers) as pool:
+                    # workers started and the renderer imported before the clock starts
+                    for warmup in [pool.submit(render_chunk, []) for _ in range(workers)]:
+                        warmup.result()
+                    started = time.perf_counter()
+                    results = _in_order(pool, render_chunk, chunks, window=workers * 2)
+                    if output == 'files':
+                        for chunk in results:
+                            for _, pdf in chunk:
+                                storage.save(pdf)
+                    else:
+                        with zipfile.ZipFile(io.BytesIO(), 'w') as archive:
+                            for chunk in results:
+                                for number, pdf in chunk:
+                                    archive.writestr(f"{number}.pdf", pdf)
+                    return time.perf_counter() - started
+
+            runs = [
+                ("per-call canvas, 1 process", per_call),
+                ("template, one multi-page PDF", lambda: render_receipt_document(
+                    os.path.join(out, 'all.pdf'), receipts)),
+            ]
+            for label, run in runs:
+                started = time.perf_counter()
+                run()
+                self.report(label, count, time.perf_counter() - started)
+            self.report(f"template, stored files, {workers} workers", count, pool_run('files'))
+            self.report(f"template, zip stream, {workers} workers", count, pool_run('zip'))
+
+    def report(self, label, count, elapsed):
+        self.stdout.write(f"{label:<36} {count / elapsed:>9,.0f} receipts/s")
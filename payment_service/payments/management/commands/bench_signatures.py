@@ -0,0 +1,55 @@
+import time
+
+import razorpay
+from django.core.management.base import BaseCommand
+
+from payments.verification import SignatureVerifier
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare Razorpay signature verification paths: the SDK with a client per call (the old "
+        "VerifyRazorpayPayment), the SDK with a shared client, and the local precomputed HMAC verifier."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=50000)
+
+    def handle(self, *args, **options):
+        count = options['count']
+        key_id, key_secret = 'rzp_bench', 'bench_secret'
+        verifier = SignatureVerifier(key_secret)
+        callbacks = [
+            (f"order_{n:014d}", f"pay_{n:014d}", verifier.sign(f"order_{n:014d}", f"pay_{n:014d}"))
+            for n in range(count)
+        ]
+        shared = razorpay.Client(auth=(key_id, key_secret))
+
+        def sdk_per_call(order_id, payment_id, signature):
+            razorpay.Client(auth=(key_id, key_secret)).utility.verify_payment_signature({
+                "razorpay_order_id": order_id,
+                "razorpay_payment_id": payment_id,
+                "razorpay_signature": signature,
+            })
+
+        def sdk_shared(order_id, payment_id, signature):
+            shared.utility.verify_payment_signature({
+                "razorpay_order_id": order_id,
+                "razorpay_payment_id": payment_id,
+                "razorpay_signature": signature,
+            })
+
+        paths = [
+            ("SDK, client per call", sdk_per_call, callbacks[:max(count // 50, 1)]),
+            ("SDK, shared client", sdk_shared, callbacks),
+            ("local verifier", verifier.verify, callbacks),
+        ]
+        for label, verify, sample in paths:
+            started = time.perf_counter()
+            for order_id, payment_id, signature in sample:
+                verify(order_id, payment_id, signature)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{label:<22} {len(sample) / elapsed:>12,.0f} verifications/s "
+                f"({elapsed / len(sample) * 1e6:.1f} us each, {len(sample)} runs)"
+            )
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from payments.fake_gateway import FakeGatewayServer
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve a local fake of the Razorpay orders API for offline load tests. "
+        "Set PAYMENT_GATEWAY_BASE_URL to the printed URL in the payment service's environment."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=9100)
+        parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every request")
+        parser.add_argument('--jitter', type=float, default=0.0, help="Random +/- seconds around --latency")
+        parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests failing with 502")
+
+    def handle(self, *args, **options):
+        server = FakeGatewayServer(
+            (options['host'], options['port']),
+            settings.RAZORPAY_KEY_ID,
+            settings.RAZORPAY_KEY_SECRET,
+            latency=options['latency'],
+            jitter=options['jitter'],
+            error_rate=options['error_rate'],
+        )
+        self.stdout.write(f"Fake Razorpay gateway listening on {server.base_url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from payments.idempotency import purge_expired_keys
+
+
+class Command(BaseCommand):
+    help = "Delete idempotency keys past PAYMENT_IDEMPOTENCY_TTL (schedule daily)."
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Idempotency keys: {purge_expired_keys()} expired entries deleted")
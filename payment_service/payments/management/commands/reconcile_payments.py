@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from payments.reconciliation import reconcile_stale_payments
+
+
+class Command(BaseCommand):
+    help = (
+        "Settle or fail gateway payments left in 'initiated' by asking the gateway about their orders "
+        "(schedule every few minutes, or keep running with --every)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, help="Seconds (default PAYMENT_RECONCILE_AFTER)")
+        parser.add_argument('--batch-size', type=int)
+        parser.add_argument('--workers', type=int, help="Concurrent gateway lookups")
+        parser.add_argument('--every', type=float, help="Repeat every N seconds instead of running once")
+
+    def handle(self, *args, **options):
+        while True:
+            summary = reconcile_stale_payments(
+                older_than=options['older_than'], batch_size=options['batch_size'], workers=options['workers']
+            )
+            self.stdout.write(
+                f"Reconciliation: {summary['checked']} checked, {summary['succeeded']} settled, "
+                f"{summary['failed']} failed, {summary['unresolved']} unresolved"
+            )
+            if not options['every']:
+                return
+            time.sleep(options['every'])
@@ -0,0 +1,23 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from payments.fines import refresh_fines
+from payments.models import TransactionLog
+
+
+class Command(BaseCommand):
+    help = "Recompute overdue statuses, fines and totals for every unpaid StudentFee (schedule nightly)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, help="Compute as of this date (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        counts = refresh_fines(today=options['date'])
+        message = (
+            f"Fine refresh: {counts['overdue']} newly overdue, {counts['pending']} back to pending, "
+            f"{counts['fines']} fines upserted, {counts['totals']} totals updated, "
+            f"{counts['balances']} balances refreshed"
+        )
+        TransactionLog.objects.create(log_message=message, log_type="info")
+        self.stdout.write(message)
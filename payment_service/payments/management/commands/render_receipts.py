@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.models import Payment, TransactionLog
+from payments.receipts import render_bulk
+
+
+class Command(BaseCommand):
+    help = (
+        "Render receipts for every successful payment of an academic year (term-end run): as files "
+        "under MEDIA_ROOT/receipts, or as one zip or multi-page PDF at --dest."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('academic_year')
+        parser.add_argument('--grade', type=int)
+        parser.add_argument('--output', choices=['files', 'zip', 'pdf'], default='files')
+        parser.add_argument('--dest', help="Zip/PDF path for --output zip or pdf")
+        parser.add_argument('--workers', type=int)
+
+    def handle(self, *args, **options):
+        if options['output'] != 'files' and not options['dest']:
+            raise CommandError("--dest is required for zip and pdf output")
+        payments = Payment.objects.filter(
+            status='success', student_fee__fee_structure__academic_year=options['academic_year']
+        )
+        if options['grade'] is not None:
+            payments = payments.filter(student_fee__fee_structure__grade=options['grade'])
+
+        summary = render_bulk(payments, options['output'], options['dest'], workers=options['workers'])
+        message = f"Bulk receipts ({options['output']}): {summary['rendered']} rendered"
+        if summary['missing_students']:
+            message += f", {len(summary['missing_students'])} skipped (student not found)"
+        TransactionLog.objects.create(log_message=message, log_type="info")
+        self.stdout.write(message)
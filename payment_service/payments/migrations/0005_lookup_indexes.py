@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0004_remove_transactionlog_payment'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fine',
+            index=models.Index(fields=['student_id', 'student_fee'], name='payments_fine_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['student_fee', 'status'], name='payments_pay_fee_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='receipt',
+            index=models.Index(fields=['student_id', 'issued_date'], name='payments_receipt_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentfee',
+            index=models.Index(fields=['student_id', 'status'], name='payments_fee_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transactionlog',
+            index=models.Index(fields=['created_at', 'id'], name='payments_log_created_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:20
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicate_fines(apps, schema_editor):
+    # keep the most recent fine per fee
+    Fine = apps.get_model('payments', 'Fine')
+    duplicates = (
+        Fine.objects.values('student_fee_id')
+        .annotate(last_id=Max('id'), total=Count('id'))
+        .filter(total__gt=1)
+    )
+    for row in duplicates:
+        Fine.objects.filter(student_fee_id=row['student_fee_id']).exclude(id=row['last_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0005_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_fines, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='fine',
+            constraint=models.UniqueConstraint(fields=('student_fee',), name='unique_fine_per_fee'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0006_fine_per_fee'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='studentfee',
+            name='lock',
+        ),
+        migrations.AddField(
+            model_name='studentfee',
+            name='reservation_token',
+            field=models.CharField(blank=True, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='studentfee',
+            name='reserved_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
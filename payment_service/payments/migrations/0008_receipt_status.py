@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:01
+
+from django.db import migrations, models
+
+
+def mark_existing_receipts_ready(apps, schema_editor):
+    # receipts written before the worker pool were rendered synchronously
+    Receipt = apps.get_model('payments', 'Receipt')
+    Receipt.objects.filter(receipt_file__isnull=False).update(status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0007_fee_reservation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='receipt',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+        migrations.RunPython(mark_existing_receipts_ready, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0008_receipt_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='receipt',
+            name='receipt_hash',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0009_receipt_hash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transactionlog',
+            index=models.Index(fields=['log_type', 'created_at', 'id'], name='payments_log_type_created_idx'),
+        ),
+    ]
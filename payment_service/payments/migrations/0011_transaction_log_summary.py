@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0010_log_type_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionLogSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('log_type', models.CharField(max_length=20)),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('first_created_at', models.DateTimeField()),
+                ('last_created_at', models.DateTimeField()),
+                ('archive_file', models.CharField(max_length=255)),
+            ],
+            options={
+                'unique_together': {('month', 'log_type')},
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0011_transaction_log_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('student_id', models.IntegerField(unique=True)),
+                ('total_due', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_paid', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_fines', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('overdue_count', models.IntegerField(default=0)),
+                ('fee_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-19 18:20
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0012_student_balance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeeReportSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(max_length=10)),
+                ('fee_count', models.IntegerField(default=0)),
+                ('billed_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('collected_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('outstanding_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('stale_since', models.DateTimeField(blank=True, null=True)),
+                ('fee_structure', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='payments.feestructure')),
+            ],
+            options={
+                'unique_together': {('fee_structure', 'status')},
+            },
+        ),
+    ]
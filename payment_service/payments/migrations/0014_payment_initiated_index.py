@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0013_fee_report_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(condition=models.Q(('status', 'initiated')), fields=['payment_date'], name='payments_pay_initiated_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0015_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feestructure',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
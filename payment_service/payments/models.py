@@ -9,6 +9,7 @@ class FeeStructure(models.Model):
     due_date = models.DateField()
     fine_per_day = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)  # version of the in-process caches (fee_structures.py)
 
     class Meta:
         unique_together = ('grade', 'academic_year')
@@ -21,7 +22,9 @@ class StudentFee(models.Model):
     fee_structure = models.ForeignKey('FeeStructure', on_delete=models.CASCADE)  
     total_amount = models.DecimalField(max_digits=10, decimal_places=2) 
     due_date = models.DateField()
-    lock = models.IntegerField(default=0,)  
+    # set while an InitiatePayment is talking to the gateway; expired reservations are free again
+    reservation_token = models.CharField(max_length=32, null=True, blank=True)
+    reserved_until = models.DateTimeField(null=True, blank=True)
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('paid', 'Paid'),
@@ -31,6 +34,11 @@ class StudentFee(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['student_id', 'status'], name='payments_fee_student_idx'),
+        ]
+
     def update_status(self):
         today = timezone.now().date()
         if today > self.due_date:
@@ -63,10 +71,50 @@ class Payment(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='initiated')
     payment_date = models.DateTimeField(default=timezone.now)
     remarks = models.TextField(null=True, blank=True)
-   
+
+    class Meta:
+        indexes = [
+            # InitiatePayment's "already initiated" check
+            models.Index(fields=['student_fee', 'status'], name='payments_pay_fee_status_idx'),
+            # reconciliation scan; only the few rows still initiated are indexed
+            models.Index(
+                fields=['payment_date'], condition=models.Q(status='initiated'), name='payments_pay_initiated_idx'
+            ),
+        ]
+
     def __str__(self):
         return f"Payment {self.id} - {self.status} - {self.amount}"
 
+class StudentBalance(models.Model):
+    # per-student totals kept current by payments.ledger, so fee pages read one row
+    student_id = models.IntegerField(unique=True)
+    total_due = models.DecimalField(max_digits=12, decimal_places=2, default=0)  # unpaid fees, fines included
+    total_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_fines = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    overdue_count = models.IntegerField(default=0)
+    fee_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Balance for student {self.student_id}: {self.total_due} due"
+
+class FeeReportSnapshot(models.Model):
+    # materialized fee collection totals per structure and fee status (payments.reports)
+    fee_structure = models.ForeignKey('FeeStructure', on_delete=models.CASCADE)
+    status = models.CharField(max_length=10)
+    fee_count = models.IntegerField(default=0)
+    billed_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    collected_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    outstanding_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    computed_at = models.DateTimeField(default=timezone.now)
+    stale_since = models.DateTimeField(null=True, blank=True)  # recompute when >= computed_at
+
+    class Meta:
+        unique_together = ('fee_structure', 'status')
+
+    def __str__(self):
+        return f"{self.fee_structure} {self.status}: {self.collected_amount} collected"
+
 class Fine(models.Model):
     student_fee = models.ForeignKey('StudentFee', on_delete=models.CASCADE)
     student_id = models.IntegerField()
@@ -74,6 +122,15 @@ class Fine(models.Model):
     fine_amount = models.DecimalField(max_digits=10, decimal_places=2)
     calculated_on = models.DateField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['student_id', 'student_fee'], name='payments_fine_student_idx'),
+        ]
+        constraints = [
+            # one current fine per fee; the fine engine upserts on it
+            models.UniqueConstraint(fields=['student_fee'], name='unique_fine_per_fee'),
+        ]
+
     def __str__(self):
         return f"Fine {self.fine_amount} for {self.student_fee}"
 
@@ -86,7 +143,21 @@ class Receipt(models.Model):
     fine_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)  
     total_amount = models.DecimalField(max_digits=10, decimal_places=2)  
     receipt_file = models.CharField(max_length=255, null=True, blank=True)  
+    # sha256 of the PDF: its storage key and download ETag
+    receipt_hash = models.CharField(max_length=64, null=True, blank=True)
     issued_date = models.DateTimeField(default=timezone.now)
+    # the PDF is rendered by a worker process after GenerateReceipt returns
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['student_id', 'issued_date'], name='payments_receipt_student_idx'),
+        ]
 
     def __str__(self):
         return f"Receipt {self.receipt_number} - {self.student}"
@@ -105,5 +176,39 @@ class TransactionLog(models.Model):
     
     created_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='payments_log_created_idx'),
+            models.Index(fields=['log_type', 'created_at', 'id'], name='payments_log_type_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Log {self.id} - {self.log_type}"
+
+class TransactionLogSummary(models.Model):
+    # per month and type: what retention moved out of TransactionLog and where it went
+    month = models.DateField()  # first day of the month
+    log_type = models.CharField(max_length=20)
+    entry_count = models.PositiveIntegerField(default=0)
+    first_created_at = models.DateTimeField()
+    last_created_at = models.DateTimeField()
+    archive_file = models.CharField(max_length=255)
+
+    class Meta:
+        unique_together = ('month', 'log_type')
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} {self.log_type}: {self.entry_count}"
+
+
+class IdempotencyKey(models.Model):
+    # a payment RPC's response, replayed for retries that carry the same key until expires_at
+    key = models.CharField(max_length=255, unique=True)
+    method = models.CharField(max_length=64)
+    request_hash = models.CharField(max_length=64)  # sha256 of the serialized request
+    response = models.BinaryField()
+    created_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(db_index=True)
+
     def __str__(self):
-        return f"Log {self.id} - {self.log_type}"
\ No newline at end of file
+        return f"{self.method} {self.key}"
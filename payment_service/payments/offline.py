@@ -0,0 +1,150 @@
+"""Batch posting of offline (cash counter) payments.
+
+A batch is validated with one locking read of its fees, one lookup of their
+open gateway payments and one of its counter references, then every accepted entry is written in the same
+transaction: one bulk INSERT of Payments, one UPDATE of the fees, one delta
+UPDATE of the balances and one audit log entry. Rejected entries are reported,
+never written, so the counter can fix them and upload them again.
+
+An entry carrying a counter ``reference`` (the receipt book number) is stored
+with it as the payment's transaction id; posting the same reference twice is
+reported as a duplicate instead of paying twice.
+"""
+import csv
+import io
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+
+from .fines import refresh_stale_fines
+from .ledger import record_payments
+from .logs import write_log
+from .models import Payment, StudentFee
+from .reports import mark_report_stale_on_commit
+
+# reconciliation statuses; only 'posted' entries were written
+POSTED = 'posted'
+REJECTED_STATUSES = ('not_found', 'already_paid', 'in_progress', 'amount_mismatch', 'duplicate')
+
+CSV_COLUMNS = ('student_fee_id', 'student_id', 'amount', 'reference')
+
+
+class InvalidBatch(ValueError):
+    pass
+
+
+def read_offline_csv(data):
+    """Parse an uploaded counter sheet into (student_fee_id, student_id, amount, reference) entries.
+
+    ``data`` is bytes or text with a header row naming at least ``student_fee_id``
+    and ``student_id``; a blank or missing ``amount`` means the full fee.
+    """
+    if isinstance(data, bytes):
+        data = data.decode('utf-8-sig')
+    reader = csv.DictReader(io.StringIO(data))
+    missing = {'student_fee_id', 'student_id'} - set(reader.fieldnames or ())
+    if missing:
+        raise InvalidBatch(f"Missing column(s): {', '.join(sorted(missing))}")
+    entries = []
+    for line, row in enumerate(reader, 2):
+        try:
+            amount = (row.get('amount') or '').strip()
+            entries.append((
+                int(row['student_fee_id']),
+                int(row['student_id']),
+                Decimal(amount) if amount else None,
+                (row.get('reference') or '').strip(),
+            ))
+        except (TypeError, ValueError, InvalidOperation):
+            raise InvalidBatch(f"Line {line}: invalid row {row!r}")
+    return entries
+
+
+def post_offline_batch(entries):
+    """Post many offline payments in one transaction.
+
+    ``entries`` are (student_fee_id, student_id, amount, reference) tuples; an
+    amount of None or 0 pays the full fee. Returns one (student_fee_id,
+    reference, status, payment_id, amount) tuple per entry, in order, status
+    being 'posted' or one of REJECTED_STATUSES.
+    """
+    entries = list(entries)
+    # the amount due includes today's fine, as for a single offline payment
+    refresh_stale_fines({entry[0] for entry in entries})
+    now = timezone.now()
+    results = []
+    with transaction.atomic():
+        fees = {
+            fee_id: (student_id, fee_structure_id, status, total, reserved_until)
+            for fee_id, student_id, fee_structure_id, status, total, reserved_until in (
+                StudentFee.objects.select_for_update()
+                .filter(id__in={entry[0] for entry in entries})
+                .values_list('id', 'student_id', 'fee_structure_id', 'status', 'total_amount', 'reserved_until')
+            )
+        }
+        # a gateway checkout still awaiting verification, even once its reservation has lapsed
+        checking_out = set(
+            Payment.objects.filter(student_fee_id__in=fees, status='initiated').values_list('student_fee_id', flat=True)
+        ) if fees else set()
+        references = {entry[3] for entry in entries if entry[3]}
+        taken = set(
+            Payment.objects.filter(transaction_id__in=references).values_list('transaction_id', flat=True)
+        ) if references else set()
+
+        payments, settled, structures = [], [], set()
+        for student_fee_id, student_id, amount, reference in entries:
+            fee = fees.get(student_fee_id)
+            status = POSTED
+            if fee is None or fee[0] != student_id:
+                status = 'not_found'
+            elif reference in taken:
+                status = 'duplicate'
+            elif fee[2] == 'paid':
+                status = 'already_paid'
+            elif student_fee_id in checking_out or (fee[4] is not None and fee[4] > now):
+                # an online payment holds the fee right now
+                status = 'in_progress'
+            elif amount and Decimal(amount) != fee[3]:
+                status = 'amount_mismatch'
+
+            if status != POSTED:
+                results.append((student_fee_id, reference, status, None, amount or 0))
+                continue
+            _, fee_structure_id, fee_status, total, _ = fee
+            fees[student_fee_id] = fee[:2] + ('paid',) + fee[3:]
+            if reference:
+                taken.add(reference)
+            payments.append(Payment(
+                student_fee_id=student_fee_id,
+                gateway='offline',
+                transaction_id=reference or None,
+                amount=total,
+                status='success',
+                payment_date=now,
+                remarks='Cash/Offline',
+            ))
+            settled.append((student_id, total, total, fee_status == 'overdue'))
+            structures.add(fee_structure_id)
+            results.append((student_fee_id, reference, status, None, total))
+
+        if payments:
+            Payment.objects.bulk_create(payments)
+            StudentFee.objects.filter(id__in=[p.student_fee_id for p in payments]).update(
+                status='paid', reservation_token=None, reserved_until=None
+            )
+            record_payments(settled)
+            mark_report_stale_on_commit(structures)
+            ids = iter(payment.id for payment in payments)
+            results = [
+                (fee_id, reference, status, next(ids) if status == POSTED else None, amount)
+                for fee_id, reference, status, _, amount in results
+            ]
+        posted = len(payments)
+        write_log(
+            log_message=f"Offline batch: {posted} posted, {len(results) - posted} rejected "
+                        f"of {len(results)}, total {sum(p.amount for p in payments)}",
+            log_type="warning" if posted < len(results) else "success",
+            audit=True,
+        )
+    return results
@@ -2,6 +2,13 @@ import grpc
 import payment_pb2
 import payment_pb2_grpc
 from datetime import datetime
+
+
+def _idempotency_metadata(key):
+    # payment RPCs replay their first response for a repeated key (see payments.idempotency)
+    return [("idempotency-key", key)] if key else None
+
+
 class PaymentGRPCClient:
     def __init__(self, host="127.0.0.1", port=50052):
         self.channel = grpc.insecure_channel(f"{host}:{port}")
@@ -17,13 +24,13 @@ class PaymentGRPCClient:
         )
         return self.stub.AllocateFee(request)
     
-    def initiate_payment(self, student_fee_id, student_id, gateway):
+    def initiate_payment(self, student_fee_id, student_id, gateway, idempotency_key=None):
         request = payment_pb2.InitiatePaymentRequest(
             student_fee_id=student_fee_id,
             student_id=student_id,
             gateway=gateway,
         )
-        return self.stub.InitiatePayment(request)
+        return self.stub.InitiatePayment(request, metadata=_idempotency_metadata(idempotency_key))
     
     def simulate_razorpay_payment(self, payment_id, razorpay_order_id):
         request = payment_pb2.SimulateRazorpayRequest(
@@ -32,14 +39,45 @@ class PaymentGRPCClient:
         )
         return self.stub.SimulateRazorpayPayment(request)
 
-    def verify_payment(self, payment_id, razorpay_order_id, razorpay_payment_id, razorpay_signature):
+    def verify_payment(self, payment_id, razorpay_order_id, razorpay_payment_id, razorpay_signature,
+                       idempotency_key=None):
         request = payment_pb2.VerifyRazorpayRequest(
             payment_id=payment_id,
             razorpay_order_id=razorpay_order_id,
             razorpay_payment_id=razorpay_payment_id,
             razorpay_signature=razorpay_signature
         )
-        return self.stub.VerifyRazorpayPayment(request)
+        return self.stub.VerifyRazorpayPayment(request, metadata=_idempotency_metadata(idempotency_key))
+
+    def batch_verify_payments(self, payments, idempotency_key=None):
+        # payments: iterable of (payment_id, razorpay_order_id, razorpay_payment_id, razorpay_signature)
+        request = payment_pb2.BatchVerifyRazorpayRequest(
+            payments=[
+                payment_pb2.VerifyRazorpayRequest(
+                    payment_id=payment_id,
+                    razorpay_order_id=razorpay_order_id,
+                    razorpay_payment_id=razorpay_payment_id,
+                    razorpay_signature=razorpay_signature,
+                )
+                for payment_id, razorpay_order_id, razorpay_payment_id, razorpay_signature in payments
+            ]
+        )
+        return self.stub.BatchVerifyRazorpayPayments(request, metadata=_idempotency_metadata(idempotency_key))
+
+    def post_offline_payments(self, payments, idempotency_key=None):
+        # payments: iterable of (student_fee_id, student_id, amount or None, reference)
+        request = payment_pb2.OfflinePaymentBatchRequest(
+            payments=[
+                payment_pb2.OfflinePaymentEntry(
+                    student_fee_id=student_fee_id,
+                    student_id=student_id,
+                    amount=float(amount or 0),
+                    reference=reference,
+                )
+                for student_fee_id, student_id, amount, reference in payments
+            ]
+        )
+        return self.stub.PostOfflinePayments(request, metadata=_idempotency_metadata(idempotency_key))
 
     def generate_receipt(self, payment_id, student_id):
         request = payment_pb2.GenerateReceiptRequest(
@@ -47,6 +85,22 @@ class PaymentGRPCClient:
             student_id=student_id,
         )
         return self.stub.GenerateReceipt(request)
+
+    def get_student_fees(self, student_id, summary_only=False):
+        request = payment_pb2.StudentFeeRequest(student_id=student_id, summary_only=summary_only)
+        return self.stub.GetStudentFees(request)
+
+    def fee_collection_report(self, academic_year="", grades=(), statuses=()):
+        request = payment_pb2.FeeReportRequest(
+            academic_year=academic_year,
+            grades=grades,
+            statuses=statuses,
+        )
+        return self.stub.GetFeeCollectionReport(request)
+
+    def get_receipt(self, receipt_number):
+        request = payment_pb2.GetReceiptRequest(receipt_number=receipt_number)
+        return self.stub.GetReceipt(request)
     
     def close(self):        
         self.channel.close()
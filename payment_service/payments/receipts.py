@@ -0,0 +1,257 @@
+import functools
+import logging
+import multiprocessing
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from .fee_structures import get_fee_structure
+from .logs import write_log
+from .models import Receipt
+from .receipt_render import build_receipt, render_chunk, render_receipt_document
+from .receipt_storage import get_storage
+from .user_client import UserGRPCClient
+
+logger = logging.getLogger(__name__)
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def receipt_number(payment_id):
+    # one receipt per payment: the number doubles as the job's idempotency key
+    return f"RCPT{payment_id}"
+
+
+def _spawn_pool(max_workers):
+    # spawned, not forked, so workers never inherit the server's gRPC channels
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def receipt_url(receipt):
+    """Download URL once rendered, otherwise the status URL to poll."""
+    if receipt.status == 'ready':
+        return reverse('receipt-download', args=[receipt.receipt_number])
+    return reverse('receipt-status', args=[receipt.receipt_number])
+
+
+class ReceiptQueue:
+    """Renders receipts on a process pool so gRPC threads never build PDFs.
+
+    A receipt number already queued in this process is not submitted twice; the
+    pool's callback thread stores the PDF and records the result.
+    """
+
+    def __init__(self, max_workers=None):
+        self._executor = _spawn_pool(max_workers or settings.RECEIPT_WORKERS)
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def submit(self, receipt, fields):
+        """Queue the render for ``receipt``; returns the existing future if it is already queued."""
+        with self._lock:
+            if receipt.receipt_number in self._inflight:
+                return self._inflight[receipt.receipt_number]
+            job = {'student_id': receipt.student_id, 'fields': fields}
+            future = self._executor.submit(build_receipt, job)
+            self._inflight[receipt.receipt_number] = future
+        future.add_done_callback(functools.partial(self._finished, receipt.id, receipt.receipt_number))
+        return future
+
+    def _finished(self, receipt_id, number, future):
+        try:
+            error = future.exception()
+            if error is None:
+                key, digest = get_storage().save(future.result())
+                Receipt.objects.filter(id=receipt_id).update(
+                    status='ready', receipt_file=key, receipt_hash=digest, issued_date=timezone.now()
+                )
+                write_log(log_message=f"Receipt {number} generated", log_type="success")
+            else:
+                Receipt.objects.filter(id=receipt_id).update(status='failed')
+                write_log(log_message=f"Receipt {number} generation failed: {error}", log_type="error")
+        except Exception:
+            logger.exception("Could not record the result of receipt %s", number)
+        finally:
+            with self._lock:
+                self._inflight.pop(number, None)
+            if not connection.in_atomic_block:
+                connection.close()  # the pool's callback thread outlives any request
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+def get_receipt_queue():
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = ReceiptQueue()
+    return _queue
+
+
+def stop_receipt_queue(wait=True):
+    global _queue
+    with _queue_lock:
+        if _queue is not None:
+            _queue.shutdown(wait=wait)
+            _queue = None
+
+
+def request_receipt(payment, student_id, student=None):
+    """Create or reuse the receipt for ``payment`` and queue its render; returns at once.
+
+    Retries reuse the same Receipt row (keyed by receipt number): a ready receipt
+    whose file is still in storage is returned as is; a failed one, or one whose
+    file went missing, is queued again. ``student`` may carry
+    student_name/grade/academic_year; a missing name is looked up in
+    user_service by the worker, which keeps any grade and year given here.
+    """
+    fee = payment.student_fee
+    receipt, created = Receipt.objects.get_or_create(
+        receipt_number=receipt_number(payment.id),
+        defaults={
+            'payment': payment,
+            'student_id': student_id,
+            'fee_structure_id': fee.fee_structure_id,
+            'amount_paid': payment.amount,
+            'fine_amount': 0,
+            'total_amount': payment.amount,
+            'status': 'pending',
+        },
+    )
+    if receipt.status == 'ready' and get_storage().exists(receipt.receipt_file):
+        return receipt
+    if receipt.status != 'pending':
+        Receipt.objects.filter(id=receipt.id, status=receipt.status).update(status='pending')
+        receipt.status = 'pending'
+
+    get_receipt_queue().submit(receipt, _payment_fields(payment, receipt.receipt_number, student))
+    return receipt
+
+
+def _payment_fields(payment, number, student=None):
+    return {
+        'receipt_number': number,
+        'amount': str(payment.amount),
+        'payment_date': timezone.localtime(payment.payment_date).strftime('%Y-%m-%d %H:%M:%S'),
+        'gateway': payment.gateway,
+        'transaction_id': payment.transaction_id,
+        **(student or {}),
+    }
+
+
+def _students_by_class(classes):
+    """One GetStudentsByGradeYear call per (grade, academic_year) instead of one lookup per receipt."""
+    client = UserGRPCClient()
+    try:
+        students = {}
+        for grade, academic_year in classes:
+            for student in client.get_students_by_grade_year(grade, academic_year):
+                students[student.student_id] = {
+                    'student_name': f"{student.first_name} {student.last_name}",
+                    'grade': grade,
+                    'academic_year': academic_year,
+                }
+        return students
+    finally:
+        client.close()
+
+
+def _in_order(pool, fn, chunks, *args, window):
+    # like pool.map, but keeps at most ``window`` chunks (and their PDFs) in flight
+    pending = deque()
+    for chunk in chunks:
+        pending.append(pool.submit(fn, chunk, *args))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def render_bulk(payments, output='files', dest=None, workers=None, chunk_size=None):
+    """Render receipts for many payments at once (term-end runs).
+
+    ``output``:
+      * ``files`` -- the process pool renders each receipt and the parent puts it
+        in receipt storage; Receipt rows are created in bulk and updated with one
+        bulk UPDATE per chunk.
+      * ``zip`` -- the pool renders each receipt and they are streamed, in order,
+        into a zip written to ``dest`` (a path or a writable, possibly unseekable, stream).
+      * ``pdf`` -- one multi-page PDF at ``dest``. A single PDF document cannot be
+        split across processes, so it is drawn in this process; with the cached
+        page template that is still the fastest mode.
+
+    Students come from one user_service call per class. Payments whose student
+    is unknown are skipped and reported. Returns a summary dict.
+    """
+    workers = workers or settings.RECEIPT_WORKERS
+    chunk_size = chunk_size or settings.RECEIPT_BULK_CHUNK_SIZE
+    payments = list(payments.select_related('student_fee').order_by('id'))
+    structures = {get_fee_structure(p.student_fee.fee_structure_id) for p in payments}
+    students = _students_by_class({(s.grade, s.academic_year) for s in structures})
+    jobs, missing = [], []
+    for payment in payments:
+        student = students.get(payment.student_fee.student_id)
+        if student is None:
+            missing.append(payment.id)
+            continue
+        number = receipt_number(payment.id)
+        jobs.append({'fields': _payment_fields(payment, number, student), 'payment': payment})
+    summary = {'rendered': 0, 'missing_students': missing}
+    if not jobs:
+        return summary
+
+    if output == 'pdf':
+        summary['rendered'] = render_receipt_document(dest, (job['fields'] for job in jobs))
+        return summary
+
+    if output == 'files':
+        Receipt.objects.bulk_create(
+            [
+                Receipt(
+                    payment=job['payment'],
+                    receipt_number=job['fields']['receipt_number'],
+                    student_id=job['payment'].student_fee.student_id,
+                    fee_structure_id=job['payment'].student_fee.fee_structure_id,
+                    amount_paid=job['payment'].amount,
+                    fine_amount=0,
+                    total_amount=job['payment'].amount,
+                )
+                for job in jobs
+            ],
+            ignore_conflicts=True,
+        )
+        receipt_ids = dict(
+            Receipt.objects.filter(payment__in=[job['payment'] for job in jobs])
+            .values_list('receipt_number', 'id')
+        )
+    chunks = [[job['fields'] for job in jobs[i:i + chunk_size]] for i in range(0, len(jobs), chunk_size)]
+    with _spawn_pool(workers) as pool:
+        results = _in_order(pool, render_chunk, chunks, window=workers * 2)
+        if output == 'files':
+            storage = get_storage()
+            for chunk in results:
+                stored = []
+                for number, pdf in chunk:
+                    key, digest = storage.save(pdf)
+                    stored.append(Receipt(
+                        id=receipt_ids[number], status='ready', receipt_file=key,
+                        receipt_hash=digest, issued_date=timezone.now(),
+                    ))
+                Receipt.objects.bulk_update(stored, ['status', 'receipt_file', 'receipt_hash', 'issued_date'])
+                summary['rendered'] += len(stored)
+        else:
+            with zipfile.ZipFile(dest, 'w', compression=zipfile.ZIP_STORED) as archive:
+                for chunk in results:
+                    for number, pdf in chunk:
+                        archive.writestr(f"{number}.pdf", pdf)
+                        summary['rendered'] += 1
+    return summary
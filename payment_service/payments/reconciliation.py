@@ -0,0 +1,108 @@
+"""Reconciliation of gateway payments left in ``initiated``.
+
+A checkout that was abandoned, or whose verify call never arrived, leaves its
+Payment initiated, and InitiatePayment keeps answering "Payment already
+initiated" for the fee. reconcile_stale_payments asks the gateway what became of
+each such order older than PAYMENT_RECONCILE_AFTER:
+
+* a captured payment settles it exactly like a verify call would,
+* no payment, or only failed attempts, marks it failed, which frees the fee,
+* attempts still in flight, or a gateway error, leave it for the next run.
+
+Payments are read in id order, a batch at a time. The gateway calls of a batch
+run on PAYMENT_RECONCILE_WORKERS threads, outside any transaction, and the
+outcomes are then written in one short transaction with bulk UPDATEs, skipping
+rows a verify call settled in the meantime.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .gateway import get_gateway
+from .logs import write_log
+from .models import Payment, StudentFee
+from .verification import settle_payments
+
+logger = logging.getLogger(__name__)
+
+IN_FLIGHT = ('created', 'authorized')
+
+
+def order_outcome(gateway, order_id):
+    """('success', gateway payment id), ('failed', None) or None while undecided."""
+    try:
+        attempts = gateway.fetch_order_payments(order_id)
+    except Exception:
+        logger.warning("Could not fetch payments of order %s", order_id, exc_info=True)
+        return None
+    for attempt in attempts:
+        if attempt.get('status') == 'captured':
+            return 'success', attempt['id']
+    if any(attempt.get('status') in IN_FLIGHT for attempt in attempts):
+        return None
+    return 'failed', None
+
+
+def _apply(outcomes):
+    # outcomes: {payment_id: ('success', razorpay_payment_id) | ('failed', None)}
+    with transaction.atomic():
+        payments = Payment.objects.select_for_update().filter(status='initiated').in_bulk(outcomes)
+        settled = {
+            payment_id: outcome[1] for payment_id, outcome in outcomes.items()
+            if outcome[0] == 'success' and payment_id in payments
+        }
+        failed = [payment_id for payment_id, outcome in outcomes.items()
+                  if outcome[0] == 'failed' and payment_id in payments]
+        settle_payments(payments, settled)
+        if failed:
+            Payment.objects.filter(id__in=failed).update(status='failed', remarks='Reconciled: abandoned checkout')
+            # a reservation that outlived its initiation is given back with the payment
+            StudentFee.objects.filter(
+                id__in={payments[payment_id].student_fee_id for payment_id in failed},
+                reserved_until__lt=timezone.now(),
+            ).update(reservation_token=None, reserved_until=None)
+    return len(settled), len(failed)
+
+
+def reconcile_stale_payments(older_than=None, batch_size=None, workers=None, gateway=None):
+    """Resolve initiated gateway payments older than ``older_than`` seconds.
+
+    Returns {'checked': n, 'succeeded': n, 'failed': n, 'unresolved': n}.
+    """
+    older_than = settings.PAYMENT_RECONCILE_AFTER if older_than is None else older_than
+    batch_size = batch_size or settings.PAYMENT_RECONCILE_BATCH_SIZE
+    workers = workers or settings.PAYMENT_RECONCILE_WORKERS
+    gateway = gateway or get_gateway()
+    stale = Payment.objects.filter(
+        status='initiated', gateway='razorpay', transaction_id__isnull=False,
+        payment_date__lt=timezone.now() - timedelta(seconds=older_than),
+    ).order_by('id')
+
+    summary = {'checked': 0, 'succeeded': 0, 'failed': 0, 'unresolved': 0}
+    last_id = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='reconcile') as pool:
+        while True:
+            batch = list(stale.filter(id__gt=last_id).values_list('id', 'transaction_id')[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            results = pool.map(lambda row: order_outcome(gateway, row[1]), batch)
+            outcomes = {payment_id: outcome for (payment_id, _), outcome in zip(batch, results) if outcome}
+            succeeded, failed = _apply(outcomes) if outcomes else (0, 0)
+            summary['checked'] += len(batch)
+            summary['succeeded'] += succeeded
+            summary['failed'] += failed
+            summary['unresolved'] += len(batch) - succeeded - failed
+
+    if summary['succeeded'] or summary['failed']:
+        write_log(
+            log_message=f"Reconciliation: {summary['succeeded']} settled, {summary['failed']} failed, "
+                        f"{summary['unresolved']} unresolved of {summary['checked']}",
+            log_type="info",
+            audit=True,
+        )
+    return summary
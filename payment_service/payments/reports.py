@@ -0,0 +1,109 @@
+"""Fee collection report: billed, collected and outstanding totals by grade, year and fee status.
+
+Totals are served from FeeReportSnapshot, one row per (fee structure, fee
+status), so the dashboard reads a few hundred rows however long the school's
+history is. Anything that moves money or fee statuses calls mark_report_stale
+for the fee structures it touched; the next report recomputes only those
+structures with two grouped queries and upserts their rows.
+
+A row is stale when ``stale_since >= computed_at``. A change that lands while a
+structure is being recomputed is therefore never lost: its mark is newer than
+the recompute's ``computed_at`` and the structure is refreshed again next time.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .ledger import UNPAID_STATUSES
+from .models import FeeReportSnapshot, FeeStructure, Payment, StudentFee
+
+REPORT_FIELDS = (
+    'grade', 'academic_year', 'status', 'fee_count', 'billed_amount', 'collected_amount', 'outstanding_amount',
+)
+
+
+def mark_report_stale(fee_structure_ids=None):
+    """Flag the snapshots of ``fee_structure_ids`` (ids or a values queryset; None = all) for recomputation."""
+    snapshots = FeeReportSnapshot.objects.all()
+    if fee_structure_ids is not None:
+        snapshots = snapshots.filter(fee_structure_id__in=fee_structure_ids)
+    return snapshots.update(stale_since=timezone.now())
+
+
+def mark_report_stale_on_commit(fee_structure_ids):
+    # after the payment commits, so concurrent payments in one grade never queue on the snapshot rows
+    fee_structure_ids = set(fee_structure_ids)
+    transaction.on_commit(lambda: mark_report_stale(fee_structure_ids))
+
+
+def refresh_snapshots(fee_structure_ids):
+    """Recompute the snapshot rows of the given fee structures."""
+    computed_at = timezone.now()
+    fees = StudentFee.objects.filter(fee_structure_id__in=fee_structure_ids)
+    rows = {}
+    for row in fees.values('fee_structure_id', 'status').annotate(
+        fee_count=Count('id'),
+        billed=Sum('total_amount'),
+        outstanding=Sum('total_amount', filter=Q(status__in=UNPAID_STATUSES)),
+    ).order_by():
+        rows[row['fee_structure_id'], row['status']] = FeeReportSnapshot(
+            fee_structure_id=row['fee_structure_id'],
+            status=row['status'],
+            fee_count=row['fee_count'],
+            billed_amount=row['billed'] or 0,
+            outstanding_amount=row['outstanding'] or 0,
+            collected_amount=0,
+            computed_at=computed_at,
+        )
+    # grouped separately so a fee with several payments is not counted twice in the billed sum
+    for row in Payment.objects.filter(status='success', student_fee__fee_structure_id__in=fee_structure_ids).values(
+        'student_fee__fee_structure_id', 'student_fee__status'
+    ).annotate(collected=Sum('amount')).order_by():
+        snapshot = rows.get((row['student_fee__fee_structure_id'], row['student_fee__status']))
+        if snapshot is not None:
+            snapshot.collected_amount = row['collected']
+
+    with transaction.atomic():
+        FeeReportSnapshot.objects.bulk_create(
+            rows.values(),
+            update_conflicts=True,
+            unique_fields=['fee_structure', 'status'],
+            update_fields=['fee_count', 'billed_amount', 'collected_amount', 'outstanding_amount', 'computed_at'],
+        )
+        # statuses that no longer have any fee in these structures
+        FeeReportSnapshot.objects.filter(
+            fee_structure_id__in=fee_structure_ids, computed_at__lt=computed_at
+        ).delete()
+    return len(rows)
+
+
+def collection_report(academic_year=None, grades=None, statuses=None):
+    """Report rows (dicts with REPORT_FIELDS) ordered by year, grade and status.
+
+    Structures whose snapshot is stale or missing are recomputed first; the rest
+    is a single read of the snapshot table.
+    """
+    structures = FeeStructure.objects.all()
+    if academic_year:
+        structures = structures.filter(academic_year=academic_year)
+    if grades:
+        structures = structures.filter(grade__in=grades)
+
+    outdated = list(
+        structures.filter(
+            Q(feereportsnapshot__isnull=True)
+            | Q(feereportsnapshot__stale_since__gte=F('feereportsnapshot__computed_at'))
+        ).values_list('id', flat=True).distinct()
+    )
+    if outdated:
+        refresh_snapshots(outdated)
+
+    snapshots = FeeReportSnapshot.objects.filter(fee_structure__in=structures)
+    if statuses:
+        snapshots = snapshots.filter(status__in=statuses)
+    # (grade, academic_year) is unique per structure, so each snapshot row is already one report row
+    return list(
+        snapshots.annotate(grade=F('fee_structure__grade'), academic_year=F('fee_structure__academic_year'))
+        .values(*REPORT_FIELDS)
+        .order_by('academic_year', 'grade', 'status')
+    )
@@ -0,0 +1,117 @@
+"""TransactionLog retention: move old rows into monthly compressed archives.
+
+Rows older than the cutoff are read in (created_at, id) order, a chunk at a time,
+appended as JSON lines to ``<TRANSACTION_LOG_ARCHIVE_DIR>/<YYYY-MM>.jsonl.gz`` and
+then deleted, so the hot table only ever holds the retention window. Each run
+appends a new gzip member, which gzip readers treat as one stream.
+
+TransactionLogSummary keeps per month and type counts and time bounds, so
+questions like "how many errors in March" still work after the rows are gone.
+A chunk is written and fsynced before its rows are deleted; a crash between the
+two archives that chunk again on the next run, so readers dedupe on ``id``.
+"""
+import gzip
+import json
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest, Least
+from django.utils import timezone
+
+from .models import TransactionLog, TransactionLogSummary
+
+ARCHIVE_FIELDS = ('id', 'log_message', 'log_type', 'created_at')
+
+
+def archive_path(month, archive_dir=None):
+    return os.path.join(str(archive_dir or settings.TRANSACTION_LOG_ARCHIVE_DIR), f"{month:%Y-%m}.jsonl.gz")
+
+
+def _month(created_at):
+    return timezone.localtime(created_at).date().replace(day=1)
+
+
+def _append(path, rows):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'ab') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='ab') as out:
+            for log_id, log_message, log_type, created_at in rows:
+                out.write(json.dumps({
+                    'id': log_id,
+                    'log_message': log_message,
+                    'log_type': log_type,
+                    'created_at': created_at.isoformat(),
+                }).encode() + b'\n')
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def _record(month, log_type, rows, path):
+    first, last = rows[0][3], rows[-1][3]
+    updated = TransactionLogSummary.objects.filter(month=month, log_type=log_type).update(
+        entry_count=F('entry_count') + len(rows),
+        first_created_at=Least('first_created_at', first),
+        last_created_at=Greatest('last_created_at', last),
+    )
+    if not updated:
+        TransactionLogSummary.objects.create(
+            month=month, log_type=log_type, entry_count=len(rows),
+            first_created_at=first, last_created_at=last, archive_file=path,
+        )
+
+
+def archive_logs(before=None, chunk_size=None, archive_dir=None):
+    """Archive and delete TransactionLog rows created before ``before``.
+
+    ``before`` defaults to TRANSACTION_LOG_RETENTION_DAYS ago. Each chunk is one
+    indexed range read, one append per month touched and one short transaction
+    deleting the chunk by primary key, so writers are never blocked for long.
+    Returns {'archived': rows, 'months': ['YYYY-MM', ...]}.
+    """
+    before = before or timezone.now() - timedelta(days=settings.TRANSACTION_LOG_RETENTION_DAYS)
+    chunk_size = chunk_size or settings.TRANSACTION_LOG_ARCHIVE_CHUNK_SIZE
+    summary = {'archived': 0, 'months': []}
+    while True:
+        rows = list(
+            TransactionLog.objects.filter(created_at__lt=before)
+            .order_by('created_at', 'id')
+            .values_list(*ARCHIVE_FIELDS)[:chunk_size]
+        )
+        if not rows:
+            return summary
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(_month(row[3]), []).append(row)
+        for month, month_rows in by_month.items():
+            _append(archive_path(month, archive_dir), month_rows)
+        with transaction.atomic():
+            for month, month_rows in by_month.items():
+                path = archive_path(month, archive_dir)
+                by_type = {}
+                for row in month_rows:
+                    by_type.setdefault(row[2], []).append(row)
+                for log_type, typed_rows in by_type.items():
+                    _record(month, log_type, typed_rows, path)
+            TransactionLog.objects.filter(id__in=[row[0] for row in rows]).delete()
+        summary['archived'] += len(rows)
+        for month in by_month:
+            label = f"{month:%Y-%m}"
+            if label not in summary['months']:
+                summary['months'].append(label)
+
+
+def read_archive(month, archive_dir=None):
+    """Yield the archived entries of ``month`` (a date in it) as dicts, oldest first."""
+    path = archive_path(month.replace(day=1), archive_dir)
+    if not os.path.exists(path):
+        return
+    seen = set()
+    with gzip.open(path, 'rt') as lines:
+        for line in lines:
+            entry = json.loads(line)
+            if entry['id'] not in seen:
+                seen.add(entry['id'])
+                yield entry
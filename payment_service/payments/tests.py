@@ -1,15 +1,43 @@
 import os
+import time
 import unittest
-from django.test import TestCase
+import razorpay
+import io
+import tempfile
+import zipfile
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.urls import reverse
 import grpc
 from rest_framework.test import APIClient
 from unittest.mock import patch, MagicMock
 from django.contrib.auth.models import User
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from django.utils import timezone
 from .payment_client import PaymentGRPCClient
 from .user_client import UserGRPCClient
 from .grpc_server import PaymentService
+from .models import (
+    FeeReportSnapshot, FeeStructure, Fine, IdempotencyKey, Payment, Receipt, StudentBalance, StudentFee, TransactionLog, TransactionLogSummary,
+)
+from .fines import refresh_fines
+from .fake_gateway import FakeGatewayServer
+from .gateway import RazorpayGateway, get_gateway, reset_gateway
+from .verification import SignatureVerifier, verify_batch
+from .receipts import ReceiptQueue, render_bulk, request_receipt
+from .logs import TransactionLogWriter, start_log_writer, stop_log_writer, write_log
+from .retention import archive_logs, read_archive
+from .ledger import refresh_balances
+from .reports import collection_report
+from .offline import post_offline_batch
+from . import reconciliation
+from .reconciliation import reconcile_stale_payments
+from .idempotency import purge_expired_keys
+from .fee_structures import FeeStructureCache, get_fee_structures
+from .receipt_storage import DirectoryS3Client, LocalReceiptStorage, S3ReceiptStorage, reset_storage
+from .initiation import ReservationExpired, finalize_payment, reserve_fee
+from common.query_plans import QueryPlanMixin
+from payment_service.auth import RemoteUser
 from payment_pb2 import (
     FeeAllocationRequest,
     FeeAllocationResponse,
@@ -19,8 +47,15 @@ from payment_pb2 import (
     SimulateRazorpayResponse,
     VerifyRazorpayRequest,
     VerifyRazorpayResponse,
+    BatchVerifyRazorpayRequest,
     GenerateReceiptRequest,
-    GenerateReceiptResponse
+    GenerateReceiptResponse,
+    GetReceiptRequest,
+    ListTransactionLogsRequest,
+    StudentFeeRequest,
+    FeeReportRequest,
+    OfflinePaymentBatchRequest,
+    OfflinePaymentEntry,
 )
 
 class FeePaymentTestCase(TestCase):
@@ -115,7 +150,9 @@ class FeePaymentTestCase(TestCase):
         mock_payment_instance.verify_payment.return_value = MagicMock(message="Payment verified successfully")
         mock_payment_instance.generate_receipt.return_value = MagicMock(
             message="Receipt generated",
-            receipt_url="http://example.com/receipt.pdf"
+            receipt_url="http://example.com/receipt.pdf",
+            receipt_number="RCPT101",
+            status="ready",
         )
 
         data = {
@@ -130,6 +167,27 @@ class FeePaymentTestCase(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data["message"], "Receipt generated")
         self.assertEqual(response.data["receipt_url"], "http://example.com/receipt.pdf")
+    @patch("payments.views.PaymentGRPCClient")
+    def test_receipt_status_is_scoped_to_the_student(self, mock_payment_client):
+        self.client.force_authenticate(user=self.student_user)
+        mock_payment_instance = mock_payment_client.return_value
+        mock_payment_instance.get_receipt.return_value = MagicMock(
+            receipt_number="RCPT101", status="pending", receipt_url="/receipts/RCPT101/", student_id=1
+        )
+
+        url = reverse("receipt-status", args=["RCPT101"])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data["status"], response.data["receipt_url"]), ("pending", None))
+
+        mock_payment_instance.get_receipt.return_value.student_id = 2
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        teacher = User.objects.create_user(username="teacher1", password="teacherpass")
+        teacher.role = "teacher"
+        self.client.force_authenticate(user=teacher)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
 
 class UserGRPCClientTestCase(unittest.TestCase):
     @patch("payments.user_client.user_service_pb2_grpc.UserServiceStub")
@@ -232,6 +290,14 @@ class PaymentGRPCClientTestCase(unittest.TestCase):
         self.assertEqual(response.message, "Payment verified successfully")
         self.mock_stub.VerifyRazorpayPayment.assert_called_once()
 
+    def test_batch_verify_payments(self):
+        self.mock_stub.BatchVerifyRazorpayPayments.return_value = MagicMock(verified=2)
+
+        response = self.client.batch_verify_payments([(1, "order_1", "pay_1", "sig_1"), (2, "order_2", "pay_2", "sig_2")])
+        self.assertEqual(response.verified, 2)
+        request = self.mock_stub.BatchVerifyRazorpayPayments.call_args.args[0]
+        self.assertEqual([p.razorpay_order_id for p in request.payments], ["order_1", "order_2"])
+
     def test_generate_receipt(self):
         mock_response = MagicMock()
         mock_response.message = "Receipt generated"
@@ -262,32 +328,6 @@ class PaymentServiceTestCase(unittest.TestCase):
         self.assertIsInstance(response, FeeAllocationResponse)
         self.assertIn("Fee allocated successfully", response.message)
 
-    @patch("payments.grpc_server.razorpay.Client")
-    @patch("payments.grpc_server.Payment.objects.create")
-    @patch("payments.grpc_server.TransactionLog.objects.create")
-    @patch("payments.grpc_server.StudentFee.objects.select_for_update")
-    def test_initiate_payment_razorpay(self, mock_select, mock_log, mock_payment_create, mock_razorpay_client):
-        mock_student_fee = MagicMock()
-        mock_student_fee.id = 1
-        mock_student_fee.student_id = 1
-        mock_student_fee.lock = 0
-        mock_student_fee.status = "pending"
-        mock_student_fee.due_date = datetime.today().date()
-        mock_student_fee.fee_structure = MagicMock(base_fee=1000, fine_per_day=50)
-        mock_student_fee.save = MagicMock()
-        mock_select.return_value.get.return_value = mock_student_fee
-
-        mock_order = {"id": "order_123"}
-        mock_razorpay_client.return_value.order.create.return_value = mock_order
-
-        mock_payment_create.return_value = MagicMock(id=1)
-
-        request = InitiatePaymentRequest(student_fee_id=1, student_id=1, gateway="razorpay")
-        service = PaymentService()
-        response = service.InitiatePayment(request, MagicMock())
-
-        self.assertIsInstance(response, InitiatePaymentResponse)
-
     @patch("payments.grpc_server.Payment.objects.get")
     @patch("payments.grpc_server.TransactionLog.objects.create")
     @patch("payments.grpc_server.settings")
@@ -305,8 +345,8 @@ class PaymentServiceTestCase(unittest.TestCase):
 
     @patch("payments.grpc_server.Payment.objects.get")
     @patch("payments.grpc_server.TransactionLog.objects.create")
-    @patch("payments.grpc_server.razorpay.Client")
-    def test_verify_razorpay_payment_success(self, mock_razorpay, mock_log, mock_payment_get):
+    @patch("payments.grpc_server.get_verifier")
+    def test_verify_razorpay_payment_success(self, mock_verifier, mock_log, mock_payment_get):
         mock_payment = MagicMock()
         mock_payment.student_fee = MagicMock()
         mock_payment_get.return_value = mock_payment
@@ -320,63 +360,1176 @@ class PaymentServiceTestCase(unittest.TestCase):
         response = self.service.VerifyRazorpayPayment(request, self.mock_context)
         self.assertIsInstance(response, VerifyRazorpayResponse)
 
-    @patch("payments.grpc_server.Payment.objects.get")
-    @patch("payments.grpc_server.UserGRPCClient")
-    @patch("payments.grpc_server.Receipt.objects.create")
+    @patch("payments.grpc_server.get_fee_structure")
+    @patch("payments.grpc_server.Payment.objects.select_related")
+    @patch("payments.grpc_server.request_receipt")
     @patch("payments.grpc_server.TransactionLog.objects.create")
-    @patch("payments.grpc_server.os.makedirs")
-    @patch("payments.grpc_server.canvas.Canvas")
-    def test_generate_receipt_success(
-            self, mock_canvas, mock_makedirs, mock_log,
-            mock_receipt_create, mock_user_client, mock_payment_get):
+    def test_generate_receipt_queues_job(self, mock_log, mock_request_receipt, mock_select_related, mock_get_structure):
+        mock_payment = MagicMock(id=101, status="success", student_fee=MagicMock(student_id=7, fee_structure_id=3))
+        mock_select_related.return_value.get.return_value = mock_payment
+        mock_get_structure.return_value = MagicMock(grade=5, academic_year="2025-2026")
+        mock_request_receipt.return_value = MagicMock(receipt_number="RCPT101", status="pending")
 
-        mock_payment = MagicMock()
-        mock_payment.id = 101
-        mock_payment.amount = 1000
-        mock_payment.gateway = "razorpay"
-        mock_payment.transaction_id = "txn_123"
-        mock_payment.student_fee = MagicMock()
-        mock_payment.student_fee.fee_structure = MagicMock()
-        mock_payment_get.return_value = mock_payment
+        request = GenerateReceiptRequest(payment_id=101, student_id=1)
+        response = PaymentService().GenerateReceipt(request, MagicMock())
 
-        mock_user_instance = mock_user_client.return_value
-        mock_student_resp = MagicMock()
-        mock_student_resp.found = True
-        mock_student_resp.student.first_name = "John"
-        mock_student_resp.student.last_name = "Doe"
-        mock_student_resp.student.grade = 5
-        mock_student_resp.student.academic_year = "2025-2026"
-        mock_user_instance.get_student_by_id.return_value = mock_student_resp
+        self.assertIsInstance(response, GenerateReceiptResponse)
+        self.assertEqual(response.message, "Receipt generation queued")
+        self.assertEqual((response.receipt_number, response.status), ("RCPT101", "pending"))
+        self.assertEqual(response.receipt_url, "/receipts/RCPT101/")
+        mock_get_structure.assert_called_once_with(3)
+        mock_request_receipt.assert_called_once_with(mock_payment, 7, {"grade": 5, "academic_year": "2025-2026"})
+
+    @patch("payments.grpc_server.Payment.objects.select_related")
+    @patch("payments.grpc_server.request_receipt")
+    def test_generate_receipt_requires_successful_payment(self, mock_request_receipt, mock_select_related):
+        context = MagicMock()
+        for payment_status in ("initiated", "failed", "refunded"):
+            mock_select_related.return_value.get.return_value = MagicMock(id=101, status=payment_status)
+            response = PaymentService().GenerateReceipt(GenerateReceiptRequest(payment_id=101), context)
+            context.set_code.assert_called_with(grpc.StatusCode.FAILED_PRECONDITION)
+            self.assertEqual(response.receipt_number, "")
+        mock_request_receipt.assert_not_called()
+
+class InitiatePaymentTestCase(TestCase):
+    def setUp(self):
+        self.service = PaymentService()
+        due_date = timezone.now().date() + timedelta(days=10)
+        fee_structure = FeeStructure.objects.create(
+            grade=7, academic_year="2025-2026", base_fee=1000, due_date=due_date, fine_per_day=50
+        )
+        self.student_fee = StudentFee.objects.create(
+            student_id=1, fee_structure=fee_structure, total_amount=1000, due_date=due_date
+        )
+        self.request = InitiatePaymentRequest(student_fee_id=self.student_fee.id, student_id=1, gateway="razorpay")
+
+    @patch("payments.grpc_server.get_gateway")
+    def test_initiate_payment_razorpay(self, mock_gateway):
+        mock_gateway.return_value.create_order.return_value = {"id": "order_123"}
+        response = self.service.InitiatePayment(self.request, MagicMock())
+
+        self.assertEqual(response.message, "Razorpay order created")
+        self.assertEqual(response.order_id, "order_123")
+        payment = Payment.objects.get(id=response.payment_id)
+        self.assertEqual((payment.status, payment.amount), ("initiated", Decimal("1000.00")))
+        self.student_fee.refresh_from_db()
+        self.assertIsNone(self.student_fee.reservation_token)
+
+        again = self.service.InitiatePayment(self.request, MagicMock())
+        self.assertEqual((again.message, again.payment_id), ("Payment already initiated", payment.id))
+        mock_gateway.return_value.create_order.assert_called_once()
+
+    def test_initiate_offline_payment(self):
+        request = InitiatePaymentRequest(student_fee_id=self.student_fee.id, student_id=1, gateway="offline")
+        response = self.service.InitiatePayment(request, MagicMock())
+        self.assertEqual(response.message, "Offline payment successful")
+        self.student_fee.refresh_from_db()
+        self.assertEqual(self.student_fee.status, "paid")
+        self.assertEqual(self.service.InitiatePayment(request, MagicMock()).message, "Fee already paid")
+
+    @patch("payments.grpc_server.get_gateway")
+    def test_gateway_call_runs_outside_the_reservation_transaction(self, mock_gateway):
+        def create_order(amount, receipt):
+            # another initiation while the order is being created sees the reservation
+            context = MagicMock()
+            response = PaymentService().InitiatePayment(self.request, context)
+            context.set_code.assert_called_with(grpc.StatusCode.ABORTED)
+            self.assertEqual(response.message, "Payment already in process")
+            return {"id": "order_456"}
+
+        mock_gateway.return_value.create_order.side_effect = create_order
+        response = self.service.InitiatePayment(self.request, MagicMock())
+        self.assertEqual(response.order_id, "order_456")
+        self.assertEqual(Payment.objects.filter(student_fee=self.student_fee).count(), 1)
+
+    @patch("payments.grpc_server.get_gateway")
+    def test_gateway_failure_releases_reservation(self, mock_gateway):
+        mock_gateway.return_value.create_order.side_effect = Exception("gateway timeout")
+        context = MagicMock()
+        response = self.service.InitiatePayment(self.request, context)
+        context.set_code.assert_called_with(grpc.StatusCode.INTERNAL)
+        self.assertEqual(response.message, "Payment initiation failed")
+        self.student_fee.refresh_from_db()
+        self.assertIsNone(self.student_fee.reserved_until)
+
+    @patch("payments.grpc_server.get_gateway")
+    def test_stale_reservation_is_reclaimed(self, mock_gateway):
+        mock_gateway.return_value.create_order.return_value = {"id": "order_789"}
+        StudentFee.objects.filter(id=self.student_fee.id).update(
+            reservation_token="crashed", reserved_until=timezone.now() - timedelta(seconds=1)
+        )
+        response = self.service.InitiatePayment(self.request, MagicMock())
+        self.assertEqual(response.message, "Razorpay order created")
 
-        mock_receipt_create.return_value = MagicMock(id=1, receipt_file="receipts/fake.pdf")
+    def test_finalize_is_idempotent(self):
+        reservation = reserve_fee(self.student_fee.id, 1)
+        first = finalize_payment(reservation, "razorpay", "order_abc")
+        self.assertEqual(finalize_payment(reservation, "razorpay", "order_abc").id, first.id)
+        with self.assertRaises(ReservationExpired):
+            finalize_payment(reservation, "razorpay", "order_other")
 
-        request = GenerateReceiptRequest(payment_id=101, student_id=1)
-        service = PaymentService()
-        response = service.GenerateReceipt(request, MagicMock())
 
-        self.assertIsInstance(response, GenerateReceiptResponse)
-        self.assertEqual(response.message, "Receipt generated successfully")
-        self.assertTrue("receipts/" in response.receipt_url)
+class GatewayTestCase(TestCase):
+    def setUp(self):
+        self.fake = FakeGatewayServer(("127.0.0.1", 0), "rzp_test_key", "test_secret")
+        self.fake.start()
+        self.addCleanup(self.fake.stop)
+        self.gateway = RazorpayGateway("rzp_test_key", "test_secret", base_url=self.fake.base_url)
+        self.addCleanup(self.gateway.close)
+
+    def pay(self, order_id):
+        return self.gateway.session.post(
+            f"{self.fake.base_url}/v1/orders/{order_id}/pay", auth=("rzp_test_key", "test_secret")
+        ).json()
+
+    def test_order_and_signature_round_trip(self):
+        order = self.gateway.create_order(Decimal("1250.50"), "42")
+        self.assertEqual((order["amount"], order["receipt"], order["status"]), (125050, "42", "created"))
+        checkout = self.pay(order["id"])
+        self.gateway.verify_payment_signature(
+            order["id"], checkout["razorpay_payment_id"], checkout["razorpay_signature"]
+        )
+        with self.assertRaises(razorpay.errors.SignatureVerificationError):
+            self.gateway.verify_payment_signature(order["id"], checkout["razorpay_payment_id"], "0" * 64)
+        self.assertEqual(self.gateway.client.order.fetch(order["id"])["status"], "paid")
+
+    def test_injected_errors_and_bad_credentials(self):
+        self.fake.error_rate = 1.0
+        with self.assertRaises(razorpay.errors.ServerError):
+            self.gateway.create_order(100, "1")
+        self.fake.error_rate = 0.0
+        stranger = RazorpayGateway("rzp_test_key", "wrong", base_url=self.fake.base_url)
+        self.addCleanup(stranger.close)
+        with self.assertRaises(razorpay.errors.BadRequestError):
+            stranger.create_order(100, "1")
+
+    def test_servicer_reuses_one_gateway_against_the_fake(self):
+        due_date = timezone.now().date() + timedelta(days=10)
+        fee_structure = FeeStructure.objects.create(
+            grade=8, academic_year="2025-2026", base_fee=900, due_date=due_date, fine_per_day=0
+        )
+        student_fee = StudentFee.objects.create(
+            student_id=3, fee_structure=fee_structure, total_amount=900, due_date=due_date
+        )
+        self.addCleanup(reset_gateway)
+        with override_settings(
+            RAZORPAY_KEY_ID="rzp_test_key", RAZORPAY_KEY_SECRET="test_secret",
+            PAYMENT_GATEWAY_BASE_URL=self.fake.base_url,
+        ):
+            reset_gateway()
+            service = PaymentService()
+            initiated = service.InitiatePayment(
+                InitiatePaymentRequest(student_fee_id=student_fee.id, student_id=3, gateway="razorpay"), MagicMock()
+            )
+            checkout = self.pay(initiated.order_id)
+            verified = service.VerifyRazorpayPayment(VerifyRazorpayRequest(
+                payment_id=initiated.payment_id,
+                razorpay_order_id=checkout["razorpay_order_id"],
+                razorpay_payment_id=checkout["razorpay_payment_id"],
+                razorpay_signature=checkout["razorpay_signature"],
+            ), MagicMock())
+            self.assertIs(get_gateway(), get_gateway())
+        self.assertEqual(verified.message, "Payment verified successfully")
+        student_fee.refresh_from_db()
+        self.assertEqual(student_fee.status, "paid")
+
+
+@override_settings(RAZORPAY_KEY_SECRET="test_secret")
+class SignatureVerificationTestCase(TestCase):
+    def setUp(self):
+        self.verifier = SignatureVerifier("test_secret")
+        due_date = timezone.now().date() + timedelta(days=10)
+        fee_structure = FeeStructure.objects.create(
+            grade=9, academic_year="2025-2026", base_fee=500, due_date=due_date, fine_per_day=0
+        )
+        self.fees = [
+            StudentFee.objects.create(student_id=i, fee_structure=fee_structure, total_amount=500, due_date=due_date)
+            for i in (1, 2, 3)
+        ]
+        self.payments = [
+            Payment.objects.create(
+                student_fee=fee, gateway="razorpay", transaction_id=f"order_{fee.id}", amount=500, status="initiated"
+            )
+            for fee in self.fees
+        ]
+
+    def entry(self, payment, razorpay_payment_id, signature=None):
+        order_id = payment.transaction_id
+        return (payment.id, order_id, razorpay_payment_id,
+                signature or self.verifier.sign(order_id, razorpay_payment_id))
+
+    def test_local_verifier_agrees_with_sdk(self):
+        signature = self.verifier.sign("order_1", "pay_1")
+        razorpay.Client(auth=("rzp_test_key", "test_secret")).utility.verify_payment_signature({
+            "razorpay_order_id": "order_1", "razorpay_payment_id": "pay_1", "razorpay_signature": signature,
+        })
+        self.assertTrue(self.verifier.verify("order_1", "pay_1", signature))
+        self.assertFalse(self.verifier.verify("order_1", "pay_2", signature))
+        self.assertFalse(self.verifier.verify("order_1", "pay_1", "é" + signature[1:]))
+        self.assertFalse(self.verifier.verify("order_1", "pay_1", ""))
+
+    def test_batch_settles_valid_entries_in_bulk(self):
+        first, second, third = self.payments
+        entries = [
+            self.entry(first, "pay_a"),
+            self.entry(second, "pay_b", signature="0" * 64),
+            (third.id, "order_other", "pay_c", self.verifier.sign("order_other", "pay_c")),
+            (9999, "order_x", "pay_x", self.verifier.sign("order_x", "pay_x")),
+        ]
+        refresh_balances()
+        # savepoint, read, bulk payment update, fee read and update, one balance UPDATE, release
+        with self.assertNumQueries(7):
+            results = verify_batch(entries)
+        self.assertEqual([status for _, _, status in results],
+                         ["verified", "invalid_signature", "order_mismatch", "not_found"])
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.transaction_id), ("success", "pay_a"))
+        self.assertEqual(
+            list(StudentFee.objects.order_by("id").values_list("status", flat=True)), ["paid", "pending", "pending"]
+        )
+        self.assertEqual(verify_batch(entries[:1])[0][2], "already_verified")
+        self.assertEqual(StudentBalance.objects.get(student_id=first.student_fee.student_id).total_paid, first.amount)
+
+    def test_batch_verify_rpc(self):
+        first, second, _ = self.payments
+        request = BatchVerifyRazorpayRequest(payments=[
+            VerifyRazorpayRequest(
+                payment_id=payment_id, razorpay_order_id=order_id,
+                razorpay_payment_id=razorpay_payment_id, razorpay_signature=signature,
+            )
+            for payment_id, order_id, razorpay_payment_id, signature in (
+                self.entry(first, "pay_a"), self.entry(second, "pay_b", signature="bad"),
+            )
+        ])
+        response = PaymentService().BatchVerifyRazorpayPayments(request, MagicMock())
+        self.assertEqual((response.verified, response.rejected), (1, 1))
+        self.assertEqual([r.valid for r in response.results], [True, False])
+
+
+class ReceiptJobTestCase(TransactionTestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media_root = media.name
+        media_settings = override_settings(MEDIA_ROOT=media.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        due_date = timezone.now().date() + timedelta(days=10)
+        fee_structure = FeeStructure.objects.create(
+            grade=4, academic_year="2025-2026", base_fee=750, due_date=due_date, fine_per_day=0
+        )
+        fee = StudentFee.objects.create(student_id=5, fee_structure=fee_structure, total_amount=750, due_date=due_date)
+        self.payment = Payment.objects.create(
+            student_fee=fee, gateway="offline", amount=750, status="success", remarks="Cash/Offline"
+        )
+        self.student = {"student_name": "Asha Rao", "grade": "4", "academic_year": "2025-2026"}
+
+    def test_receipt_is_rendered_once_by_the_worker_pool(self):
+        queue = ReceiptQueue(max_workers=1)
+        with patch("payments.receipts.get_receipt_queue", return_value=queue):
+            first = request_receipt(self.payment, 5, self.student)
+            again = request_receipt(self.payment, 5, self.student)
+        queue.shutdown()
+
+        self.assertEqual((first.id, first.status), (again.id, "pending"))
+        receipt = Receipt.objects.get()
+        self.assertEqual(receipt.status, "ready")
+        h = receipt.receipt_hash
+        self.assertEqual(receipt.receipt_file, f"receipts/{h[:2]}/{h[2:4]}/{h}.pdf")
+        with open(os.path.join(self.media_root, receipt.receipt_file), "rb") as pdf:
+            self.assertEqual(pdf.read(4), b"%PDF")
+
+        response = PaymentService().GetReceipt(GetReceiptRequest(receipt_number=receipt.receipt_number), MagicMock())
+        self.assertEqual(
+            (response.status, response.receipt_url, response.content_hash),
+            ("ready", f"/receipts/{receipt.receipt_number}/download/", h),
+        )
+
+    def test_missing_file_is_regenerated(self):
+        Receipt.objects.create(
+            payment=self.payment, receipt_number=f"RCPT{self.payment.id}", student_id=5,
+            fee_structure_id=self.payment.student_fee.fee_structure_id, amount_paid=750, fine_amount=0,
+            total_amount=750, status="ready", receipt_file="receipts/gone.pdf",
+        )
+        queue = MagicMock()
+        with patch("payments.receipts.get_receipt_queue", return_value=queue):
+            self.assertEqual(request_receipt(self.payment, 5, self.student).status, "pending")
+        queue.submit.assert_called_once()
+
+    def test_failed_job_is_retried(self):
+        queue = ReceiptQueue(max_workers=1)
+        with patch("payments.receipts.get_receipt_queue", return_value=queue):
+            request_receipt(self.payment, 5, {"student_name": "Asha Rao"})  # grade missing: render fails
+            queue.shutdown()
+            self.assertEqual(Receipt.objects.get().status, "failed")
+            retry_queue = MagicMock()
+            with patch("payments.receipts.get_receipt_queue", return_value=retry_queue):
+                self.assertEqual(request_receipt(self.payment, 5, self.student).status, "pending")
+        retry_queue.submit.assert_called_once()
+        self.assertEqual(Receipt.objects.count(), 1)
+
+
+class BulkReceiptTestCase(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media_root = media.name
+        media_settings = override_settings(MEDIA_ROOT=media.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        due_date = timezone.now().date() + timedelta(days=10)
+        fee_structure = FeeStructure.objects.create(
+            grade=6, academic_year="2025-2026", base_fee=300, due_date=due_date, fine_per_day=0
+        )
+        for student_id in (11, 12, 13):
+            fee = StudentFee.objects.create(
+                student_id=student_id, fee_structure=fee_structure, total_amount=300, due_date=due_date, status="paid"
+            )
+            Payment.objects.create(student_fee=fee, gateway="offline", amount=300, status="success")
+        patcher = patch("payments.receipts.UserGRPCClient")
+        self.user_client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        # student 13 is unknown to user_service
+        self.user_client.get_students_by_grade_year.return_value = [
+            MagicMock(student_id=11, first_name="Ravi", last_name="K"),
+            MagicMock(student_id=12, first_name="Meena", last_name="S"),
+        ]
+
+    def test_files_are_rendered_and_marked_ready(self):
+        summary = render_bulk(Payment.objects.all(), "files", workers=1, chunk_size=1)
+
+        self.assertEqual(summary["rendered"], 2)
+        self.assertEqual(len(summary["missing_students"]), 1)
+        self.user_client.get_students_by_grade_year.assert_called_once_with(6, "2025-2026")
+        for receipt in Receipt.objects.all():
+            self.assertEqual(receipt.status, "ready")
+            with open(os.path.join(self.media_root, receipt.receipt_file), "rb") as pdf:
+                self.assertEqual(pdf.read(4), b"%PDF")
+
+    def test_zip_and_multi_page_pdf_exports(self):
+        archive = io.BytesIO()
+        self.assertEqual(render_bulk(Payment.objects.all(), "zip", archive, workers=1)["rendered"], 2)
+        payment_ids = sorted(Payment.objects.values_list("id", flat=True))[:2]
+        with zipfile.ZipFile(archive) as zipped:
+            self.assertEqual(zipped.namelist(), [f"RCPT{payment_id}.pdf" for payment_id in payment_ids])
+
+        document = io.BytesIO()
+        self.assertEqual(render_bulk(Payment.objects.all(), "pdf", document)["rendered"], 2)
+        self.assertEqual(document.getvalue().count(b"/Type /Page\n"), 2)
+        self.assertFalse(Receipt.objects.exists())  # exports do not touch receipt rows
+
+
+class ReceiptStorageTestCase(unittest.TestCase):
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.root = root.name
+
+    def test_local_storage_is_content_addressed(self):
+        storage = LocalReceiptStorage(self.root)
+        key, digest = storage.save(b"%PDF-receipt")
+        self.assertEqual(key, f"receipts/{digest[:2]}/{digest[2:4]}/{digest}.pdf")
+        self.assertEqual(storage.save(b"%PDF-receipt"), (key, digest))
+        self.assertEqual(storage.size(key), 12)
+        with storage.open(key, 5) as handle:
+            self.assertEqual(handle.read(), b"receipt")
+        self.assertFalse(storage.exists("receipts/missing.pdf"))
+
+    def test_s3_storage_with_directory_client(self):
+        storage = S3ReceiptStorage("receipts", client=DirectoryS3Client(self.root))
+        key, digest = storage.save(b"%PDF-receipt")
+        self.assertTrue(os.path.isfile(os.path.join(self.root, "receipts", key)))
+        self.assertEqual((storage.exists(key), storage.size(key)), (True, 12))
+        with storage.open(key, 5) as body:
+            self.assertEqual(body.read(), b"receipt")
+        self.assertFalse(storage.exists("receipts/missing.pdf"))
+
+
+class ReceiptDownloadTestCase(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=media.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        reset_storage()
+        self.addCleanup(reset_storage)
+
+        self.pdf = b"%PDF-1.4 receipt body %%EOF"
+        self.key, self.digest = LocalReceiptStorage().save(self.pdf)
+        patcher = patch("payments.views.PaymentGRPCClient")
+        self.payment_client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.payment_client.get_receipt.return_value = MagicMock(
+            receipt_number="RCPT101", status="ready", receipt_file=self.key,
+            content_hash=self.digest, payment_id=101, student_id=1,
+        )
+        user = User.objects.create_user(username="student1", password="studentpass")
+        user.student = MagicMock(id=1)
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+        self.url = reverse("receipt-download", args=["RCPT101"])
+
+    def test_full_download_streams_the_file(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.pdf)
+        self.assertEqual(response["ETag"], f'"{self.digest}"')
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+
+    def test_range_and_conditional_requests(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-3")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF")
+        self.assertEqual(response["Content-Range"], f"bytes 0-3/{len(self.pdf)}")
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=-5")
+        self.assertEqual(b"".join(response.streaming_content), b"%%EOF")
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE="bytes=999-").status_code, 416)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"{self.digest}"').status_code, 304)
+
+    def test_malformed_or_multi_range_gets_whole_file(self):
+        for header in ("bytes=5-2", "bytes=0-1,4-5", "bytes=abc", "items=0-3", "bytes=-"):
+            response = self.client.get(self.url, HTTP_RANGE=header)
+            self.assertEqual(response.status_code, 200, header)
+            self.assertEqual(b"".join(response.streaming_content), self.pdf)
+
+    def test_missing_file_is_requeued(self):
+        self.payment_client.get_receipt.return_value.receipt_file = "receipts/gone.pdf"
+        self.payment_client.generate_receipt.return_value = MagicMock(status="pending")
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response["Location"], reverse("receipt-status", args=["RCPT101"]))
+        self.payment_client.generate_receipt.assert_called_once_with(payment_id=101, student_id=1)
+
+    def test_other_students_receipt_is_hidden(self):
+        self.payment_client.get_receipt.return_value.student_id = 2
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_only_the_owner_or_an_admin_can_download(self):
+        teacher = User.objects.create_user(username="teacher1", password="teacherpass")
+        teacher.role = "teacher"
+        self.client.force_authenticate(user=teacher)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+        admin = User.objects.create_user(username="admin1", password="adminpass")
+        admin.role = "admin"
+        self.client.force_authenticate(user=admin)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+
+class TransactionLogStreamTestCase(TestCase):
+    def setUp(self):
+        start = timezone.make_aware(datetime(2025, 11, 1, 9, 0))
+        # two entries share each timestamp, so paging has to break ties on id
+        self.logs = TransactionLog.objects.bulk_create([
+            TransactionLog(
+                log_message=f"entry {i}", log_type="error" if i % 3 == 0 else "info",
+                created_at=start + timedelta(minutes=i // 2),
+            )
+            for i in range(10)
+        ])
+        self.context = MagicMock()
+        self.context.is_active.return_value = True
+
+    def stream(self, **kwargs):
+        return list(PaymentService().ListTransactionLogs(ListTransactionLogsRequest(**kwargs), self.context))
+
+    def test_pages_stream_newest_first_without_gaps(self):
+        entries = self.stream(page_size=3)
+        self.assertEqual([e.log_message for e in entries], [f"entry {i}" for i in reversed(range(10))])
+
+        resumed = self.stream(page_size=3, cursor=entries[3].cursor)
+        self.assertEqual([e.id for e in resumed], [e.id for e in entries[4:]])
+        self.assertEqual(len(self.stream(page_size=3, limit=4)), 4)
+
+    def test_filters_by_type_and_time_range(self):
+        entries = self.stream(log_type="error", since="2025-11-01T09:01:00", until="2025-11-01T09:04:00")
+        self.assertEqual([e.log_message for e in entries], ["entry 6", "entry 3"])
+
+    def test_invalid_filter_is_rejected(self):
+        self.assertEqual(self.stream(since="yesterday"), [])
+        self.context.set_code.assert_called_once_with(grpc.StatusCode.INVALID_ARGUMENT)
+
+    def test_stops_when_the_client_disconnects(self):
+        self.context.is_active.side_effect = [True, True, False]
+        self.assertEqual(len(self.stream(page_size=2)), 2)
+
+
+class TransactionLogWriterTestCase(TransactionTestCase):
+    def wait_for_rows(self, count):
+        deadline = time.monotonic() + 5
+        while TransactionLog.objects.count() < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return TransactionLog.objects.count()
+
+    def test_full_batch_is_flushed_in_the_background(self):
+        writer = TransactionLogWriter(batch_size=3, flush_interval=60)
+        self.addCleanup(writer.close)
+        for i in range(3):
+            writer.write(f"entry {i}")
+        self.assertEqual(self.wait_for_rows(3), 3)
+
+        writer.write("tail", "warning")
+        self.assertEqual(TransactionLog.objects.count(), 3)
+        writer.close()
+        self.assertEqual(TransactionLog.objects.latest("id").log_message, "tail")
+
+    def test_failed_flush_keeps_entries(self):
+        writer = TransactionLogWriter(batch_size=100, flush_interval=60, max_pending=2)
+        self.addCleanup(writer.close)
+        for i in range(3):
+            writer.write(f"entry {i}")
+        with patch("payments.logs.TransactionLog.objects.bulk_create", side_effect=RuntimeError("db down")):
+            self.assertEqual(writer.flush(), 0)
+        self.assertEqual(writer.flush(), 2)  # the oldest entry was dropped past max_pending
+        self.assertEqual(
+            list(TransactionLog.objects.values_list("log_message", flat=True)), ["entry 1", "entry 2"]
+        )
+
+    def test_audit_entries_are_written_immediately(self):
+        start_log_writer(flush_interval=60)
+        self.addCleanup(stop_log_writer)
+        write_log("buffered")
+        write_log("Payment verified", "success", audit=True)
+        self.assertEqual(list(TransactionLog.objects.values_list("log_message", flat=True)), ["Payment verified"])
+        stop_log_writer()
+        self.assertEqual(TransactionLog.objects.count(), 2)
+
+
+class LogRetentionTestCase(TestCase):
+    def setUp(self):
+        archive = tempfile.TemporaryDirectory()
+        self.addCleanup(archive.cleanup)
+        self.archive_dir = archive.name
+        self.now = timezone.now()
+        TransactionLog.objects.bulk_create([
+            TransactionLog(log_message="old error", log_type="error", created_at=timezone.make_aware(datetime(2025, 1, 5))),
+            TransactionLog(log_message="old info", log_type="info", created_at=timezone.make_aware(datetime(2025, 1, 20))),
+            TransactionLog(log_message="older info", log_type="info", created_at=timezone.make_aware(datetime(2024, 12, 31, 12))),
+            TransactionLog(log_message="recent", log_type="info", created_at=self.now),
+        ])
+
+    def test_old_rows_move_to_monthly_archives(self):
+        summary = archive_logs(before=self.now - timedelta(days=90), chunk_size=2, archive_dir=self.archive_dir)
+
+        self.assertEqual(summary, {"archived": 3, "months": ["2024-12", "2025-01"]})
+        self.assertEqual(list(TransactionLog.objects.values_list("log_message", flat=True)), ["recent"])
+        january = [entry["log_message"] for entry in read_archive(date(2025, 1, 1), self.archive_dir)]
+        self.assertEqual(january, ["old error", "old info"])
+        self.assertEqual(
+            sorted(TransactionLogSummary.objects.values_list("month", "log_type", "entry_count")),
+            [(date(2024, 12, 1), "info", 1), (date(2025, 1, 1), "error", 1), (date(2025, 1, 1), "info", 1)],
+        )
+
+    def test_later_runs_append_to_the_month(self):
+        archive_logs(before=timezone.make_aware(datetime(2025, 1, 10)), archive_dir=self.archive_dir)
+        late = TransactionLog.objects.create(
+            log_message="late error", log_type="error", created_at=timezone.make_aware(datetime(2025, 1, 8))
+        )
+        archive_logs(before=timezone.make_aware(datetime(2025, 2, 1)), archive_dir=self.archive_dir)
+
+        self.assertEqual(len(list(read_archive(date(2025, 1, 1), self.archive_dir))), 3)
+        errors = TransactionLogSummary.objects.get(month=date(2025, 1, 1), log_type="error")
+        self.assertEqual((errors.entry_count, errors.last_created_at), (2, late.created_at))
+        self.assertEqual(TransactionLogSummary.objects.filter(month=date(2025, 1, 1)).count(), 2)
+
+
+class PaymentQueryPlanTestCase(QueryPlanMixin, TestCase):
+    def setUp(self):
+        self.service = PaymentService()
+        due_date = datetime.today().date().replace(day=1)
+        fee_structure = FeeStructure.objects.create(
+            grade=5, academic_year="2025-2026", base_fee=1000, due_date=due_date, fine_per_day=10
+        )
+        self.student_fee = StudentFee.objects.create(
+            student_id=1, fee_structure=fee_structure, total_amount=1000, due_date=due_date
+        )
+
+    def test_hot_rpcs_use_indexes(self):
+        get_fee_structures().load()  # the whole table, once per process
+        request = InitiatePaymentRequest(student_fee_id=self.student_fee.id, student_id=1, gateway="offline")
+        with self.assertNoFullTableScans():
+            response = self.service.InitiatePayment(request, MagicMock())
+            self.service.InitiatePayment(request, MagicMock())
+            list(self.service.ListTransactionLogs(ListTransactionLogsRequest(page_size=1), MagicMock()))
+            list(self.service.ListTransactionLogs(ListTransactionLogsRequest(log_type="info"), MagicMock()))
+            self.service.GetStudentFees(StudentFeeRequest(student_id=1), MagicMock())
+            reconcile_stale_payments(gateway=MagicMock())
+        self.assertEqual(response.message, "Offline payment successful")
+
+    def test_harness_reports_full_scan(self):
+        with self.assertRaises(AssertionError):
+            with self.assertNoFullTableScans():
+                list(Fine.objects.filter(days_overdue=3))
+
+
+class FineEngineTestCase(TestCase):
+    def setUp(self):
+        self.today = date(2025, 11, 10)
+        self.fee_structure = FeeStructure.objects.create(
+            grade=6, academic_year="2025-2026", base_fee=1000, due_date=date(2025, 11, 5), fine_per_day=10
+        )
+
+    def _fee(self, student_id, due_date, status="pending"):
+        return StudentFee.objects.create(
+            student_id=student_id, fee_structure=self.fee_structure, total_amount=1000,
+            due_date=due_date, status=status
+        )
+
+    def test_refresh_fines_is_set_based_and_idempotent(self):
+        overdue = self._fee(1, date(2025, 11, 5))
+        upcoming = self._fee(2, date(2025, 12, 1))
+        paid = self._fee(3, date(2025, 11, 1), status="paid")
+
+        counts = refresh_fines(today=self.today)
+        self.assertEqual(counts["overdue"], 1)
+        overdue.refresh_from_db()
+        self.assertEqual(overdue.status, "overdue")
+        self.assertEqual(overdue.total_amount, Decimal("1050.00"))
+        upcoming.refresh_from_db()
+        self.assertEqual((upcoming.status, upcoming.total_amount), ("pending", Decimal("1000.00")))
+        self.assertFalse(Fine.objects.filter(student_fee=paid).exists())
+
+        # 2 status UPDATEs, chunk read, upsert (savepoint), DELETE, totals UPDATE, balances (3 reads, upsert),
+        # report snapshots marked stale
+        with self.assertNumQueries(13):
+            refresh_fines(today=self.today + timedelta(days=2))
+        fine = Fine.objects.get(student_fee=overdue)
+        self.assertEqual((fine.days_overdue, fine.fine_amount), (7, Decimal("70.00")))
+        overdue.refresh_from_db()
+        self.assertEqual(overdue.total_amount, Decimal("1070.00"))
+
+    def test_allocate_fee_moves_unpaid_due_dates(self):
+        today = timezone.now().date()
+        overdue = self._fee(1, today - timedelta(days=3))
+        paid = self._fee(2, today - timedelta(days=3), status="paid")
+        refresh_fines(today=today)
+        self.assertTrue(Fine.objects.filter(student_fee=overdue).exists())
+
+        extended = today + timedelta(days=10)
+        PaymentService().AllocateFee(FeeAllocationRequest(
+            grade=6, academic_year="2025-2026", base_fee=1000, due_date=str(extended), fine_per_day=10,
+        ), MagicMock())
+        overdue.refresh_from_db()
+        self.assertEqual((overdue.due_date, overdue.status, overdue.total_amount), (extended, "pending", Decimal("1000.00")))
+        self.assertFalse(Fine.objects.filter(student_fee=overdue).exists())
+        paid.refresh_from_db()
+        self.assertEqual(paid.due_date, today - timedelta(days=3))
+
+    def test_initiate_payment_reads_precomputed_fine(self):
+        fee = self._fee(1, timezone.now().date() - timedelta(days=3))
+        response = PaymentService().InitiatePayment(
+            InitiatePaymentRequest(student_fee_id=fee.id, student_id=1, gateway="offline"), MagicMock()
+        )
+        self.assertEqual(response.message, "Offline payment successful")
+        self.assertEqual(Payment.objects.get(student_fee=fee).amount, Decimal("1030.00"))
+        self.assertEqual(Fine.objects.get(student_fee=fee).days_overdue, 3)
+
+
+class StudentLedgerTestCase(TestCase):
+    def setUp(self):
+        self.today = timezone.now().date()
+        fee_structure = FeeStructure.objects.create(
+            grade=7, academic_year="2025-2026", base_fee=1000, due_date=self.today, fine_per_day=10
+        )
+        self.overdue = StudentFee.objects.create(
+            student_id=4, fee_structure=fee_structure, total_amount=1000, due_date=self.today - timedelta(days=5)
+        )
+        other_structure = FeeStructure.objects.create(
+            grade=7, academic_year="2026-2027", base_fee=1200, due_date=self.today, fine_per_day=0
+        )
+        self.upcoming = StudentFee.objects.create(
+            student_id=4, fee_structure=other_structure, total_amount=1200, due_date=self.today + timedelta(days=30)
+        )
+        refresh_fines(today=self.today)
+
+    def fees(self, **kwargs):
+        return PaymentService().GetStudentFees(StudentFeeRequest(student_id=4, **kwargs), MagicMock())
+
+    def test_fees_and_balance(self):
+        get_fee_structures().load()  # as at server start
+        with self.assertNumQueries(2):  # balance row, one joined fee query
+            response = self.fees()
+        self.assertEqual(
+            [(f.academic_year, f.fine_amount, f.total_amount, f.days_overdue, f.status) for f in response.fees],
+            [("2025-2026", 50.0, 1050.0, 5, "overdue"), ("2026-2027", 0.0, 1200.0, 0, "pending")],
+        )
+        balance = response.balance
+        self.assertEqual(
+            (balance.total_due, balance.total_fines, balance.total_paid, balance.overdue_count, balance.fee_count),
+            (2250.0, 50.0, 0.0, 1, 2),
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.fees(summary_only=True).fees), 0)
+
+    def test_balance_follows_payments(self):
+        PaymentService().InitiatePayment(
+            InitiatePaymentRequest(student_fee_id=self.overdue.id, student_id=4, gateway="offline"), MagicMock()
+        )
+        response = self.fees()
+        self.assertEqual((response.balance.total_due, response.balance.total_paid), (1200.0, 1050.0))
+        self.assertEqual([f.paid_amount for f in response.fees], [1050.0, 0.0])
+
+        payment = Payment.objects.create(
+            student_fee=self.upcoming, gateway="razorpay", transaction_id="order_9", amount=1200
+        )
+        with override_settings(RAZORPAY_KEY_SECRET="ledger_secret"):
+            request = VerifyRazorpayRequest(
+                payment_id=payment.id, razorpay_order_id="order_9", razorpay_payment_id="pay_9",
+                razorpay_signature=SignatureVerifier("ledger_secret").sign("order_9", "pay_9"),
+            )
+            self.assertEqual(
+                PaymentService().VerifyRazorpayPayment(request, MagicMock()).message, "Payment verified successfully"
+            )
+        balance = self.fees(summary_only=True).balance
+        self.assertEqual((balance.total_due, balance.total_paid, balance.overdue_count), (0.0, 2250.0, 0))
+
+    def test_balance_is_built_for_students_without_one(self):
+        StudentBalance.objects.all().delete()
+        self.assertEqual(self.fees(summary_only=True).balance.fee_count, 2)
+        self.assertEqual(self.fees(summary_only=True).balance.fee_count, 2)
+        unknown = PaymentService().GetStudentFees(StudentFeeRequest(student_id=99), MagicMock())
+        self.assertEqual((unknown.balance.fee_count, len(unknown.fees)), (0, 0))
+
+    @patch("payments.views.PaymentGRPCClient")
+    def test_student_fees_view(self, mock_payment_client):
+        mock_payment_client.return_value.get_student_fees.return_value = self.fees()
+        user = User.objects.create_user(username="student4", password="studentpass")
+        user.student = MagicMock(id=4)
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        response = client.get(reverse("student-fees"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["balance"]["total_due"], 2250.0)
+        self.assertEqual([fee["status"] for fee in response.data["fees"]], ["overdue", "pending"])
+        mock_payment_client.return_value.get_student_fees.assert_called_once_with(4, summary_only=False)
+
+
+class FeeStructureCacheTestCase(TestCase):
+    def setUp(self):
+        due_date = timezone.now().date() + timedelta(days=10)
+        self.structure = FeeStructure.objects.create(
+            grade=3, academic_year="2025-2026", base_fee=600, due_date=due_date, fine_per_day=0
+        )
+
+    def allocate(self, base_fee):
+        request = FeeAllocationRequest(
+            grade=3, academic_year="2025-2026", base_fee=base_fee,
+            due_date=str(self.structure.due_date), fine_per_day=0,
+        )
+        return PaymentService().AllocateFee(request, MagicMock())
+
+    def test_lookups_are_served_from_memory(self):
+        cache = get_fee_structures()
+        self.assertEqual(cache.load(), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(cache.get(self.structure.id).base_fee, Decimal("600.00"))
+            self.assertEqual(cache.for_class(3, "2025-2026").id, self.structure.id)
+
+    def test_allocate_fee_invalidates_this_process(self):
+        get_fee_structures().load()
+        self.allocate(750)
+        self.assertEqual(get_fee_structures().get(self.structure.id).base_fee, Decimal("750.00"))
+
+    def test_other_processes_notice_changes_through_the_version(self):
+        other = FeeStructureCache(ttl=60)  # e.g. the consumer's
+        other.load()
+        self.allocate(800)
+        self.assertEqual(other.get(self.structure.id).base_fee, Decimal("600.00"))  # within its ttl
+        other.ttl = 0
+        self.assertEqual(other.get(self.structure.id).base_fee, Decimal("800.00"))
+
+        # an unknown class is looked up again at once
+        FeeStructure.objects.create(grade=4, academic_year="2025-2026", base_fee=650, due_date=self.structure.due_date)
+        other.ttl = 60
+        self.assertEqual(other.for_class(4, "2025-2026").base_fee, Decimal("650.00"))
+        self.assertIsNone(other.for_class(12, "2025-2026"))
+
+
+class IdempotencyTestCase(TestCase):
+    def setUp(self):
+        self.service = PaymentService()
+        due_date = timezone.now().date() + timedelta(days=10)
+        fee_structure = FeeStructure.objects.create(
+            grade=7, academic_year="2025-2026", base_fee=1000, due_date=due_date, fine_per_day=0
+        )
+        self.student_fee = StudentFee.objects.create(
+            student_id=1, fee_structure=fee_structure, total_amount=1000, due_date=due_date
+        )
+        self.request = InitiatePaymentRequest(student_fee_id=self.student_fee.id, student_id=1, gateway="razorpay")
+
+    def context(self, key):
+        context = MagicMock()
+        context.invocation_metadata.return_value = [("idempotency-key", key)]
+        return context
+
+    @patch("payments.grpc_server.get_gateway")
+    def test_retry_replays_the_first_response(self, mock_gateway):
+        mock_gateway.return_value.create_order.return_value = {"id": "order_1"}
+        first = self.service.InitiatePayment(self.request, self.context("k1"))
+        self.assertEqual(first.message, "Razorpay order created")
+
+        with self.assertNumQueries(1):
+            again = self.service.InitiatePayment(self.request, self.context("k1"))
+        self.assertEqual(again, first)
+        mock_gateway.return_value.create_order.assert_called_once()
+
+        context = self.context("k1")
+        other = InitiatePaymentRequest(student_fee_id=self.student_fee.id, student_id=1, gateway="offline")
+        self.assertEqual(self.service.InitiatePayment(other, context).message, "")
+        context.set_code.assert_called_once_with(grpc.StatusCode.ALREADY_EXISTS)
+
+    @patch("payments.grpc_server.get_gateway")
+    def test_errors_are_not_stored_and_keys_expire(self, mock_gateway):
+        mock_gateway.return_value.create_order.side_effect = RuntimeError("gateway down")
+        self.service.InitiatePayment(self.request, self.context("k2"))
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        mock_gateway.return_value.create_order.side_effect = None
+        mock_gateway.return_value.create_order.return_value = {"id": "order_2"}
+        self.assertEqual(self.service.InitiatePayment(self.request, self.context("k2")).order_id, "order_2")
+
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.service.InitiatePayment(self.request, self.context("k2")).message,
+                         "Payment already initiated")
+        self.assertEqual(purge_expired_keys(now=timezone.now() + timedelta(days=2)), 1)
+
+    def test_verify_of_a_settled_payment_writes_nothing(self):
+        payment = Payment.objects.create(
+            student_fee=self.student_fee, gateway="razorpay", transaction_id="pay_1", amount=1000, status="success"
+        )
+        with override_settings(RAZORPAY_KEY_SECRET="idem_secret"):
+            request = VerifyRazorpayRequest(
+                payment_id=payment.id, razorpay_order_id="order_1", razorpay_payment_id="pay_1",
+                razorpay_signature=SignatureVerifier("idem_secret").sign("order_1", "pay_1"),
+            )
+            with self.assertNumQueries(1):
+                response = self.service.VerifyRazorpayPayment(request, MagicMock())
+        self.assertEqual(response.message, "Payment verified successfully")
+
+    def test_verify_settles_only_initiated_payments(self):
+        failed = Payment.objects.create(
+            student_fee=self.student_fee, gateway="razorpay", transaction_id="order_1", amount=1000, status="failed"
+        )
+        payment = Payment.objects.create(
+            student_fee=self.student_fee, gateway="razorpay", transaction_id="order_2", amount=1000
+        )
+        signer = SignatureVerifier("idem_secret")
+
+        def verify(payment_id, order_id, razorpay_payment_id):
+            context = MagicMock()
+            request = VerifyRazorpayRequest(
+                payment_id=payment_id, razorpay_order_id=order_id, razorpay_payment_id=razorpay_payment_id,
+                razorpay_signature=signer.sign(order_id, razorpay_payment_id),
+            )
+            return self.service.VerifyRazorpayPayment(request, context), context
+
+        with override_settings(RAZORPAY_KEY_SECRET="idem_secret"):
+            _, context = verify(failed.id, "order_1", "pay_1")
+            context.set_code.assert_called_with(grpc.StatusCode.FAILED_PRECONDITION)
+            failed.refresh_from_db()
+            self.student_fee.refresh_from_db()
+            self.assertEqual((failed.status, self.student_fee.status), ("failed", "pending"))
+
+            for _ in range(2):
+                response, _ = verify(payment.id, "order_2", "pay_2")
+                self.assertEqual(response.message, "Payment verified successfully")
+            _, context = verify(payment.id, "order_2", "pay_3")
+            context.set_code.assert_called_with(grpc.StatusCode.FAILED_PRECONDITION)
+
+        payment.refresh_from_db()
+        self.assertEqual((payment.status, payment.transaction_id), ("success", "pay_2"))
+        self.assertEqual(StudentBalance.objects.get(student_id=1).total_paid, Decimal("1000.00"))
+
+    @patch("payments.views.PaymentGRPCClient")
+    def test_views_forward_a_per_user_key(self, mock_payment_client):
+        mock_payment_client.return_value.initiate_payment.return_value = InitiatePaymentResponse(message="ok")
+        # the user the service's JWT authentication produces, which has an id but no pk
+        user = RemoteUser(id=5, role="student", student=MagicMock(id=1))
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        response = client.post(
+            reverse("initiate-payment"), {"student_fee_id": self.student_fee.id, "gateway": "razorpay"},
+            HTTP_IDEMPOTENCY_KEY="abc",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            mock_payment_client.return_value.initiate_payment.call_args.kwargs["idempotency_key"], "5:abc"
+        )
+
+
+class ReconciliationTestCase(TestCase):
+    def setUp(self):
+        self.fake = FakeGatewayServer(("127.0.0.1", 0), "rzp_test_key", "test_secret")
+        self.fake.start()
+        self.addCleanup(self.fake.stop)
+        self.gateway = RazorpayGateway("rzp_test_key", "test_secret", base_url=self.fake.base_url)
+        self.addCleanup(self.gateway.close)
+        due = timezone.now().date() + timedelta(days=10)
+        structure = FeeStructure.objects.create(grade=9, academic_year="2025-2026", base_fee=700, due_date=due)
+        self.fees = [
+            StudentFee.objects.create(student_id=sid, fee_structure=structure, total_amount=700, due_date=due)
+            for sid in range(1, 5)
+        ]
+        refresh_balances()
+        self.long_ago = timezone.now() - timedelta(hours=2)
+
+    def initiated(self, fee, payment_date=None):
+        order = self.gateway.create_order(fee.total_amount, str(fee.id))
+        return Payment.objects.create(
+            student_fee=fee, gateway="razorpay", transaction_id=order["id"], amount=fee.total_amount,
+            payment_date=payment_date or self.long_ago,
+        )
+
+    def test_stale_payments_are_settled_or_failed(self):
+        paid = self.initiated(self.fees[0])
+        checkout = self.gateway.session.post(
+            f"{self.fake.base_url}/v1/orders/{paid.transaction_id}/pay", auth=("rzp_test_key", "test_secret")
+        ).json()
+        abandoned = self.initiated(self.fees[1])
+        recent = self.initiated(self.fees[2], payment_date=timezone.now())
+        offline = Payment.objects.create(
+            student_fee=self.fees[3], gateway="offline", amount=700, payment_date=self.long_ago
+        )
+
+        summary = reconcile_stale_payments(gateway=self.gateway, batch_size=1, workers=2)
+        self.assertEqual(summary, {"checked": 2, "succeeded": 1, "failed": 1, "unresolved": 0})
+        paid.refresh_from_db()
+        self.assertEqual((paid.status, paid.transaction_id), ("success", checkout["razorpay_payment_id"]))
+        self.assertEqual(StudentFee.objects.get(id=self.fees[0].id).status, "paid")
+        self.assertEqual(StudentBalance.objects.get(student_id=1).total_paid, Decimal("700.00"))
+        self.assertEqual(Payment.objects.get(id=abandoned.id).status, "failed")
+        self.assertEqual(Payment.objects.get(id=recent.id).status, "initiated")
+        self.assertEqual(Payment.objects.get(id=offline.id).status, "initiated")
+
+        # the abandoned fee can be paid again
+        with override_settings(PAYMENT_GATEWAY_BASE_URL=self.fake.base_url, RAZORPAY_KEY_ID="rzp_test_key",
+                               RAZORPAY_KEY_SECRET="test_secret"):
+            reset_gateway()
+            self.addCleanup(reset_gateway)
+            response = PaymentService().InitiatePayment(
+                InitiatePaymentRequest(student_fee_id=self.fees[1].id, student_id=2, gateway="razorpay"), MagicMock()
+            )
+        self.assertEqual(response.message, "Razorpay order created")
+
+    def test_gateway_errors_and_late_verifies_are_left_alone(self):
+        payment = self.initiated(self.fees[0])
+        self.fake.error_rate = 1.0
+        summary = reconcile_stale_payments(gateway=self.gateway)
+        self.assertEqual((summary["checked"], summary["unresolved"]), (1, 1))
+        self.assertEqual(Payment.objects.get(id=payment.id).status, "initiated")
+
+        # verified between the gateway lookup and the write: the verify wins
+        apply = reconciliation._apply
+
+        def verify_then_apply(outcomes):
+            Payment.objects.filter(id=payment.id).update(status="success")
+            return apply(outcomes)
+
+        gateway = MagicMock()
+        gateway.fetch_order_payments.return_value = []
+        with patch("payments.reconciliation._apply", side_effect=verify_then_apply):
+            summary = reconcile_stale_payments(gateway=gateway)
+        self.assertEqual((summary["failed"], Payment.objects.get(id=payment.id).status), (0, "success"))
+
+
+class FeeCollectionReportTestCase(TestCase):
+    def setUp(self):
+        due = timezone.now().date() + timedelta(days=10)
+        self.grade7 = FeeStructure.objects.create(grade=7, academic_year="2025-2026", base_fee=1000, due_date=due)
+        self.grade8 = FeeStructure.objects.create(grade=8, academic_year="2025-2026", base_fee=1500, due_date=due)
+        self.fees = [
+            StudentFee.objects.create(student_id=sid, fee_structure=self.grade7, total_amount=1000, due_date=due)
+            for sid in (1, 2, 3)
+        ]
+        StudentFee.objects.create(student_id=4, fee_structure=self.grade8, total_amount=1500, due_date=due)
+        paid = self.fees[0]
+        paid.status, paid.paid_amount = "paid", 1000
+        paid.save()
+        Payment.objects.create(student_fee=paid, gateway="offline", amount=1000, status="success")
+
+    def rows(self, **kwargs):
+        return [
+            (row["grade"], row["status"], row["fee_count"], row["billed_amount"], row["collected_amount"],
+             row["outstanding_amount"])
+            for row in collection_report(**kwargs)
+        ]
+
+    def test_grouped_totals_and_filters(self):
+        self.assertEqual(self.rows(), [
+            (7, "paid", 1, Decimal("1000"), Decimal("1000"), Decimal("0")),
+            (7, "pending", 2, Decimal("2000"), Decimal("0"), Decimal("2000")),
+            (8, "pending", 1, Decimal("1500"), Decimal("0"), Decimal("1500")),
+        ])
+        self.assertEqual([row[:2] for row in self.rows(grades=[8])], [(8, "pending")])
+        self.assertEqual([row[:2] for row in self.rows(statuses=["paid"])], [(7, "paid")])
+        self.assertEqual(self.rows(academic_year="2030-2031"), [])
+
+    def test_snapshots_are_reused_until_marked_stale(self):
+        self.rows()
+        with self.assertNumQueries(2):  # stale check, snapshot read
+            self.rows()
+        grade8_computed_at = FeeReportSnapshot.objects.get(fee_structure=self.grade8).computed_at
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PaymentService().InitiatePayment(
+                InitiatePaymentRequest(student_fee_id=self.fees[1].id, student_id=2, gateway="offline"), MagicMock()
+            )
+        self.assertEqual([row[:3] for row in self.rows(grades=[7])], [(7, "paid", 2), (7, "pending", 1)])
+        # only the touched structure was recomputed
+        self.assertEqual(FeeReportSnapshot.objects.get(fee_structure=self.grade8).computed_at, grade8_computed_at)
+
+    def test_rpc_totals(self):
+        response = PaymentService().GetFeeCollectionReport(FeeReportRequest(grades=[7]), MagicMock())
+        self.assertEqual(len(response.rows), 2)
+        self.assertEqual(
+            (response.billed_amount, response.collected_amount, response.outstanding_amount), (3000.0, 1000.0, 2000.0)
+        )
+
+    @patch("payments.views.PaymentGRPCClient")
+    def test_report_view_exports(self, mock_payment_client):
+        mock_payment_client.return_value.fee_collection_report.return_value = (
+            PaymentService().GetFeeCollectionReport(FeeReportRequest(), MagicMock())
+        )
+        admin = User.objects.create_user(username="reportadmin", password="adminpass")
+        admin.role = "admin"
+        client = APIClient()
+        client.force_authenticate(user=admin)
+
+        response = client.get(reverse("fee-collection-report"), {"grade": ["7", "8"], "academic_year": "2025-2026"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["billed_amount"], 4500.0)
+        mock_payment_client.return_value.fee_collection_report.assert_called_with(
+            academic_year="2025-2026", grades=[7, 8], statuses=[]
+        )
+
+        response = client.get(reverse("fee-collection-report"), {"export": "csv"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(",")[:3], ["grade", "academic_year", "status"])
+        self.assertEqual(lines[1], "7,2025-2026,paid,1,1000.0,1000.0,0.0")
+        self.assertEqual(len(lines), 4)
+
+        response = client.get(reverse("fee-collection-report"), {"export": "xlsx"})
+        self.assertIn("fee-collection.xlsx", response["Content-Disposition"])
+        with zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content))) as workbook:
+            sheet = workbook.read("xl/worksheets/sheet1.xml").decode()
+        self.assertEqual(sheet.count("<row>"), 4)
+        self.assertIn("<t>2025-2026</t>", sheet)
+
+        self.assertEqual(client.get(reverse("fee-collection-report"), {"export": "pdf"}).status_code, 400)
+
+
+class OfflineBatchTestCase(TestCase):
+    def setUp(self):
+        due = timezone.now().date() + timedelta(days=10)
+        structure = FeeStructure.objects.create(grade=6, academic_year="2025-2026", base_fee=800, due_date=due)
+        self.fees = [
+            StudentFee.objects.create(student_id=sid, fee_structure=structure, total_amount=800, due_date=due)
+            for sid in range(1, 31)
+        ]
+        refresh_balances()
+
+    def test_batch_posts_valid_entries_and_reports_the_rest(self):
+        paid, reserved = self.fees[2], self.fees[3]
+        paid.status = "paid"
+        paid.save()
+        reserved.reserved_until = timezone.now() + timedelta(minutes=1)
+        reserved.save()
+        Payment.objects.create(student_fee=self.fees[5], gateway="offline", amount=800, transaction_id="R-OLD")
+        # initiated online, its reservation already lapsed
+        Payment.objects.create(student_fee=self.fees[7], gateway="razorpay", amount=800, transaction_id="order_8")
+
+        results = post_offline_batch([
+            (self.fees[0].id, 1, None, "R-1"),
+            (self.fees[1].id, 99, None, "R-2"),            # wrong student
+            (paid.id, 3, None, "R-3"),
+            (reserved.id, 4, None, "R-4"),
+            (self.fees[4].id, 5, Decimal("500"), "R-5"),
+            (self.fees[5].id, 6, None, "R-OLD"),
+            (self.fees[0].id, 1, None, "R-6"),            # same fee twice in one batch
+            (self.fees[6].id, 7, Decimal("800"), ""),
+            (self.fees[7].id, 8, None, "R-8"),
+        ])
+        self.assertEqual(
+            [status for _, _, status, _, _ in results],
+            ["posted", "not_found", "already_paid", "in_progress", "amount_mismatch", "duplicate",
+             "already_paid", "posted", "in_progress"],
+        )
+        posted = [payment_id for _, _, status, payment_id, _ in results if status == "posted"]
+        self.assertEqual(
+            set(Payment.objects.filter(id__in=posted).values_list("transaction_id", "status", "amount")),
+            {("R-1", "success", Decimal("800.00")), (None, "success", Decimal("800.00"))},
+        )
+        self.assertEqual(StudentFee.objects.filter(status="paid").count(), 3)
+        self.assertEqual(StudentBalance.objects.get(student_id=1).total_paid, Decimal("800.00"))
+
+        # posting the same sheet again writes nothing
+        again = post_offline_batch([(self.fees[0].id, 1, None, "R-1"), (self.fees[6].id, 7, None, "")])
+        self.assertEqual([status for _, _, status, _, _ in again], ["duplicate", "already_paid"])
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        entries = [(fee.id, fee.student_id, None, f"R-{fee.id}") for fee in self.fees]
+        # stale fines check, savepoint, locking fee read, initiated payments, reference lookup,
+        # INSERT, fee UPDATE, balance UPDATE, audit log, release
+        with self.assertNumQueries(10):
+            results = post_offline_batch(entries)
+        self.assertEqual({status for _, _, status, _, _ in results}, {"posted"})
+
+    def test_rpc_totals(self):
+        request = OfflinePaymentBatchRequest(payments=[
+            OfflinePaymentEntry(student_fee_id=self.fees[0].id, student_id=1, reference="R-1"),
+            OfflinePaymentEntry(student_fee_id=self.fees[1].id, student_id=2, amount=1.0),
+        ])
+        response = PaymentService().PostOfflinePayments(request, MagicMock())
+        self.assertEqual((response.posted, response.rejected, response.posted_amount), (1, 1, 800.0))
+        self.assertEqual(response.results[1].status, "amount_mismatch")
+
+    @override_settings(OFFLINE_PAYMENT_BATCH_SIZE=2)
+    @patch("payments.views.PaymentGRPCClient")
+    def test_upload_view(self, mock_payment_client):
+        mock_payment_client.return_value.post_offline_payments.side_effect = (
+            lambda entries, idempotency_key=None: PaymentService().PostOfflinePayments(
+                OfflinePaymentBatchRequest(payments=[
+                    OfflinePaymentEntry(student_fee_id=f, student_id=s, amount=float(a or 0), reference=r)
+                    for f, s, a, r in entries
+                ]),
+                MagicMock(),
+            )
+        )
+        admin = User.objects.create_user(username="counter", password="adminpass")
+        admin.role = "admin"
+        client = APIClient()
+        client.force_authenticate(user=admin)
+        sheet = "student_fee_id,student_id,amount,reference\n" + "".join(
+            f"{fee.id},{fee.student_id},,R-{fee.id}\n" for fee in self.fees[:3]
+        )
+
+        upload = io.BytesIO(sheet.encode())
+        upload.name = "counter.csv"
+        response = client.post(reverse("offline-payment-batch"), {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data["posted"], response.data["posted_amount"]), (3, 2400.0))
+        self.assertEqual(mock_payment_client.return_value.post_offline_payments.call_count, 2)
+
+        upload = io.BytesIO(sheet.encode())
+        upload.name = "counter.csv"
+        response = client.post(
+            reverse("offline-payment-batch") + "?export=csv", {"file": upload}, format="multipart"
+        )
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "student_fee_id,reference,status,payment_id,amount")
+        self.assertTrue(all(",duplicate," in line for line in lines[1:]))
+
+        upload = io.BytesIO(b"student_fee_id,student_id\nabc,1\n")
+        upload.name = "counter.csv"
+        response = client.post(reverse("offline-payment-batch"), {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Line 2", response.data["error"])
 
-    @patch("payments.grpc_server.StudentFee.objects.select_for_update")
-    @patch("payments.grpc_server.Payment.objects.create")
-    @patch("payments.grpc_server.TransactionLog.objects.create")
-    def test_initiate_offline_payment(self, mock_log, mock_payment_create, mock_select):
-        student_fee = MagicMock()
-        student_fee.id = 1
-        student_fee.student_id = 1
-        student_fee.lock = 0
-        student_fee.status = "pending"
-        student_fee.due_date = datetime.today().date()
-        student_fee.fee_structure = MagicMock(base_fee=1000, fine_per_day=50)
-        student_fee.save = MagicMock()   # <-- important
-        student_fee.total_amount = 1000
-
-        mock_select.return_value.get.return_value = student_fee
-        mock_payment_create.return_value = MagicMock(id=2)
-
-        request = InitiatePaymentRequest(student_fee_id=1, student_id=1, gateway="offline")
-        response = self.service.InitiatePayment(request, self.mock_context)
 
 if __name__ == "__main__":
     unittest.main()
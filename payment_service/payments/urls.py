@@ -2,7 +2,9 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
      FeeAllocationView,
-    InitiatePaymentView, SimulateRazorpayPaymentView , VerifyRazorpayPaymentView
+    InitiatePaymentView, SimulateRazorpayPaymentView , VerifyRazorpayPaymentView,
+    ReceiptStatusView, ReceiptDownloadView, StudentFeesView, FeeCollectionReportView,
+    OfflinePaymentUploadView,
 )
 from django.conf.urls.static import static
 from django.conf import settings
@@ -10,7 +12,12 @@ from rest_framework_simplejwt.views import TokenRefreshView
 
 urlpatterns = [
     path('fee-allocation/', FeeAllocationView.as_view(), name='fee-allocation'),
+    path('fees/', StudentFeesView.as_view(), name='student-fees'),
+    path('reports/fee-collection/', FeeCollectionReportView.as_view(), name='fee-collection-report'),
     path('pay/initiate/', InitiatePaymentView.as_view(), name='initiate-payment'),
+    path('pay/offline/batch/', OfflinePaymentUploadView.as_view(), name='offline-payment-batch'),
     path("simulate/", SimulateRazorpayPaymentView.as_view(), name="simulate-payment"),
     path('pay/verify/', VerifyRazorpayPaymentView.as_view(), name='verify-payment'),
+    path('receipts/<str:receipt_number>/', ReceiptStatusView.as_view(), name='receipt-status'),
+    path('receipts/<str:receipt_number>/download/', ReceiptDownloadView.as_view(), name='receipt-download'),
 ]
\ No newline at end of file
@@ -0,0 +1,115 @@
+import hashlib
+import hmac
+
+from django.conf import settings
+from django.db import transaction
+
+from .ledger import record_payments
+from .reports import mark_report_stale_on_commit
+from .models import Payment, StudentFee
+
+_verifier = None
+
+
+class SignatureVerifier:
+    """Local check of Razorpay checkout signatures, HMAC-SHA256 over ``order_id|payment_id``.
+
+    The keyed HMAC state is built once and copied per call, so a check costs one
+    hash of the message instead of a razorpay.Client and the SDK's dict plumbing.
+    Signatures are compared in constant time.
+    """
+
+    def __init__(self, key_secret):
+        self.key_secret = key_secret
+        self._keyed = hmac.new((key_secret or '').encode(), digestmod=hashlib.sha256)
+
+    def sign(self, order_id, payment_id):
+        mac = self._keyed.copy()
+        mac.update(f"{order_id}|{payment_id}".encode())
+        return mac.hexdigest()
+
+    def verify(self, order_id, payment_id, signature):
+        expected = self.sign(order_id, payment_id).encode()
+        return hmac.compare_digest(expected, (signature or '').encode())
+
+
+def get_verifier():
+    """Return the verifier for the current RAZORPAY_KEY_SECRET (rebuilt if the key changes)."""
+    global _verifier
+    if _verifier is None or _verifier.key_secret != settings.RAZORPAY_KEY_SECRET:
+        _verifier = SignatureVerifier(settings.RAZORPAY_KEY_SECRET)
+    return _verifier
+
+
+def verify_batch(entries):
+    """Verify many checkout callbacks and settle the valid ones in one transaction.
+
+    ``entries`` are (payment_id, order_id, razorpay_payment_id, signature) tuples.
+    Signatures are checked locally first; the payments are then read with one
+    query and every newly verified payment and its fee are written with one
+    bulk UPDATE each. Returns (payment_id, razorpay_payment_id, status) per entry,
+    status being verified, already_verified, invalid_signature, not_found or
+    order_mismatch. Re-sending a settled entry reports already_verified.
+    """
+    verifier = get_verifier()
+    entries = [
+        (payment_id, order_id, razorpay_payment_id, verifier.verify(order_id, razorpay_payment_id, signature))
+        for payment_id, order_id, razorpay_payment_id, signature in entries
+    ]
+    results = []
+    with transaction.atomic():
+        payments = Payment.objects.select_for_update().in_bulk(
+            {payment_id for payment_id, _, _, valid in entries if valid}
+        )
+        settled = {}
+        for payment_id, order_id, razorpay_payment_id, valid in entries:
+            payment = payments.get(payment_id)
+            if not valid:
+                status = 'invalid_signature'
+            elif payment is None:
+                status = 'not_found'
+            elif settled.get(payment_id) == razorpay_payment_id or (
+                payment.status == 'success' and payment.transaction_id == razorpay_payment_id
+            ):
+                status = 'already_verified'
+            elif payment_id in settled or payment.status != 'initiated' or payment.transaction_id != order_id:
+                status = 'order_mismatch'
+            else:
+                settled[payment_id] = razorpay_payment_id
+                status = 'verified'
+            results.append((payment_id, razorpay_payment_id, status))
+
+        settle_payments(payments, settled)
+    return results
+
+
+def settle_payments(payments, settled):
+    """Mark payments successful and their fees paid, with one bulk write each.
+
+    ``payments`` maps ids to Payment rows locked by the caller's transaction and
+    ``settled`` maps the ids to settle to their gateway payment ids. Balances
+    and the fee report are updated for fees that were not already paid.
+    """
+    if not settled:
+        return
+    for payment_id, razorpay_payment_id in settled.items():
+        payments[payment_id].status = 'success'
+        payments[payment_id].transaction_id = razorpay_payment_id
+    Payment.objects.bulk_update([payments[payment_id] for payment_id in settled], ['status', 'transaction_id'])
+    fees = StudentFee.objects.filter(id__in={payments[payment_id].student_fee_id for payment_id in settled})
+    unpaid = {
+        fee_id: (student_id, status, total, fee_structure_id)
+        for fee_id, student_id, status, total, fee_structure_id in fees.exclude(status='paid').values_list(
+            'id', 'student_id', 'status', 'total_amount', 'fee_structure_id'
+        )
+    }
+    fees.update(status='paid')
+    newly_paid, structures = [], set()
+    for payment_id in settled:
+        fee = unpaid.pop(payments[payment_id].student_fee_id, None)
+        if fee is not None:
+            student_id, status, total, fee_structure_id = fee
+            newly_paid.append((student_id, payments[payment_id].amount, total, status == 'overdue'))
+            structures.add(fee_structure_id)
+    record_payments(newly_paid)
+    mark_report_stale_on_commit(structures)
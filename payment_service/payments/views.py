@@ -1,9 +1,14 @@
 from datetime import datetime
+import re
 import traceback
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.parsers import MultiPartParser
 from rest_framework import status, permissions
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.conf import settings
 import grpc
 from .payment_client import PaymentGRPCClient
 from .user_client import UserGRPCClient      
@@ -15,6 +20,9 @@ from .serializers import (
     SimulateRazorpayPaymentSerializer,
 )
 from .permission import  IsStudent , IsAdminUser
+from .receipt_storage import get_storage
+from .exports import XLSX_CONTENT_TYPE, csv_stream, xlsx_stream
+from .offline import InvalidBatch, read_offline_csv
 
 logger = logging.getLogger(__name__)
 
@@ -72,6 +80,16 @@ class FeeAllocationView(APIView):
         finally:
             client.close()      
 
+def idempotency_key(request):
+    """The request's Idempotency-Key header, scoped to the user so keys never collide across accounts."""
+    key = request.headers.get("Idempotency-Key")
+    return f"{request.user.id}:{key}" if key else None
+
+
+def key_reused(e):
+    return Response({"error": e.details()}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+
 class InitiatePaymentView(APIView):
     permission_classes = [permissions.IsAuthenticated,IsStudent]
 
@@ -95,6 +113,7 @@ class InitiatePaymentView(APIView):
                 student_fee_id=int(student_fee_id),
                 student_id=student_id,
                 gateway=gateway,
+                idempotency_key=idempotency_key(request),
             )
             
             print(f"Payment gRPC response: {response}")
@@ -111,6 +130,8 @@ class InitiatePaymentView(APIView):
             )
             
         except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.ALREADY_EXISTS:
+                return key_reused(e)
             print(f"Payment gRPC Error: {e.code()}: {e.details()}")
             return Response(
                 {"error": f"Payment service error: {e.details()}"},
@@ -126,6 +147,68 @@ class InitiatePaymentView(APIView):
         finally:
             client.close()
         
+OFFLINE_RESULT_COLUMNS = ["student_fee_id", "reference", "status", "payment_id", "amount"]
+
+
+class OfflinePaymentUploadView(APIView):
+    """Cash counter upload: a CSV of student_fee_id, student_id, amount, reference.
+
+    Rows are posted in batches of OFFLINE_PAYMENT_BATCH_SIZE, each in one
+    transaction. The answer is the reconciliation report, one result per row;
+    ``?export=csv`` returns it as a CSV download instead.
+    """
+    parser_classes = [MultiPartParser]
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if not upload or not upload.name.endswith(".csv"):
+            return Response({"error": "Invalid file format"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            entries = read_offline_csv(upload.read())
+        except InvalidBatch as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        size = settings.OFFLINE_PAYMENT_BATCH_SIZE
+        results, posted_amount = [], 0.0
+        client = PaymentGRPCClient()
+        try:
+            for start in range(0, len(entries), size):
+                key = idempotency_key(request)
+                # one key per chunk, so a retried upload replays every batch that already went through
+                response = client.post_offline_payments(
+                    entries[start:start + size], idempotency_key=key and f"{key}:{start}"
+                )
+                results.extend(response.results)
+                posted_amount += response.posted_amount
+        except grpc.RpcError as e:
+            # earlier batches are committed; report how far the upload got
+            return Response(
+                {"error": e.details(), "processed": len(results)}, status=status.HTTP_502_BAD_GATEWAY
+            )
+        finally:
+            client.close()
+
+        rows = [{column: getattr(result, column) for column in OFFLINE_RESULT_COLUMNS} for result in results]
+        if request.query_params.get("export") == "csv":
+            response = StreamingHttpResponse(
+                csv_stream(OFFLINE_RESULT_COLUMNS, ([row[c] for c in OFFLINE_RESULT_COLUMNS] for row in rows)),
+                content_type="text/csv",
+            )
+            response["Content-Disposition"] = 'attachment; filename="offline-reconciliation.csv"'
+            return response
+        posted = sum(row["status"] == "posted" for row in rows)
+        return Response(
+            {
+                "posted": posted,
+                "rejected": len(rows) - posted,
+                "posted_amount": posted_amount,
+                "results": rows,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 class SimulateRazorpayPaymentView(APIView):
     permission_classes = [permissions.IsAuthenticated,IsStudent]
 
@@ -188,7 +271,8 @@ class VerifyRazorpayPaymentView(APIView):
                 payment_id=int(payment_id),
                 razorpay_order_id=razorpay_order_id,
                 razorpay_payment_id=razorpay_payment_id,
-                razorpay_signature=razorpay_signature
+                razorpay_signature=razorpay_signature,
+                idempotency_key=idempotency_key(request),
             )
 
             if verify_response.message != "Payment verified successfully":
@@ -202,10 +286,261 @@ class VerifyRazorpayPaymentView(APIView):
             return Response(
                 {
                     "message": receipt_response.message,
-                    "receipt_url": receipt_response.receipt_url
+                    "receipt_url": receipt_response.receipt_url,
+                    "receipt_number": receipt_response.receipt_number,
+                    "receipt_status": receipt_response.status,
                 },
                 status=status.HTTP_200_OK
             )
 
         except grpc.RpcError as e:
-            return Response({"error": e.details()}, status=status.HTTP_502_BAD_GATEWAY)
\ No newline at end of file
+            if e.code() == grpc.StatusCode.ALREADY_EXISTS:
+                return key_reused(e)
+            return Response({"error": e.details()}, status=status.HTTP_502_BAD_GATEWAY)
+
+
+def can_view_receipt(user, receipt):
+    """Receipts are visible to the student they were issued to and to admins."""
+    if getattr(user, "role", None) == "admin":
+        return True
+    student = getattr(user, "student", None)
+    return student is not None and receipt.student_id == student.id
+
+
+class ReceiptStatusView(APIView):
+    """Poll a queued receipt: returns its status and, once ready, the PDF URL."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, receipt_number):
+        client = PaymentGRPCClient()
+        try:
+            receipt = client.get_receipt(receipt_number)
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.NOT_FOUND:
+                return Response({"error": "Receipt not found"}, status=status.HTTP_404_NOT_FOUND)
+            return Response({"error": e.details()}, status=status.HTTP_502_BAD_GATEWAY)
+        finally:
+            client.close()
+
+        if not can_view_receipt(request.user, receipt):
+            return Response({"error": "Receipt not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(
+            {
+                "receipt_number": receipt.receipt_number,
+                "status": receipt.status,
+                "receipt_url": receipt.receipt_url if receipt.status == "ready" else None,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class StudentFeesView(APIView):
+    """The logged-in student's fee ledger: balance summary plus each fee (``?summary=1`` for just the balance)."""
+    permission_classes = [permissions.IsAuthenticated, IsStudent]
+
+    def get(self, request):
+        summary_only = request.query_params.get("summary") in ("1", "true")
+        client = PaymentGRPCClient()
+        try:
+            response = client.get_student_fees(request.user.student.id, summary_only=summary_only)
+        except grpc.RpcError as e:
+            return Response({"error": e.details()}, status=status.HTTP_502_BAD_GATEWAY)
+        finally:
+            client.close()
+
+        balance = response.balance
+        return Response(
+            {
+                "balance": {
+                    "total_due": balance.total_due,
+                    "total_paid": balance.total_paid,
+                    "total_fines": balance.total_fines,
+                    "overdue_count": balance.overdue_count,
+                    "fee_count": balance.fee_count,
+                    "updated_at": balance.updated_at,
+                },
+                "fees": [
+                    {
+                        "id": fee.id,
+                        "grade": fee.grade,
+                        "academic_year": fee.academic_year,
+                        "base_fee": fee.base_fee,
+                        "fine_amount": fee.fine_amount,
+                        "days_overdue": fee.days_overdue,
+                        "total_amount": fee.total_amount,
+                        "paid_amount": fee.paid_amount,
+                        "status": fee.status,
+                        "due_date": fee.due_date,
+                    }
+                    for fee in response.fees
+                ],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+REPORT_COLUMNS = [
+    "grade", "academic_year", "status", "fee_count", "billed_amount", "collected_amount", "outstanding_amount",
+]
+
+
+class FeeCollectionReportView(APIView):
+    """Billed / collected / outstanding by grade, year and fee status.
+
+    Filters: ``academic_year``, ``grade`` and ``status`` (repeatable).
+    ``?export=csv`` or ``?export=xlsx`` streams the rows as a download.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        try:
+            grades = [int(grade) for grade in request.query_params.getlist("grade")]
+        except ValueError:
+            return Response({"error": "grade must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        export = request.query_params.get("export")
+        if export not in (None, "csv", "xlsx"):
+            return Response({"error": "export must be csv or xlsx"}, status=status.HTTP_400_BAD_REQUEST)
+
+        client = PaymentGRPCClient()
+        try:
+            report = client.fee_collection_report(
+                academic_year=request.query_params.get("academic_year", ""),
+                grades=grades,
+                statuses=request.query_params.getlist("status"),
+            )
+        except grpc.RpcError as e:
+            return Response({"error": e.details()}, status=status.HTTP_502_BAD_GATEWAY)
+        finally:
+            client.close()
+
+        if export:
+            rows = ([getattr(row, column) for column in REPORT_COLUMNS] for row in report.rows)
+            if export == "csv":
+                response = StreamingHttpResponse(csv_stream(REPORT_COLUMNS, rows), content_type="text/csv")
+            else:
+                response = StreamingHttpResponse(xlsx_stream(REPORT_COLUMNS, rows), content_type=XLSX_CONTENT_TYPE)
+            response["Content-Disposition"] = f'attachment; filename="fee-collection.{export}"'
+            return response
+        return Response(
+            {
+                "rows": [{column: getattr(row, column) for column in REPORT_COLUMNS} for row in report.rows],
+                "billed_amount": report.billed_amount,
+                "collected_amount": report.collected_amount,
+                "outstanding_amount": report.outstanding_amount,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _byte_range(header, size):
+    """(start, end) for a single satisfiable ``bytes=`` range, None to send everything, or
+    False when a well-formed range cannot be satisfied (416).
+
+    Malformed headers, including a last byte before the first, and multi-range
+    requests are ignored (RFC 9110 14.2), so they get the whole file."""
+    match = _RANGE.match(header or '')
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first == '':
+        start, end = max(size - int(last), 0), size - 1
+    elif last and int(last) < int(first):
+        return None
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        return False
+    return start, end
+
+
+def _stream(handle, length):
+    try:
+        while length > 0:
+            chunk = handle.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        handle.close()
+
+
+def receipt_file_response(request, storage, key, etag, filename):
+    """Stream a stored receipt without loading it into memory.
+
+    Full downloads go through FileResponse, so local files use the server's
+    sendfile/file_wrapper. ``Range`` gets a 206 streamed in chunks; ``If-None-Match``
+    and ``If-Range`` are honoured against the content-hash ETag.
+    """
+    quoted_etag = f'"{etag}"' if etag else None
+    if quoted_etag and quoted_etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        response['ETag'] = quoted_etag
+        return response
+
+    size = storage.size(key)
+    byte_range = _byte_range(request.headers.get('Range'), size)
+    if_range = request.headers.get('If-Range')
+    if if_range and if_range != quoted_etag:
+        byte_range = None
+    if byte_range is False:
+        response = HttpResponse(status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        response['Content-Range'] = f"bytes */{size}"
+        return response
+
+    if byte_range is None:
+        response = FileResponse(storage.open(key), content_type='application/pdf', filename=filename)
+        response['Content-Length'] = size
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _stream(storage.open(key, start), end - start + 1),
+            status=status.HTTP_206_PARTIAL_CONTENT,
+            content_type='application/pdf',
+        )
+        response['Content-Range'] = f"bytes {start}-{end}/{size}"
+        response['Content-Length'] = end - start + 1
+        response['Content-Disposition'] = f'inline; filename="{filename}"'
+    response['Accept-Ranges'] = 'bytes'
+    if quoted_etag:
+        response['ETag'] = quoted_etag
+        # content-addressed: the bytes behind this ETag never change
+        response['Cache-Control'] = 'private, max-age=31536000, immutable'
+    return response
+
+
+class ReceiptDownloadView(APIView):
+    """Stream a receipt PDF; a receipt that is not ready or whose file is gone is
+    (re)queued and answered with 202 and the status URL."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, receipt_number):
+        client = PaymentGRPCClient()
+        try:
+            receipt = client.get_receipt(receipt_number)
+            if not can_view_receipt(request.user, receipt):
+                return Response({"error": "Receipt not found"}, status=status.HTTP_404_NOT_FOUND)
+
+            storage = get_storage()
+            if receipt.status != "ready" or not storage.exists(receipt.receipt_file):
+                queued = client.generate_receipt(payment_id=receipt.payment_id, student_id=receipt.student_id)
+                status_url = reverse("receipt-status", args=[receipt_number])
+                return Response(
+                    {"receipt_number": receipt_number, "status": queued.status or "pending", "status_url": status_url},
+                    status=status.HTTP_202_ACCEPTED,
+                    headers={"Location": status_url, "Retry-After": "2"},
+                )
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.NOT_FOUND:
+                return Response({"error": "Receipt not found"}, status=status.HTTP_404_NOT_FOUND)
+            return Response({"error": e.details()}, status=status.HTTP_502_BAD_GATEWAY)
+        finally:
+            client.close()
+
+        return receipt_file_response(
+            request, storage, receipt.receipt_file, receipt.content_hash, f"{receipt_number}.pdf"
+        )
@@ -64,10 +64,35 @@ class ExamServiceStub(object):
                 request_serializer=exam__pb2.TeacherRequest.SerializeToString,
                 response_deserializer=exam__pb2.ListExamsResponse.FromString,
                 _registered_method=True)
-        self.AttemptExam = channel.unary_unary(
-                '/exams.ExamService/AttemptExam',
-                request_serializer=exam__pb2.AttemptExamRequest.SerializeToString,
-                response_deserializer=exam__pb2.AttemptExamResponse.FromString,
+        self.GetStudentDashboard = channel.unary_unary(
+                '/exams.ExamService/GetStudentDashboard',
+                request_serializer=exam__pb2.StudentRequest.SerializeToString,
+                response_deserializer=exam__pb2.StudentDashboardResponse.FromString,
+                _registered_method=True)
+        self.GetExamStats = channel.unary_unary(
+                '/exams.ExamService/GetExamStats',
+                request_serializer=exam__pb2.ExamStatsRequest.SerializeToString,
+                response_deserializer=exam__pb2.ExamStatsResponse.FromString,
+                _registered_method=True)
+        self.SubmitExam = channel.unary_unary(
+                '/exams.ExamService/SubmitExam',
+                request_serializer=exam__pb2.SubmitExamRequest.SerializeToString,
+                response_deserializer=exam__pb2.SubmitExamResponse.FromString,
+                _registered_method=True)
+        self.GetExamPaper = channel.unary_unary(
+                '/exams.ExamService/GetExamPaper',
+                request_serializer=exam__pb2.ExamPaperRequest.SerializeToString,
+                response_deserializer=exam__pb2.ExamPaperResponse.FromString,
+                _registered_method=True)
+        self.ImportQuestions = channel.stream_unary(
+                '/exams.ExamService/ImportQuestions',
+                request_serializer=exam__pb2.QuestionImportRow.SerializeToString,
+                response_deserializer=exam__pb2.ImportQuestionsResponse.FromString,
+                _registered_method=True)
+        self.StartExam = channel.unary_unary(
+                '/exams.ExamService/StartExam',
+                request_serializer=exam__pb2.StartExamRequest.SerializeToString,
+                response_deserializer=exam__pb2.StartExamResponse.FromString,
                 _registered_method=True)
 
 
@@ -110,7 +135,37 @@ class ExamServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
-    def AttemptExam(self, request, context):
+    def GetStudentDashboard(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetExamStats(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SubmitExam(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetExamPaper(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ImportQuestions(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StartExam(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
@@ -149,10 +204,35 @@ def add_ExamServiceServicer_to_server(servicer, server):
                     request_deserializer=exam__pb2.TeacherRequest.FromString,
                     response_serializer=exam__pb2.ListExamsResponse.SerializeToString,
             ),
-            'AttemptExam': grpc.unary_unary_rpc_method_handler(
-                    servicer.AttemptExam,
-                    request_deserializer=exam__pb2.AttemptExamRequest.FromString,
-                    response_serializer=exam__pb2.AttemptExamResponse.SerializeToString,
+            'GetStudentDashboard': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetStudentDashboard,
+                    request_deserializer=exam__pb2.StudentRequest.FromString,
+                    response_serializer=exam__pb2.StudentDashboardResponse.SerializeToString,
+            ),
+            'GetExamStats': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetExamStats,
+                    request_deserializer=exam__pb2.ExamStatsRequest.FromString,
+                    response_serializer=exam__pb2.ExamStatsResponse.SerializeToString,
+            ),
+            'SubmitExam': grpc.unary_unary_rpc_method_handler(
+                    servicer.SubmitExam,
+                    request_deserializer=exam__pb2.SubmitExamRequest.FromString,
+                    response_serializer=exam__pb2.SubmitExamResponse.SerializeToString,
+            ),
+            'GetExamPaper': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetExamPaper,
+                    request_deserializer=exam__pb2.ExamPaperRequest.FromString,
+                    response_serializer=exam__pb2.ExamPaperResponse.SerializeToString,
+            ),
+            'ImportQuestions': grpc.stream_unary_rpc_method_handler(
+                    servicer.ImportQuestions,
+                    request_deserializer=exam__pb2.QuestionImportRow.FromString,
+                    response_serializer=exam__pb2.ImportQuestionsResponse.SerializeToString,
+            ),
+            'StartExam': grpc.unary_unary_rpc_method_handler(
+                    servicer.StartExam,
+                    request_deserializer=exam__pb2.StartExamRequest.FromString,
+                    response_serializer=exam__pb2.StartExamResponse.SerializeToString,
             ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
@@ -328,7 +408,142 @@ class ExamService(object):
             _registered_method=True)
 
     @staticmethod
-    def AttemptExam(request,
+    def GetStudentDashboard(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/exams.ExamService/GetStudentDashboard',
+            exam__pb2.StudentRequest.SerializeToString,
+            exam__pb2.StudentDashboardResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetExamStats(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/exams.ExamService/GetExamStats',
+            exam__pb2.ExamStatsRequest.SerializeToString,
+            exam__pb2.ExamStatsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SubmitExam(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/exams.ExamService/SubmitExam',
+            exam__pb2.SubmitExamRequest.SerializeToString,
+            exam__pb2.SubmitExamResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetExamPaper(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/exams.ExamService/GetExamPaper',
+            exam__pb2.ExamPaperRequest.SerializeToString,
+            exam__pb2.ExamPaperResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ImportQuestions(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/exams.ExamService/ImportQuestions',
+            exam__pb2.QuestionImportRow.SerializeToString,
+            exam__pb2.ImportQuestionsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StartExam(request,
             target,
             options=(),
             channel_credentials=None,
@@ -341,9 +556,9 @@ class ExamService(object):
         return grpc.experimental.unary_unary(
             request,
             target,
-            '/exams.ExamService/AttemptExam',
-            exam__pb2.AttemptExamRequest.SerializeToString,
-            exam__pb2.AttemptExamResponse.FromString,
+            '/exams.ExamService/StartExam',
+            exam__pb2.StartExamRequest.SerializeToString,
+            exam__pb2.StartExamResponse.FromString,
             options,
             channel_credentials,
             insecure,
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rpayment.proto\x12\x07payment\"\x07\n\x05\x45mpty\"\x1c\n\x1aListTransactionLogsRequest\"v\n\x14\x46\x65\x65\x41llocationRequest\x12\r\n\x05grade\x18\x01 \x01(\x05\x12\x15\n\racademic_year\x18\x02 \x01(\t\x12\x10\n\x08\x62\x61se_fee\x18\x03 \x01(\x01\x12\x10\n\x08\x64ue_date\x18\x04 \x01(\t\x12\x14\n\x0c\x66ine_per_day\x18\x05 \x01(\x01\"(\n\x15\x46\x65\x65\x41llocationResponse\x12\x0f\n\x07message\x18\x01 \x01(\t\"X\n\x1c\x41llocateFeeForStudentRequest\x12\x12\n\nstudent_id\x18\x01 \x01(\x05\x12\r\n\x05grade\x18\x02 \x01(\x05\x12\x15\n\racademic_year\x18\x03 \x01(\t\"0\n\x1d\x41llocateFeeForStudentResponse\x12\x0f\n\x07message\x18\x01 \x01(\t\"\'\n\x11StudentFeeRequest\x12\x12\n\nstudent_id\x18\x01 \x01(\x05\"\x93\x01\n\nStudentFee\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x12\n\nstudent_id\x18\x02 \x01(\x05\x12\x18\n\x10\x66\x65\x65_structure_id\x18\x03 \x01(\x05\x12\x14\n\x0ctotal_amount\x18\x04 \x01(\x01\x12\x13\n\x0bpaid_amount\x18\x05 \x01(\x01\x12\x0e\n\x06status\x18\x06 \x01(\t\x12\x10\n\x08\x64ue_date\x18\x07 \x01(\t\";\n\x16StudentFeeListResponse\x12!\n\x04\x66\x65\x65s\x18\x01 \x03(\x0b\x32\x13.payment.StudentFee\")\n\x16PaymentOptionsResponse\x12\x0f\n\x07options\x18\x01 \x03(\t\"U\n\x16InitiatePaymentRequest\x12\x16\n\x0estudent_fee_id\x18\x01 \x01(\x05\x12\x12\n\nstudent_id\x18\x02 \x01(\x05\x12\x0f\n\x07gateway\x18\x03 \x01(\t\"r\n\x17InitiatePaymentResponse\x12\x10\n\x08order_id\x18\x01 \x01(\t\x12\x0e\n\x06\x61mount\x18\x02 \x01(\x01\x12\x10\n\x08\x63urrency\x18\x03 \x01(\t\x12\x12\n\npayment_id\x18\x04 \x01(\x05\x12\x0f\n\x07message\x18\x05 \x01(\t\"\x7f\n\x15VerifyRazorpayRequest\x12\x12\n\npayment_id\x18\x01 \x01(\x05\x12\x19\n\x11razorpay_order_id\x18\x02 \x01(\t\x12\x1b\n\x13razorpay_payment_id\x18\x03 \x01(\t\x12\x1a\n\x12razorpay_signature\x18\x04 \x01(\t\">\n\x16VerifyRazorpayResponse\x12\x0f\n\x07message\x18\x01 \x01(\t\x12\x13\n\x0breceipt_url\x18\x02 \x01(\t\"H\n\x17SimulateRazorpayRequest\x12\x12\n\npayment_id\x18\x01 \x01(\x05\x12\x19\n\x11razorpay_order_id\x18\x02 \x01(\t\"\x82\x01\n\x18SimulateRazorpayResponse\x12\x12\n\npayment_id\x18\x01 \x01(\x05\x12\x19\n\x11razorpay_order_id\x18\x02 \x01(\t\x12\x1b\n\x13razorpay_payment_id\x18\x03 \x01(\t\x12\x1a\n\x12razorpay_signature\x18\x04 \x01(\t\"\'\n\x11GetStudentRequest\x12\x12\n\nstudent_id\x18\x01 \x01(\x05\"k\n\x12GetStudentResponse\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x12\n\nfirst_name\x18\x02 \x01(\t\x12\x11\n\tlast_name\x18\x03 \x01(\t\x12\x13\n\x0broll_number\x18\x04 \x01(\t\x12\r\n\x05grade\x18\x05 \x01(\t\"\x91\x01\n\x16GenerateReceiptRequest\x12\x12\n\npayment_id\x18\x01 \x01(\x05\x12\x12\n\nstudent_id\x18\x02 \x01(\x05\x12\x14\n\x0cstudent_name\x18\x03 \x01(\t\x12\x13\n\x0broll_number\x18\x04 \x01(\t\x12\r\n\x05grade\x18\x05 \x01(\t\x12\x15\n\racademic_year\x18\x06 \x01(\t\"?\n\x17GenerateReceiptResponse\x12\x0f\n\x07message\x18\x01 \x01(\t\x12\x13\n\x0breceipt_url\x18\x02 \x01(\t\"W\n\x0eTransactionLog\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x13\n\x0blog_message\x18\x02 \x01(\t\x12\x10\n\x08log_type\x18\x03 \x01(\t\x12\x12\n\ncreated_at\x18\x04 \x01(\t\"D\n\x1bListTransactionLogsResponse\x12%\n\x04logs\x18\x01 \x03(\x0b\x32\x17.payment.TransactionLog2\xea\x06\n\x0ePaymentService\x12L\n\x0b\x41llocateFee\x12\x1d.payment.FeeAllocationRequest\x1a\x1e.payment.FeeAllocationResponse\x12\x66\n\x15\x41llocateFeeForStudent\x12%.payment.AllocateFeeForStudentRequest\x1a&.payment.AllocateFeeForStudentResponse\x12M\n\x0eGetStudentFees\x12\x1a.payment.StudentFeeRequest\x1a\x1f.payment.StudentFeeListResponse\x12\x44\n\x11GetPaymentOptions\x12\x0e.payment.Empty\x1a\x1f.payment.PaymentOptionsResponse\x12T\n\x0fInitiatePayment\x12\x1f.payment.InitiatePaymentRequest\x1a .payment.InitiatePaymentResponse\x12X\n\x15VerifyRazorpayPayment\x12\x1e.payment.VerifyRazorpayRequest\x1a\x1f.payment.VerifyRazorpayResponse\x12^\n\x17SimulateRazorpayPayment\x12 .payment.SimulateRazorpayRequest\x1a!.payment.SimulateRazorpayResponse\x12\x45\n\nGetStudent\x12\x1a.payment.GetStudentRequest\x1a\x1b.payment.GetStudentResponse\x12T\n\x0fGenerateReceipt\x12\x1f.payment.GenerateReceiptRequest\x1a .payment.GenerateReceiptResponse\x12`\n\x13ListTransactionLogs\x12#.payment.ListTransactionLogsRequest\x1a$.payment.ListTransactionLogsResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rpayment.proto\x12\x07payment\"\x07\n\x05\x45mpty\"~\n\x1aListTransactionLogsRequest\x12\x10\n\x08log_type\x18\x01 \x01(\t\x12\r\n\x05since\x18\x02 \x01(\t\x12\r\n\x05until\x18\x03 \x01(\t\x12\x0e\n\x06\x63ursor\x18\x04 \x01(\t\x12\x11\n\tpage_size\x18\x05 \x01(\x05\x12\r\n\x05limit\x18\x06 \x01(\x05\"v\n\x14\x46\x65\x65\x41llocationRequest\x12\r\n\x05grade\x18\x01 \x01(\x05\x12\x15\n\racademic_year\x18\x02 \x01(\t\x12\x10\n\x08\x62\x61se_fee\x18\x03 \x01(\x01\x12\x10\n\x08\x64ue_date\x18\x04 \x01(\t\x12\x14\n\x0c\x66ine_per_day\x18\x05 \x01(\x01\"(\n\x15\x46\x65\x65\x41llocationResponse\x12\x0f\n\x07message\x18\x01 \x01(\t\"X\n\x1c\x41llocateFeeForStudentRequest\x12\x12\n\nstudent_id\x18\x01 \x01(\x05\x12\r\n\x05grade\x18\x02 \x01(\x05\x12\x15\n\racademic_year\x18\x03 \x01(\t\"0\n\x1d\x41llocateFeeForStudentResponse\x12\x0f\n\x07message\x18\x01 \x01(\t\"=\n\x11StudentFeeRequest\x12\x12\n\nstudent_id\x18\x01 \x01(\x05\x12\x14\n\x0csummary_only\x18\x02 \x01(\x08\"\xf6\x01\n\nStudentFee\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x12\n\nstudent_id\x18\x02 \x01(\x05\x12\x18\n\x10\x66\x65\x65_structure_id\x18\x03 \x01(\x05\x12\x14\n\x0ctotal_amount\x18\x04 \x01(\x01\x12\x13\n\x0bpaid_amount\x18\x05 \x01(\x01\x12\x0e\n\x06status\x18\x06 \x01(\t\x12\x10\n\x08\x64ue_date\x18\x07 \x01(\t\x12\r\n\x05grade\x18\x08 \x01(\x05\x12\x15\n\racademic_year\x18\t \x01(\t\x12\x10\n\x08\x62\x61se_fee\x18\n \x01(\x01\x12\x13\n\x0b\x66ine_amount\x18\x0b \x01(\x01\x12\x14\n\x0c\x64\x61ys_overdue\x18\x0c \x01(\x05\"\x8a\x01\n\x0eStudentBalance\x12\x11\n\ttotal_due\x18\x01 \x01(\x01\x12\x12\n\ntotal_paid\x18\x02 \x01(\x01\x12\x13\n\x0btotal_fines\x18\x03 \x01(\x01\x12\x15\n\roverdue_count\x18\x04 \x01(\x05\x12\x11\n\tfee_count\x18\x05 \x01(\x05\x12\x12\n\nupdated_at\x18\x06 \x01(\t\"e\n\x16StudentFeeListResponse\x12!\n\x04\x66\x65\x65s\x18\x01 \x03(\x0b\x32\x13.payment.StudentFee\x12(\n\x07\x62\x61lance\x18\x02 \x01(\x0b\x32\x17.payment.StudentBalance\"K\n\x10\x46\x65\x65ReportRequest\x12\x15\n\racademic_year\x18\x01 \x01(\t\x12\x0e\n\x06grades\x18\x02 \x03(\x05\x12\x10\n\x08statuses\x18\x03 \x03(\t\"\xa4\x01\n\x0c\x46\x65\x65ReportRow\x12\r\n\x05grade\x18\x01 \x01(\x05\x12\x15\n\racademic_year\x18\x02 \x01(\t\x12\x0e\n\x06status\x18\x03 \x01(\t\x12\x11\n\tfee_count\x18\x04 \x01(\x05\x12\x15\n\rbilled_amount\x18\x05 \x01(\x01\x12\x18\n\x10\x63ollected_amount\x18\x06 \x01(\x01\x12\x1a\n\x12outstanding_amount\x18\x07 \x01(\x01\"\x85\x01\n\x11\x46\x65\x65ReportResponse\x12#\n\x04rows\x18\x01 \x03(\x0b\x32\x15.payment.FeeReportRow\x12\x15\n\rbilled_amount\x18\x02 \x01(\x01\x12\x18\n\x10\x63ollected_amount\x18\x03 \x01(\x01\x12\x1a\n\x12outstanding_amount\x18\x04 \x01(\x01\")\n\x16PaymentOptionsResponse\x12\x0f\n\x07options\x18\x01 \x03(\t\"U\n\x16InitiatePaymentRequest\x12\x16\n\x0estudent_fee_id\x18\x01 \x01(\x05\x12\x12\n\nstudent_id\x18\x02 \x01(\x05\x12\x0f\n\x07gateway\x18\x03 \x01(\t\"r\n\x17InitiatePaymentResponse\x12\x10\n\x08order_id\x18\x01 \x01(\t\x12\x0e\n\x06\x61mount\x18\x02 \x01(\x01\x12\x10\n\x08\x63urrency\x18\x03 \x01(\t\x12\x12\n\npayment_id\x18\x04 \x01(\x05\x12\x0f\n\x07message\x18\x05 \x01(\t\"\x7f\n\x15VerifyRazorpayRequest\x12\x12\n\npayment_id\x18\x01 \x01(\x05\x12\x19\n\x11razorpay_order_id\x18\x02 \x01(\t\x12\x1b\n\x13razorpay_payment_id\x18\x03 \x01(\t\x12\x1a\n\x12razorpay_signature\x18\x04 \x01(\t\">\n\x16VerifyRazorpayResponse\x12\x0f\n\x07message\x18\x01 \x01(\t\x12\x13\n\x0breceipt_url\x18\x02 \x01(\t\"N\n\x1a\x42\x61tchVerifyRazorpayRequest\x12\x30\n\x08payments\x18\x01 \x03(\x0b\x32\x1e.payment.VerifyRazorpayRequest\"c\n\x11\x42\x61tchVerifyResult\x12\x12\n\npayment_id\x18\x01 \x01(\x05\x12\x1b\n\x13razorpay_payment_id\x18\x02 \x01(\t\x12\r\n\x05valid\x18\x03 \x01(\x08\x12\x0e\n\x06status\x18\x04 \x01(\t\"n\n\x1b\x42\x61tchVerifyRazorpayResponse\x12+\n\x07results\x18\x01 \x03(\x0b\x32\x1a.payment.BatchVerifyResult\x12\x10\n\x08verified\x18\x02 \x01(\x05\x12\x10\n\x08rejected\x18\x03 \x01(\x05\"d\n\x13OfflinePaymentEntry\x12\x16\n\x0estudent_fee_id\x18\x01 \x01(\x05\x12\x12\n\nstudent_id\x18\x02 \x01(\x05\x12\x0e\n\x06\x61mount\x18\x03 \x01(\x01\x12\x11\n\treference\x18\x04 \x01(\t\"L\n\x1aOfflinePaymentBatchRequest\x12.\n\x08payments\x18\x01 \x03(\x0b\x32\x1c.payment.OfflinePaymentEntry\"u\n\x14OfflinePaymentResult\x12\x16\n\x0estudent_fee_id\x18\x01 \x01(\x05\x12\x11\n\treference\x18\x02 \x01(\t\x12\x0e\n\x06status\x18\x03 \x01(\t\x12\x12\n\npayment_id\x18\x04 \x01(\x05\x12\x0e\n\x06\x61mount\x18\x05 \x01(\x01\"\x86\x01\n\x1bOfflinePaymentBatchResponse\x12.\n\x07results\x18\x01 \x03(\x0b\x32\x1d.payment.OfflinePaymentResult\x12\x0e\n\x06posted\x18\x02 \x01(\x05\x12\x10\n\x08rejected\x18\x03 \x01(\x05\x12\x15\n\rposted_amount\x18\x04 \x01(\x01\"H\n\x17SimulateRazorpayRequest\x12\x12\n\npayment_id\x18\x01 \x01(\x05\x12\x19\n\x11razorpay_order_id\x18\x02 \x01(\t\"\x82\x01\n\x18SimulateRazorpayResponse\x12\x12\n\npayment_id\x18\x01 \x01(\x05\x12\x19\n\x11razorpay_order_id\x18\x02 \x01(\t\x12\x1b\n\x13razorpay_payment_id\x18\x03 \x01(\t\x12\x1a\n\x12razorpay_signature\x18\x04 \x01(\t\"\'\n\x11GetStudentRequest\x12\x12\n\nstudent_id\x18\x01 \x01(\x05\"k\n\x12GetStudentResponse\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x12\n\nfirst_name\x18\x02 \x01(\t\x12\x11\n\tlast_name\x18\x03 \x01(\t\x12\x13\n\x0broll_number\x18\x04 \x01(\t\x12\r\n\x05grade\x18\x05 \x01(\t\"F\n\x16GenerateReceiptRequest\x12\x12\n\npayment_id\x18\x01 \x01(\x05\x12\x12\n\nstudent_id\x18\x02 \x01(\x05J\x04\x08\x03\x10\x07\"g\n\x17GenerateReceiptResponse\x12\x0f\n\x07message\x18\x01 \x01(\t\x12\x13\n\x0breceipt_url\x18\x02 \x01(\t\x12\x16\n\x0ereceipt_number\x18\x03 \x01(\t\x12\x0e\n\x06status\x18\x04 \x01(\t\"+\n\x11GetReceiptRequest\x12\x16\n\x0ereceipt_number\x18\x01 \x01(\t\"\xa5\x01\n\x12GetReceiptResponse\x12\x16\n\x0ereceipt_number\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x13\n\x0breceipt_url\x18\x03 \x01(\t\x12\x12\n\npayment_id\x18\x04 \x01(\x05\x12\x12\n\nstudent_id\x18\x05 \x01(\x05\x12\x14\n\x0creceipt_file\x18\x06 \x01(\t\x12\x14\n\x0c\x63ontent_hash\x18\x07 \x01(\t\"g\n\x0eTransactionLog\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x13\n\x0blog_message\x18\x02 \x01(\t\x12\x10\n\x08log_type\x18\x03 \x01(\t\x12\x12\n\ncreated_at\x18\x04 \x01(\t\x12\x0e\n\x06\x63ursor\x18\x05 \x01(\t2\xc3\t\n\x0ePaymentService\x12L\n\x0b\x41llocateFee\x12\x1d.payment.FeeAllocationRequest\x1a\x1e.payment.FeeAllocationResponse\x12\x66\n\x15\x41llocateFeeForStudent\x12%.payment.AllocateFeeForStudentRequest\x1a&.payment.AllocateFeeForStudentResponse\x12M\n\x0eGetStudentFees\x12\x1a.payment.StudentFeeRequest\x1a\x1f.payment.StudentFeeListResponse\x12O\n\x16GetFeeCollectionReport\x12\x19.payment.FeeReportRequest\x1a\x1a.payment.FeeReportResponse\x12\x44\n\x11GetPaymentOptions\x12\x0e.payment.Empty\x1a\x1f.payment.PaymentOptionsResponse\x12T\n\x0fInitiatePayment\x12\x1f.payment.InitiatePaymentRequest\x1a .payment.InitiatePaymentResponse\x12X\n\x15VerifyRazorpayPayment\x12\x1e.payment.VerifyRazorpayRequest\x1a\x1f.payment.VerifyRazorpayResponse\x12h\n\x1b\x42\x61tchVerifyRazorpayPayments\x12#.payment.BatchVerifyRazorpayRequest\x1a$.payment.BatchVerifyRazorpayResponse\x12`\n\x13PostOfflinePayments\x12#.payment.OfflinePaymentBatchRequest\x1a$.payment.OfflinePaymentBatchResponse\x12^\n\x17SimulateRazorpayPayment\x12 .payment.SimulateRazorpayRequest\x1a!.payment.SimulateRazorpayResponse\x12\x45\n\nGetStudent\x12\x1a.payment.GetStudentRequest\x1a\x1b.payment.GetStudentResponse\x12T\n\x0fGenerateReceipt\x12\x1f.payment.GenerateReceiptRequest\x1a .payment.GenerateReceiptResponse\x12\x45\n\nGetReceipt\x12\x1a.payment.GetReceiptRequest\x1a\x1b.payment.GetReceiptResponse\x12U\n\x13ListTransactionLogs\x12#.payment.ListTransactionLogsRequest\x1a\x17.payment.TransactionLog0\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -34,47 +34,71 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_EMPTY']._serialized_start=26
   _globals['_EMPTY']._serialized_end=33
   _globals['_LISTTRANSACTIONLOGSREQUEST']._serialized_start=35
-  _globals['_LISTTRANSACTIONLOGSREQUEST']._serialized_end=63
-  _globals['_FEEALLOCATIONREQUEST']._serialized_start=65
-  _globals['_FEEALLOCATIONREQUEST']._serialized_end=183
-  _globals['_FEEALLOCATIONRESPONSE']._serialized_start=185
-  _globals['_FEEALLOCATIONRESPONSE']._serialized_end=225
-  _globals['_ALLOCATEFEEFORSTUDENTREQUEST']._serialized_start=227
-  _globals['_ALLOCATEFEEFORSTUDENTREQUEST']._serialized_end=315
-  _globals['_ALLOCATEFEEFORSTUDENTRESPONSE']._serialized_start=317
-  _globals['_ALLOCATEFEEFORSTUDENTRESPONSE']._serialized_end=365
-  _globals['_STUDENTFEEREQUEST']._serialized_start=367
-  _globals['_STUDENTFEEREQUEST']._serialized_end=406
-  _globals['_STUDENTFEE']._serialized_start=409
-  _globals['_STUDENTFEE']._serialized_end=556
-  _globals['_STUDENTFEELISTRESPONSE']._serialized_start=558
-  _globals['_STUDENTFEELISTRESPONSE']._serialized_end=617
-  _globals['_PAYMENTOPTIONSRESPONSE']._serialized_start=619
-  _globals['_PAYMENTOPTIONSRESPONSE']._serialized_end=660
-  _globals['_INITIATEPAYMENTREQUEST']._serialized_start=662
-  _globals['_INITIATEPAYMENTREQUEST']._serialized_end=747
-  _globals['_INITIATEPAYMENTRESPONSE']._serialized_start=749
-  _globals['_INITIATEPAYMENTRESPONSE']._serialized_end=863
-  _globals['_VERIFYRAZORPAYREQUEST']._serialized_start=865
-  _globals['_VERIFYRAZORPAYREQUEST']._serialized_end=992
-  _globals['_VERIFYRAZORPAYRESPONSE']._serialized_start=994
-  _globals['_VERIFYRAZORPAYRESPONSE']._serialized_end=1056
-  _globals['_SIMULATERAZORPAYREQUEST']._serialized_start=1058
-  _globals['_SIMULATERAZORPAYREQUEST']._serialized_end=1130
-  _globals['_SIMULATERAZORPAYRESPONSE']._serialized_start=1133
-  _globals['_SIMULATERAZORPAYRESPONSE']._serialized_end=1263
-  _globals['_GETSTUDENTREQUEST']._serialized_start=1265
-  _globals['_GETSTUDENTREQUEST']._serialized_end=1304
-  _globals['_GETSTUDENTRESPONSE']._serialized_start=1306
-  _globals['_GETSTUDENTRESPONSE']._serialized_end=1413
-  _globals['_GENERATERECEIPTREQUEST']._serialized_start=1416
-  _globals['_GENERATERECEIPTREQUEST']._serialized_end=1561
-  _globals['_GENERATERECEIPTRESPONSE']._serialized_start=1563
-  _globals['_GENERATERECEIPTRESPONSE']._serialized_end=1626
-  _globals['_TRANSACTIONLOG']._serialized_start=1628
-  _globals['_TRANSACTIONLOG']._serialized_end=1715
-  _globals['_LISTTRANSACTIONLOGSRESPONSE']._serialized_start=1717
-  _globals['_LISTTRANSACTIONLOGSRESPONSE']._serialized_end=1785
-  _globals['_PAYMENTSERVICE']._serialized_start=1788
-  _globals['_PAYMENTSERVICE']._serialized_end=2662
+  _globals['_LISTTRANSACTIONLOGSREQUEST']._serialized_end=161
+  _globals['_FEEALLOCATIONREQUEST']._serialized_start=163
+  _globals['_FEEALLOCATIONREQUEST']._serialized_end=281
+  _globals['_FEEALLOCATIONRESPONSE']._serialized_start=283
+  _globals['_FEEALLOCATIONRESPONSE']._serialized_end=323
+  _globals['_ALLOCATEFEEFORSTUDENTREQUEST']._serialized_start=325
+  _globals['_ALLOCATEFEEFORSTUDENTREQUEST']._serialized_end=413
+  _globals['_ALLOCATEFEEFORSTUDENTRESPONSE']._serialized_start=415
+  _globals['_ALLOCATEFEEFORSTUDENTRESPONSE']._serialized_end=463
+  _globals['_STUDENTFEEREQUEST']._serialized_start=465
+  _globals['_STUDENTFEEREQUEST']._serialized_end=526
+  _globals['_STUDENTFEE']._serialized_start=529
+  _globals['_STUDENTFEE']._serialized_end=775
+  _globals['_STUDENTBALANCE']._serialized_start=778
+  _globals['_STUDENTBALANCE']._serialized_end=916
+  _globals['_STUDENTFEELISTRESPONSE']._serialized_start=918
+  _globals['_STUDENTFEELISTRESPONSE']._serialized_end=1019
+  _globals['_FEEREPORTREQUEST']._serialized_start=1021
+  _globals['_FEEREPORTREQUEST']._serialized_end=1096
+  _globals['_FEEREPORTROW']._serialized_start=1099
+  _globals['_FEEREPORTROW']._serialized_end=1263
+  _globals['_FEEREPORTRESPONSE']._serialized_start=1266
+  _globals['_FEEREPORTRESPONSE']._serialized_end=1399
+  _globals['_PAYMENTOPTIONSRESPONSE']._serialized_start=1401
+  _globals['_PAYMENTOPTIONSRESPONSE']._serialized_end=1442
+  _globals['_INITIATEPAYMENTREQUEST']._serialized_start=1444
+  _globals['_INITIATEPAYMENTREQUEST']._serialized_end=1529
+  _globals['_INITIATEPAYMENTRESPONSE']._serialized_start=1531
+  _globals['_INITIATEPAYMENTRESPONSE']._serialized_end=1645
+  _globals['_VERIFYRAZORPAYREQUEST']._serialized_start=1647
+  _globals['_VERIFYRAZORPAYREQUEST']._serialized_end=1774
+  _globals['_VERIFYRAZORPAYRESPONSE']._serialized_start=1776
+  _globals['_VERIFYRAZORPAYRESPONSE']._serialized_end=1838
+  _globals['_BATCHVERIFYRAZORPAYREQUEST']._serialized_start=1840
+  _globals['_BATCHVERIFYRAZORPAYREQUEST']._serialized_end=1918
+  _globals['_BATCHVERIFYRESULT']._serialized_start=1920
+  _globals['_BATCHVERIFYRESULT']._serialized_end=2019
+  _globals['_BATCHVERIFYRAZORPAYRESPONSE']._serialized_start=2021
+  _globals['_BATCHVERIFYRAZORPAYRESPONSE']._serialized_end=2131
+  _globals['_OFFLINEPAYMENTENTRY']._serialized_start=2133
+  _globals['_OFFLINEPAYMENTENTRY']._serialized_end=2233
+  _globals['_OFFLINEPAYMENTBATCHREQUEST']._serialized_start=2235
+  _globals['_OFFLINEPAYMENTBATCHREQUEST']._serialized_end=2311
+  _globals['_OFFLINEPAYMENTRESULT']._serialized_start=2313
+  _globals['_OFFLINEPAYMENTRESULT']._serialized_end=2430
+  _globals['_OFFLINEPAYMENTBATCHRESPONSE']._serialized_start=2433
+  _globals['_OFFLINEPAYMENTBATCHRESPONSE']._serialized_end=2567
+  _globals['_SIMULATERAZORPAYREQUEST']._serialized_start=2569
+  _globals['_SIMULATERAZORPAYREQUEST']._serialized_end=2641
+  _globals['_SIMULATERAZORPAYRESPONSE']._serialized_start=2644
+  _globals['_SIMULATERAZORPAYRESPONSE']._serialized_end=2774
+  _globals['_GETSTUDENTREQUEST']._serialized_start=2776
+  _globals['_GETSTUDENTREQUEST']._serialized_end=2815
+  _globals['_GETSTUDENTRESPONSE']._serialized_start=2817
+  _globals['_GETSTUDENTRESPONSE']._serialized_end=2924
+  _globals['_GENERATERECEIPTREQUEST']._serialized_start=2926
+  _globals['_GENERATERECEIPTREQUEST']._serialized_end=2996
+  _globals['_GENERATERECEIPTRESPONSE']._serialized_start=2998
+  _globals['_GENERATERECEIPTRESPONSE']._serialized_end=3101
+  _globals['_GETRECEIPTREQUEST']._serialized_start=3103
+  _globals['_GETRECEIPTREQUEST']._serialized_end=3146
+  _globals['_GETRECEIPTRESPONSE']._serialized_start=3149
+  _globals['_GETRECEIPTRESPONSE']._serialized_end=3314
+  _globals['_TRANSACTIONLOG']._serialized_start=3316
+  _globals['_TRANSACTIONLOG']._serialized_end=3419
+  _globals['_PAYMENTSERVICE']._serialized_start=3422
+  _globals['_PAYMENTSERVICE']._serialized_end=4641
 # @@protoc_insertion_point(module_scope)
@@ -26,7 +26,7 @@ if _version_not_supported:
 
 
 class PaymentServiceStub(object):
-    """Service
+    """Service
     """
 
     def __init__(self, channel):
@@ -50,6 +50,11 @@ class PaymentServiceStub(object):
                 request_serializer=payment__pb2.StudentFeeRequest.SerializeToString,
                 response_deserializer=payment__pb2.StudentFeeListResponse.FromString,
                 _registered_method=True)
+        self.GetFeeCollectionReport = channel.unary_unary(
+                '/payment.PaymentService/GetFeeCollectionReport',
+                request_serializer=payment__pb2.FeeReportRequest.SerializeToString,
+                response_deserializer=payment__pb2.FeeReportResponse.FromString,
+                _registered_method=True)
         self.GetPaymentOptions = channel.unary_unary(
                 '/payment.PaymentService/GetPaymentOptions',
                 request_serializer=payment__pb2.Empty.SerializeToString,
@@ -65,6 +70,16 @@ class PaymentServiceStub(object):
                 request_serializer=payment__pb2.VerifyRazorpayRequest.SerializeToString,
                 response_deserializer=payment__pb2.VerifyRazorpayResponse.FromString,
                 _registered_method=True)
+        self.BatchVerifyRazorpayPayments = channel.unary_unary(
+                '/payment.PaymentService/BatchVerifyRazorpayPayments',
+                request_serializer=payment__pb2.BatchVerifyRazorpayRequest.SerializeToString,
+                response_deserializer=payment__pb2.BatchVerifyRazorpayResponse.FromString,
+                _registered_method=True)
+        self.PostOfflinePayments = channel.unary_unary(
+                '/payment.PaymentService/PostOfflinePayments',
+                request_serializer=payment__pb2.OfflinePaymentBatchRequest.SerializeToString,
+                response_deserializer=payment__pb2.OfflinePaymentBatchResponse.FromString,
+                _registered_method=True)
         self.SimulateRazorpayPayment = channel.unary_unary(
                 '/payment.PaymentService/SimulateRazorpayPayment',
                 request_serializer=payment__pb2.SimulateRazorpayRequest.SerializeToString,
@@ -80,15 +95,20 @@ class PaymentServiceStub(object):
                 request_serializer=payment__pb2.GenerateReceiptRequest.SerializeToString,
                 response_deserializer=payment__pb2.GenerateReceiptResponse.FromString,
                 _registered_method=True)
-        self.ListTransactionLogs = channel.unary_unary(
+        self.GetReceipt = channel.unary_unary(
+                '/payment.PaymentService/GetReceipt',
+                request_serializer=payment__pb2.GetReceiptRequest.SerializeToString,
+                response_deserializer=payment__pb2.GetReceiptResponse.FromString,
+                _registered_method=True)
+        self.ListTransactionLogs = channel.unary_stream(
                 '/payment.PaymentService/ListTransactionLogs',
                 request_serializer=payment__pb2.ListTransactionLogsRequest.SerializeToString,
-                response_deserializer=payment__pb2.ListTransactionLogsResponse.FromString,
+                response_deserializer=payment__pb2.TransactionLog.FromString,
                 _registered_method=True)
 
 
 class PaymentServiceServicer(object):
-    """Service
+    """Service
     """
 
     def AllocateFee(self, request, context):
@@ -109,6 +129,12 @@ class PaymentServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetFeeCollectionReport(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def GetPaymentOptions(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -127,6 +153,18 @@ class PaymentServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def BatchVerifyRazorpayPayments(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def PostOfflinePayments(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def SimulateRazorpayPayment(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -145,12 +183,19 @@ class PaymentServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
-    def ListTransactionLogs(self, request, context):
+    def GetReceipt(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def ListTransactionLogs(self, request, context):
+        """newest first, streamed page by page; resume with the last entry's cursor
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_PaymentServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -169,6 +214,11 @@ def add_PaymentServiceServicer_to_server(servicer, server):
                     request_deserializer=payment__pb2.StudentFeeRequest.FromString,
                     response_serializer=payment__pb2.StudentFeeListResponse.SerializeToString,
             ),
+            'GetFeeCollectionReport': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetFeeCollectionReport,
+                    request_deserializer=payment__pb2.FeeReportRequest.FromString,
+                    response_serializer=payment__pb2.FeeReportResponse.SerializeToString,
+            ),
             'GetPaymentOptions': grpc.unary_unary_rpc_method_handler(
                     servicer.GetPaymentOptions,
                     request_deserializer=payment__pb2.Empty.FromString,
@@ -184,6 +234,16 @@ def add_PaymentServiceServicer_to_server(servicer, server):
                     request_deserializer=payment__pb2.VerifyRazorpayRequest.FromString,
                     response_serializer=payment__pb2.VerifyRazorpayResponse.SerializeToString,
             ),
+            'BatchVerifyRazorpayPayments': grpc.unary_unary_rpc_method_handler(
+                    servicer.BatchVerifyRazorpayPayments,
+                    request_deserializer=payment__pb2.BatchVerifyRazorpayRequest.FromString,
+                    response_serializer=payment__pb2.BatchVerifyRazorpayResponse.SerializeToString,
+            ),
+            'PostOfflinePayments': grpc.unary_unary_rpc_method_handler(
+                    servicer.PostOfflinePayments,
+                    request_deserializer=payment__pb2.OfflinePaymentBatchRequest.FromString,
+                    response_serializer=payment__pb2.OfflinePaymentBatchResponse.SerializeToString,
+            ),
             'SimulateRazorpayPayment': grpc.unary_unary_rpc_method_handler(
                     servicer.SimulateRazorpayPayment,
                     request_deserializer=payment__pb2.SimulateRazorpayRequest.FromString,
@@ -199,10 +259,15 @@ def add_PaymentServiceServicer_to_server(servicer, server):
                     request_deserializer=payment__pb2.GenerateReceiptRequest.FromString,
                     response_serializer=payment__pb2.GenerateReceiptResponse.SerializeToString,
             ),
-            'ListTransactionLogs': grpc.unary_unary_rpc_method_handler(
+            'GetReceipt': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetReceipt,
+                    request_deserializer=payment__pb2.GetReceiptRequest.FromString,
+                    response_serializer=payment__pb2.GetReceiptResponse.SerializeToString,
+            ),
+            'ListTransactionLogs': grpc.unary_stream_rpc_method_handler(
                     servicer.ListTransactionLogs,
                     request_deserializer=payment__pb2.ListTransactionLogsRequest.FromString,
-                    response_serializer=payment__pb2.ListTransactionLogsResponse.SerializeToString,
+                    response_serializer=payment__pb2.TransactionLog.SerializeToString,
             ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
@@ -213,7 +278,7 @@ def add_PaymentServiceServicer_to_server(servicer, server):
 
  # This class is part of an EXPERIMENTAL API.
 class PaymentService(object):
-    """Service
+    """Service
     """
 
     @staticmethod
@@ -297,6 +362,33 @@ class PaymentService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def GetFeeCollectionReport(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/payment.PaymentService/GetFeeCollectionReport',
+            payment__pb2.FeeReportRequest.SerializeToString,
+            payment__pb2.FeeReportResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def GetPaymentOptions(request,
             target,
@@ -378,6 +470,60 @@ class PaymentService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def BatchVerifyRazorpayPayments(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/payment.PaymentService/BatchVerifyRazorpayPayments',
+            payment__pb2.BatchVerifyRazorpayRequest.SerializeToString,
+            payment__pb2.BatchVerifyRazorpayResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def PostOfflinePayments(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/payment.PaymentService/PostOfflinePayments',
+            payment__pb2.OfflinePaymentBatchRequest.SerializeToString,
+            payment__pb2.OfflinePaymentBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def SimulateRazorpayPayment(request,
             target,
@@ -460,7 +606,7 @@ class PaymentService(object):
             _registered_method=True)
 
     @staticmethod
-    def ListTransactionLogs(request,
+    def GetReceipt(request,
             target,
             options=(),
             channel_credentials=None,
@@ -471,11 +617,38 @@ class PaymentService(object):
             timeout=None,
             metadata=None):
         return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/payment.PaymentService/GetReceipt',
+            payment__pb2.GetReceiptRequest.SerializeToString,
+            payment__pb2.GetReceiptResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ListTransactionLogs(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
             request,
             target,
             '/payment.PaymentService/ListTransactionLogs',
             payment__pb2.ListTransactionLogsRequest.SerializeToString,
-            payment__pb2.ListTransactionLogsResponse.FromString,
+            payment__pb2.TransactionLog.FromString,
             options,
             channel_credentials,
             insecure,
@@ -44,12 +44,3 @@ class ExamGRPCClient:
     def get_exams_by_teacher(self, teacher_id):
         request = TeacherRequest(teacher_id=teacher_id)
         return self.stub.GetExamsByTeacher(request)
-
-    
-    def attempt_exam(self, exam_id, student_id, score):
-        request = exam_pb2.AttemptExamRequest(
-            exam_id=exam_id,
-            student_id=student_id,
-            score=score
-        )
-        return self.stub.AttemptExam(request)
\ No newline at end of file
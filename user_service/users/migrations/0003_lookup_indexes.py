@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_alter_student_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['grade', 'academic_year'], name='users_student_grade_year_idx'),
+        ),
+    ]
@@ -32,6 +32,12 @@ class Student(models.Model):
     assigned_teacher = models.ForeignKey(Teacher, on_delete=models.SET_NULL, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # GetStudentsByGradeYear; user_id lookups already use the one-to-one unique index
+            models.Index(fields=['grade', 'academic_year'], name='users_student_grade_year_idx'),
+        ]
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
@@ -62,14 +62,33 @@ class PaymentGRPCClient:
     def generate_receipt(self, payment_id, student):
         request = payment_pb2.GenerateReceiptRequest(
             payment_id=int(payment_id),
-            student_id=int(student.id),
-            student_name=f"{student.first_name} {student.last_name}",
-            roll_number=str(student.roll_number),  
-            grade=str(student.grade),              
-            academic_year=str(student.academic_year)  
+            student_id=int(student.id)
         )
         return self.stub.GenerateReceipt(request)
 
-    def list_logs(self):
-        request = payment_pb2.ListTransactionLogsRequest()
-        return self.stub.ListTransactionLogs(request)
+    def get_student_fees(self, student_id, summary_only=False):
+        request = payment_pb2.StudentFeeRequest(student_id=student_id, summary_only=summary_only)
+        return self.stub.GetStudentFees(request)
+
+    def list_logs(self, log_type="", since="", until="", cursor="", page_size=0, limit=0):
+        """Lazily iterate transaction logs, newest first.
+
+        The stream is only opened on the first ``next()`` and is cancelled if the
+        caller stops early, so the server stops reading pages too. Pass the last
+        entry's ``cursor`` to continue a listing.
+        """
+        request = payment_pb2.ListTransactionLogsRequest(
+            log_type=log_type,
+            since=since,
+            until=until,
+            cursor=cursor,
+            page_size=page_size,
+            limit=limit,
+        )
+        stream = self.stub.ListTransactionLogs(request)
+        try:
+            yield from stream
+        finally:
+            cancel = getattr(stream, "cancel", None)
+            if cancel is not None:
+                cancel()
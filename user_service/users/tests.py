@@ -11,6 +11,8 @@ from .serializers import CustomTokenObtainPairSerializer, StudentSerializer, Tea
 
 from .payment_client import PaymentGRPCClient
 from .models import Student, Teacher
+from .grpc_server import UserServiceServicer
+from common.query_plans import QueryPlanMixin
 
 class StudentViewSetTestCase(TestCase):
     def setUp(self):
@@ -512,9 +514,15 @@ class PaymentGRPCClientTestCase(TestCase):
         self.client.generate_receipt(payment_id=1, student=student)
         self.mock_stub.GenerateReceipt.assert_called_once()
 
-    def test_list_logs_calls_stub(self):
-        self.client.list_logs()
-        self.mock_stub.ListTransactionLogs.assert_called_once()
+    def test_list_logs_is_lazy(self):
+        self.mock_stub.ListTransactionLogs.return_value = MagicMock(__iter__=lambda _: iter(["a", "b", "c"]))
+        logs = self.client.list_logs(log_type="error")
+        self.mock_stub.ListTransactionLogs.assert_not_called()
+
+        self.assertEqual(next(logs), "a")
+        self.assertEqual(self.mock_stub.ListTransactionLogs.call_args[0][0].log_type, "error")
+        logs.close()
+        self.mock_stub.ListTransactionLogs.return_value.cancel.assert_called_once()
 
 class ImportStudentsCSVTestCase(TestCase):
     def setUp(self):
@@ -657,3 +665,22 @@ class ImportStudentsCSVTestCase(TestCase):
         )
         self.assertEqual(response.status_code, 400)
         self.assertIn("Teacher with ID 9999 not found", str(response.data["errors"]))
+
+
+class UserQueryPlanTestCase(QueryPlanMixin, TestCase):
+    def setUp(self):
+        self.service = UserServiceServicer()
+        self.user = User.objects.create_user(username="planuser", password="pass123")
+        self.student = Student.objects.create(
+            user=self.user, first_name="Plan", last_name="Student", email="plan@example.com",
+            phone_number="123", roll_number="P001", grade=5, academic_year="2025-26",
+            date_of_birth=date(2010, 1, 1), admission_date=date.today(), status="Active"
+        )
+
+    def test_hot_lookups_use_indexes(self):
+        with self.assertNoFullTableScans():
+            self.service.GetStudentByUserId(MagicMock(user_id=self.user.id), MagicMock())
+            self.service.GetTeacherByUserId(MagicMock(user_id=self.user.id), MagicMock())
+            self.service.GetStudentById(MagicMock(student_id=self.student.id), MagicMock())
+            response = self.service.GetStudentsByGradeYear(MagicMock(grade=5, academic_year="2025-26"), MagicMock())
+        self.assertEqual(len(response.students), 1)